@@ -0,0 +1 @@
+"""Benchmarks run against local stand-ins for Supabase and OpenRouter."""
@@ -0,0 +1,157 @@
+"""Latency of regular users while one user floods the API, with and without admission control.
+
+Run from ``backend/``:
+
+    PYTHONPATH=. python -m benchmarks.admission_control --users 10 --flood 200 --latency 0.2
+
+The message routes run in process with a stub use case whose LLM call takes
+``--latency`` and is limited to ``--capacity`` concurrent calls, like a
+provider rate limit. One user sends ``--flood`` messages at once, while
+``--users`` regular users each send a few messages, one at a time. Without
+admission control the flood fills the provider first-come first-served and
+everyone waits behind it; with it, regular users are served in turn with the
+flooding user, who is told to retry later.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+from typing import List, Tuple
+from uuid import UUID, uuid4
+
+import httpx
+from fastapi import FastAPI, Request
+
+from src.chatbot.domain.entities.message import Message, MessageRole
+from src.chatbot.domain.entities.user import User
+from src.chatbot.infrastructure.auth.supabase_auth import get_current_user
+from src.chatbot.presentation.api.admission import AdmissionController
+from src.chatbot.presentation.api.dependencies import get_send_message_use_case
+from src.chatbot.presentation.api.routes import router
+
+
+class StubSendMessageUseCase:
+    """Answer after a simulated LLM call sharing a bounded provider capacity."""
+
+    def __init__(self, latency: float, capacity: int) -> None:
+        """Initialize with the LLM latency and the calls the provider serves at once."""
+        self.latency = latency
+        self.provider = asyncio.Semaphore(capacity)
+
+    async def execute(self, conversation_id: UUID, user_id: UUID, content: str) -> Message:
+        """Wait for the provider, then answer."""
+        async with self.provider:
+            await asyncio.sleep(self.latency)
+        return Message(conversation_id=conversation_id, role=MessageRole.ASSISTANT, content="Hi")
+
+
+def _app(use_case: StubSendMessageUseCase, admission: bool, capacity: int) -> FastAPI:
+    """Build an app serving the message routes, authenticating users by a header."""
+    app = FastAPI()
+    app.include_router(router)
+    app.state.admission = (
+        AdmissionController(
+            capacity,
+            max_queue=64,
+            max_user_queue=4,
+            user_rate=2.0,
+            user_burst=10,
+            queue_timeout=10.0,
+        )
+        if admission
+        else None
+    )
+
+    def current_user(request: Request) -> User:
+        return User(id=UUID(request.headers["X-User"]), email="user@example.com")
+
+    app.dependency_overrides[get_current_user] = current_user
+    app.dependency_overrides[get_send_message_use_case] = lambda: use_case
+    return app
+
+
+async def _send(client: httpx.AsyncClient, user_id: UUID) -> Tuple[float, int]:
+    """Send one message, returning the latency in milliseconds and the status."""
+    started = time.perf_counter()
+    response = await client.post(
+        f"/conversations/{uuid4()}/messages",
+        json={"content": "Hello"},
+        headers={"X-User": str(user_id)},
+    )
+    return (time.perf_counter() - started) * 1000, response.status_code
+
+
+async def _regular_user(
+    client: httpx.AsyncClient, messages: int, think: float
+) -> List[Tuple[float, int]]:
+    """Send messages one after the other, pausing between them."""
+    user_id = uuid4()
+    results = []
+    for _ in range(messages):
+        results.append(await _send(client, user_id))
+        await asyncio.sleep(think)
+    return results
+
+
+def _report(name: str, results: List[Tuple[float, int]]) -> None:
+    """Print latency percentiles of successful requests and the count of each status."""
+    ok = sorted(latency for latency, status in results if status < 300)
+    statuses = Counter(status for _, status in results)
+    percentiles = (
+        f"p50 {statistics.median(ok):6.0f} ms   p95 {ok[int(len(ok) * 0.95) - 1]:6.0f} ms"
+        if ok
+        else "no successful request".ljust(28)
+    )
+    print(
+        f"    {name:<8} {percentiles}   "
+        + "   ".join(f"{status}: {count}" for status, count in sorted(statuses.items()))
+    )
+
+
+async def _scenario(
+    admission: bool, users: int, flood: int, messages: int, latency: float, capacity: int
+) -> None:
+    """Run the flood and the regular users together and report both."""
+    app = _app(StubSendMessageUseCase(latency, capacity), admission, capacity)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        flooder = uuid4()
+        flooding = asyncio.gather(*(_send(client, flooder) for _ in range(flood)))
+        # Regular users arrive just after the flood
+        await asyncio.sleep(0.01)
+        regular = await asyncio.gather(
+            *(_regular_user(client, messages, latency) for _ in range(users))
+        )
+        flood_results = await flooding
+
+    print("with admission control" if admission else "without admission control")
+    _report("regular", [result for results in regular for result in results])
+    _report("flooder", flood_results)
+    if admission:
+        stats = app.state.admission.stats()
+        print(
+            f"    queue wait p50 {stats['queue_wait_p50_ms']:.0f} ms   "
+            f"p95 {stats['queue_wait_p95_ms']:.0f} ms"
+        )
+
+
+async def main(users: int, flood: int, messages: int, latency: float, capacity: int) -> None:
+    """Run the scenario without, then with admission control."""
+    print(
+        f"{flood} messages at once from one user, {users} users sending {messages} each; "
+        f"LLM {latency * 1000:.0f} ms, {capacity} calls at once"
+    )
+    for admission in (False, True):
+        await _scenario(admission, users, flood, messages, latency, capacity)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--flood", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--capacity", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.flood, args.messages, args.latency, args.capacity))
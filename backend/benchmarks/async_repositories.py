@@ -0,0 +1,88 @@
+"""Concurrent-request throughput of the repositories: blocking vs async client.
+
+Run from ``backend/``:
+
+    PYTHONPATH=. python -m benchmarks.async_repositories --requests 200 --latency 0.02
+
+The "blocking" variant reproduces the previous repositories, which called the
+synchronous ``supabase.Client`` from inside ``async def`` methods and therefore
+serialized every round-trip on the event loop.
+"""
+import argparse
+import asyncio
+import time
+from typing import Optional
+from uuid import UUID, uuid4
+
+from supabase import Client, acreate_client, create_client
+
+from benchmarks.fakes import FakePostgREST
+from src.chatbot.domain.entities.conversation import Conversation
+from src.chatbot.infrastructure.database.supabase_conversation_repository import (
+    SupabaseConversationRepository,
+)
+
+FAKE_KEY = "fake.anon.key"
+
+
+class BlockingConversationRepository:
+    """Previous implementation of ``get_by_id`` on top of the sync client."""
+
+    def __init__(self, client: Client) -> None:
+        """Initialize repository with a synchronous Supabase client."""
+        self.client = client
+
+    async def get_by_id(self, conversation_id: UUID, user_id: UUID) -> Optional[Conversation]:
+        """Get a conversation by ID, blocking the event loop during the request."""
+        result = (
+            self.client.table("conversations")
+            .select("*")
+            .eq("id", str(conversation_id))
+            .eq("user_id", str(user_id))
+            .execute()
+        )
+        return Conversation.from_row(result.data[0]) if result.data else None
+
+
+async def _run(repository: object, conversation: Conversation, requests: int) -> float:
+    """Issue ``requests`` concurrent lookups and return the throughput."""
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            repository.get_by_id(conversation.id, conversation.user_id)  # type: ignore[attr-defined]
+            for _ in range(requests)
+        )
+    )
+    return requests / (time.perf_counter() - started)
+
+
+async def main(requests: int, latency: float) -> None:
+    """Run both variants against the same fake PostgREST server."""
+    conversation = Conversation(id=uuid4(), user_id=uuid4(), title="Benchmark")
+
+    with FakePostgREST(latency=latency) as fake:
+        fake.seed("conversations", [conversation.to_row()])
+
+        blocking = BlockingConversationRepository(create_client(fake.url, FAKE_KEY))
+        async_client = await acreate_client(fake.url, FAKE_KEY)
+        non_blocking = SupabaseConversationRepository(async_client)
+
+        # Warm up connections so the TLS/TCP setup is not part of the measurement
+        await blocking.get_by_id(conversation.id, conversation.user_id)
+        await non_blocking.get_by_id(conversation.id, conversation.user_id)
+
+        blocking_rps = await _run(blocking, conversation, requests)
+        async_rps = await _run(non_blocking, conversation, requests)
+        await async_client.postgrest.aclose()
+
+    print(f"{requests} concurrent get_by_id calls, {latency * 1000:.0f} ms server latency")
+    print(f"  blocking client: {blocking_rps:8.1f} req/s")
+    print(f"  async client:    {async_rps:8.1f} req/s  ({async_rps / blocking_rps:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.latency))
@@ -0,0 +1,92 @@
+"""Per-request overhead of ``get_current_user``: full verification vs cached.
+
+Run from ``backend/``:
+
+    PYTHONPATH=. python -m benchmarks.auth_overhead --requests 20000 --threads 8
+
+Signs a Supabase-like HS256 token with ``SUPABASE_JWT_SECRET`` and resolves it
+repeatedly, first with the verified-token cache cleared before each call, then
+with the cache warm. The warm run is repeated from several threads, as FastAPI
+runs this sync dependency in its threadpool.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+import jwt
+from fastapi.security import HTTPAuthorizationCredentials
+
+from src.chatbot.infrastructure.auth import supabase_auth
+from src.chatbot.infrastructure.auth.supabase_auth import get_current_user
+from src.chatbot.infrastructure.config import settings
+
+
+def _token(expires_in: float) -> str:
+    """Sign a token shaped like the ones issued by Supabase Auth."""
+    now = int(time.time())
+    return jwt.encode(
+        {
+            "sub": str(uuid4()),
+            "email": "user@example.com",
+            "aud": "authenticated",
+            "role": "authenticated",
+            "iat": now,
+            "exp": now + int(expires_in),
+        },
+        settings.supabase_jwt_secret,
+        algorithm="HS256",
+    )
+
+
+def _per_request_us(credentials: HTTPAuthorizationCredentials, requests: int, cold: bool) -> float:
+    """Resolve the same token `requests` times and return microseconds per call."""
+    started = time.perf_counter()
+    for _ in range(requests):
+        if cold:
+            supabase_auth._verified_tokens().clear()
+        get_current_user(credentials)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def main(requests: int, threads: int) -> None:
+    """Compare cold and warm resolution, then check expiry is honoured."""
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=_token(3600))
+
+    cold = _per_request_us(credentials, requests, cold=True)
+    warm = _per_request_us(credentials, requests, cold=False)
+
+    # Every thread hits the same cache entry, contending on its lock
+    with ThreadPoolExecutor(threads) as pool:
+        started = time.perf_counter()
+        list(
+            pool.map(
+                lambda _: _per_request_us(credentials, requests // threads, cold=False),
+                range(threads),
+            )
+        )
+        threaded = (time.perf_counter() - started) / requests * 1e6
+
+    print(f"{requests} requests with the same bearer token")
+    print(f"  full verification  {cold:7.2f} us/request")
+    print(f"  cached             {warm:7.2f} us/request   ({cold / warm:.1f}x)")
+    print(f"  cached, {threads} threads {threaded:7.2f} us/request")
+
+    # A cached token must stop being accepted once it expires
+    short_lived = HTTPAuthorizationCredentials(scheme="Bearer", credentials=_token(1))
+    get_current_user(short_lived)
+    time.sleep(1.1)
+    try:
+        get_current_user(short_lived)
+    except Exception as e:
+        print(f"  expired token rejected after caching: {e}")
+    else:
+        raise AssertionError("expired token was served from the cache")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+    main(args.requests, args.threads)
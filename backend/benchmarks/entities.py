@@ -0,0 +1,114 @@
+"""Memory and construction time of Message entities: Pydantic model vs slotted dataclass.
+
+Run from ``backend/``:
+
+    PYTHONPATH=. python -m benchmarks.entities --messages 100000
+
+Rebuilds a conversation history from PostgREST-shaped rows, as the message
+repository does on every history cache miss, with the previous Pydantic
+``Message`` model and with the current slotted dataclass. Memory is what the
+entities allocate on top of the rows they are built from.
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
+from uuid import UUID, uuid4
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from src.chatbot.domain.entities.message import Message, MessageRole
+
+
+class PydanticMessage(BaseModel):
+    """Previous Message entity."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID = Field(default_factory=uuid4)
+    conversation_id: UUID
+    role: MessageRole
+    content: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+def _rows(count: int) -> List[Dict[str, Any]]:
+    """Rows of one conversation as decoded from a PostgREST response."""
+    conversation_id = str(uuid4())
+    started = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": str(uuid4()),
+            "conversation_id": conversation_id,
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": f"Message {i} " + "lorem ipsum dolor sit amet " * 8,
+            "created_at": (started + timedelta(seconds=i, microseconds=i)).isoformat(),
+        }
+        for i in range(count)
+    ]
+
+
+def _construction_us(build: Callable[[Dict[str, Any]], Any], rows: List[Dict[str, Any]]) -> float:
+    """Return the time to build one entity from a row in microseconds."""
+    started = time.perf_counter()
+    for row in rows:
+        build(row)
+    return (time.perf_counter() - started) / len(rows) * 1e6
+
+
+def _memory_bytes(build: Callable[[Dict[str, Any]], Any], rows: List[Dict[str, Any]]) -> int:
+    """Return the memory held by the entities built from all rows."""
+    gc.collect()
+    tracemalloc.start()
+    entities = [build(row) for row in rows]
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del entities
+    return held
+
+
+def _new_us(build: Callable[[], Any], count: int) -> float:
+    """Return the time to create one new entity with generated defaults in microseconds."""
+    started = time.perf_counter()
+    for _ in range(count):
+        build()
+    return (time.perf_counter() - started) / count * 1e6
+
+
+def main(messages: int) -> None:
+    """Compare both entity types."""
+    rows = _rows(messages)
+    conversation_id = uuid4()
+    variants = {
+        "pydantic": (
+            lambda row: PydanticMessage(**row),
+            lambda: PydanticMessage(
+                conversation_id=conversation_id, role=MessageRole.USER, content="Hello"
+            ),
+        ),
+        "dataclass": (
+            Message.from_row,
+            lambda: Message(
+                conversation_id=conversation_id, role=MessageRole.USER, content="Hello"
+            ),
+        ),
+    }
+
+    print(f"{messages} messages rebuilt from rows")
+    for name, (from_row, new) in variants.items():
+        memory = _memory_bytes(from_row, rows)
+        construction = _construction_us(from_row, rows)
+        creation = _new_us(new, messages)
+        print(
+            f"  {name:<10} {memory / 2**20:7.1f} MiB   from row {construction:5.2f} us   "
+            f"new {creation:5.2f} us"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=100_000)
+    args = parser.parse_args()
+    main(args.messages)
@@ -0,0 +1,477 @@
+"""Local stand-ins for external services used by the benchmarks."""
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+REST_PREFIX = "/rest/v1/"
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    """HTTP server ignoring clients that hang up, e.g. cancelled requests."""
+
+    daemon_threads = True
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+def _coerce(value: str) -> str:
+    """Strip PostgREST quoting from a filter value."""
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1]
+    return value
+
+
+def _matches(row: Dict[str, Any], column: str, expression: str) -> bool:
+    """Evaluate a single PostgREST filter expression against a row."""
+    operator, _, raw = expression.partition(".")
+    value = _coerce(raw)
+    current = row.get(column)
+    current = "" if current is None else str(current)
+
+    if operator == "eq":
+        return current == value
+    if operator == "neq":
+        return current != value
+    if operator == "lt":
+        return current < value
+    if operator == "lte":
+        return current <= value
+    if operator == "gt":
+        return current > value
+    if operator == "gte":
+        return current >= value
+    if operator == "in":
+        return current in [_coerce(v) for v in value.strip("()").split(",")]
+    raise ValueError(f"Unsupported filter operator: {operator}")
+
+
+def _split_conditions(conditions: str) -> List[str]:
+    """Split the body of an ``or=(...)`` filter on commas outside quotes."""
+    parts, current, quoted = [], "", False
+    for char in conditions:
+        if char == '"':
+            quoted = not quoted
+        if char == "," and not quoted:
+            parts.append(current)
+            current = ""
+        else:
+            current += char
+    return parts + [current]
+
+
+def _matches_any(row: Dict[str, Any], conditions: str) -> bool:
+    """Evaluate a flat ``or=(column.op.value,...)`` filter against a row."""
+    for condition in _split_conditions(conditions.strip("()")):
+        column, _, expression = condition.partition(".")
+        if _matches(row, column, expression):
+            return True
+    return False
+
+
+def _filter(row: Dict[str, Any], column: str, expression: str) -> bool:
+    """Evaluate a query-string filter, plain or ``or``, against a row."""
+    if column == "or":
+        return _matches_any(row, expression)
+    return _matches(row, column, expression)
+
+
+def _filters(params: List[tuple]) -> List[tuple]:
+    """Return the filters among the query parameters of a request."""
+    return [(k, v) for k, v in params if k not in ("select", "order", "limit", "offset")]
+
+
+class FakePostgREST:
+    """In-process PostgREST stand-in with configurable per-request latency.
+
+    Serves the subset of the PostgREST protocol used by the repositories
+    (select with ``eq``-style and flat ``or`` filters, ordering, limit/offset
+    and exact counts, insert, update, delete and ``/rpc`` calls) from in-memory
+    tables. Requests
+    are handled on separate threads so concurrent clients overlap like they
+    would against a real server.
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        """Initialize the fake with an artificial latency in seconds."""
+        self.latency = latency
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.rpcs: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to pass as ``SUPABASE_URL``."""
+        assert self._server is not None, "server is not running"
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def seed(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        """Insert rows directly, bypassing HTTP."""
+        with self._lock:
+            self.tables.setdefault(table, []).extend(dict(row) for row in rows)
+
+    def register_rpc(self, name: str, handler: Callable[[Dict[str, Any]], Any]) -> None:
+        """Register a Python callable served at ``/rpc/<name>``."""
+        self.rpcs[name] = handler
+
+    def start(self) -> "FakePostgREST":
+        """Start serving on a random local port."""
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def _respond(self, status: int, payload: Any, count: Optional[int] = None) -> None:
+                body = json.dumps(payload, default=str).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                if count is not None:
+                    self.send_header("Content-Range", f"*/{count}")
+                if self.command == "HEAD":
+                    body = b""
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _body(self) -> Any:
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length)) if length else None
+
+            def _dispatch(self, method: str) -> None:
+                if fake.latency:
+                    time.sleep(fake.latency)
+                with fake._lock:
+                    fake.request_count += 1
+                parts = urlsplit(self.path)
+                if not parts.path.startswith(REST_PREFIX):
+                    self._respond(404, {"message": "not found"})
+                    return
+                resource = parts.path[len(REST_PREFIX):]
+                params = parse_qsl(parts.query, keep_blank_values=True)
+                count = None
+                try:
+                    status, payload = fake.handle(method, resource, params, self._body())
+                    if "count=exact" in (self.headers.get("Prefer") or ""):
+                        count = fake.count(resource, params)
+                except Exception as exc:  # surfaced to the client as a PostgREST error
+                    status, payload = 400, {"message": str(exc), "code": "FAKE"}
+                self._respond(status, payload, count)
+
+            def do_GET(self) -> None:
+                self._dispatch("GET")
+
+            def do_HEAD(self) -> None:
+                self._dispatch("GET")
+
+            def do_POST(self) -> None:
+                self._dispatch("POST")
+
+            def do_PATCH(self) -> None:
+                self._dispatch("PATCH")
+
+            def do_DELETE(self) -> None:
+                self._dispatch("DELETE")
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakePostgREST":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def count(self, resource: str, params: List[tuple]) -> int:
+        """Count the rows of a table matching the filters of a request."""
+        filters = _filters(params)
+        with self._lock:
+            table = self.tables.get(resource, [])
+            return sum(1 for row in table if all(_filter(row, k, v) for k, v in filters))
+
+    def handle(
+        self, method: str, resource: str, params: List[tuple], body: Any
+    ) -> tuple:
+        """Apply a PostgREST request to the in-memory tables."""
+        if resource.startswith("rpc/"):
+            handler = self.rpcs[resource[len("rpc/"):]]
+            return 200, handler(body or {})
+
+        filters = _filters(params)
+        options = dict(params)
+
+        with self._lock:
+            table = self.tables.setdefault(resource, [])
+
+            if method == "POST":
+                rows = body if isinstance(body, list) else [body]
+                table.extend(dict(row) for row in rows)
+                return 201, rows
+
+            matched = [row for row in table if all(_filter(row, k, v) for k, v in filters)]
+
+            if method == "PATCH":
+                for row in matched:
+                    row.update(body)
+                return 200, [dict(row) for row in matched]
+
+            if method == "DELETE":
+                self.tables[resource] = [row for row in table if row not in matched]
+                return 200, matched
+
+        for clause in reversed(options.get("order", "").split(",")):
+            if clause:
+                column, _, direction = clause.partition(".")
+                matched.sort(
+                    key=lambda row: str(row.get(column)), reverse=direction.startswith("desc")
+                )
+
+        offset = int(options.get("offset", 0))
+        limit = options.get("limit")
+        end = offset + int(limit) if limit is not None else None
+        return 200, [dict(row) for row in matched[offset:end]]
+
+
+def begin_turn(fake: FakePostgREST, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """In-memory stand-in for the `begin_turn` SQL function."""
+    conversation_id = params["p_conversation_id"]
+    with fake._lock:
+        conversation = next(
+            (
+                row
+                for row in fake.tables.get("conversations", [])
+                if row["id"] == conversation_id and row["user_id"] == params["p_user_id"]
+            ),
+            None,
+        )
+        if conversation is None:
+            return None
+
+        messages = fake.tables.setdefault("messages", [])
+        history = sorted(
+            (row for row in messages if row["conversation_id"] == conversation_id),
+            key=lambda row: row["created_at"],
+        )[-params["p_history_limit"]:]
+        summary = next(
+            (
+                row
+                for row in fake.tables.get("conversation_summaries", [])
+                if row["conversation_id"] == conversation_id
+            ),
+            None,
+        )
+        messages.append(
+            {
+                "id": params["p_message_id"],
+                "conversation_id": conversation_id,
+                "role": "user",
+                "content": params["p_content"],
+                "created_at": params["p_created_at"],
+            }
+        )
+    return {"conversation": conversation, "history": history, "summary": summary}
+
+
+def _echo_reply(messages: List[Dict[str, Any]]) -> str:
+    """Default fake completion: a canned answer mentioning the last message."""
+    return f"Here is an answer about: {messages[-1]['content'] if messages else ''}"
+
+
+class FakeOpenAI:
+    """In-process OpenAI-compatible chat completions server.
+
+    Answers ``POST .../chat/completions``, streamed as Server-Sent Events or
+    not, and ``GET .../models``. ``latency`` delays the first byte of every
+    completion and ``chunk_delay`` each streamed chunk (word) after it,
+    standing in for model time to first token and generation speed; a
+    non-streamed completion is sent once all its words are generated.
+    Faults can be injected: a ``slow_rate`` fraction of completions wait
+    ``slow_latency`` instead of ``latency``, and an ``error_rate`` fraction
+    fail with a 502. All of these can be changed while the server runs.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        chunk_delay: float = 0.0,
+        reply: Callable[[List[Dict[str, Any]]], str] = _echo_reply,
+        slow_rate: float = 0.0,
+        slow_latency: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        """Initialize the fake with its timings, faults and a function producing replies."""
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.reply = reply
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.request_count = 0
+        self.error_count = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to pass as ``OPENROUTER_BASE_URL``."""
+        assert self._server is not None, "server is not running"
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeOpenAI":
+        """Start serving on a random local port."""
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def _respond(self, status: int, payload: Any) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _write_chunk(self, data: bytes) -> None:
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def do_GET(self) -> None:
+                self._respond(200, {"object": "list", "data": [{"id": "fake", "object": "model"}]})
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length)
+                if len(body) < length:
+                    # The client hung up, e.g. a cancelled request
+                    return
+                request = json.loads(body) if length else {}
+                if not self.path.endswith("/chat/completions"):
+                    self._respond(404, {"error": {"message": "not found"}})
+                    return
+
+                with fake._lock:
+                    fake.request_count += 1
+                    slow = fake._random.random() < fake.slow_rate
+                    failed = fake._random.random() < fake.error_rate
+                    if failed:
+                        fake.error_count += 1
+                latency = fake.slow_latency if slow else fake.latency
+                if latency:
+                    time.sleep(latency)
+                if failed:
+                    self._respond(502, {"error": {"message": "upstream error", "code": 502}})
+                    return
+
+                messages = request.get("messages", [])
+                text = fake.reply(messages)
+                # Words stand in for tokens
+                prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in messages)
+                usage = {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(text.split()),
+                    "total_tokens": prompt_tokens + len(text.split()),
+                }
+                base = {
+                    "id": f"chatcmpl-{fake.request_count}",
+                    "created": int(time.time()),
+                    "model": request.get("model", "fake"),
+                }
+                if not request.get("stream"):
+                    if fake.chunk_delay:
+                        time.sleep(fake.chunk_delay * (len(text.split(" ")) - 1))
+                    self._respond(
+                        200,
+                        {
+                            **base,
+                            "object": "chat.completion",
+                            "choices": [
+                                {
+                                    "index": 0,
+                                    "message": {"role": "assistant", "content": text},
+                                    "finish_reason": "stop",
+                                }
+                            ],
+                            "usage": usage,
+                        },
+                    )
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                words = text.split(" ")
+                for i, word in enumerate(words):
+                    if i and fake.chunk_delay:
+                        time.sleep(fake.chunk_delay)
+                    delta = {"content": word if i == 0 else f" {word}"}
+                    if i == 0:
+                        delta["role"] = "assistant"
+                    chunk = {
+                        **base,
+                        "object": "chat.completion.chunk",
+                        "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+                    }
+                    self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+                done = {
+                    **base,
+                    "object": "chat.completion.chunk",
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                }
+                self._write_chunk(f"data: {json.dumps(done)}\n\n".encode())
+                if (request.get("stream_options") or {}).get("include_usage"):
+                    final = {**base, "object": "chat.completion.chunk", "choices": [], "usage": usage}
+                    self._write_chunk(f"data: {json.dumps(final)}\n\n".encode())
+                self._write_chunk(b"data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+        self._server = _QuietHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeOpenAI":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
@@ -0,0 +1,141 @@
+"""Streams in flight when the API is told to stop, with and without graceful drain.
+
+Run from ``backend/``:
+
+    PYTHONPATH=. python -m benchmarks.graceful_drain --streams 20 --workers 2
+
+The API runs with the production launcher ``main.py`` against local fakes of
+Supabase and OpenRouter, whose answers stream ``--words`` words at
+``--tokens-per-second``. Once ``--streams`` streamed answers have started,
+the launcher gets SIGTERM, like on a deploy. With the graceful timeout the
+workers stop accepting connections and finish the streams in flight; with
+``APP_GRACEFUL_TIMEOUT=0`` they are cut. The report gives the streams that
+ended with their ``done`` event, the streams cut, what became of a request
+sent during the drain, and the time the launcher took to exit.
+"""
+import argparse
+import asyncio
+import signal
+import time
+from collections import Counter
+from typing import Dict
+
+import httpx
+
+from benchmarks.fakes import FakeOpenAI, FakePostgREST, begin_turn
+from benchmarks.load_test import free_port, start_api, user_token, wait_ready
+
+
+async def _stream(client: httpx.AsyncClient, started: asyncio.Event) -> str:
+    """Stream an answer in a new conversation, returning how it ended."""
+    headers = {"Authorization": f"Bearer {user_token()}"}
+    try:
+        response = await client.post(
+            "/api/v1/conversations", json={"title": "Drain"}, headers=headers
+        )
+        response.raise_for_status()
+        url = f"/api/v1/conversations/{response.json()['id']}/messages/stream"
+        async with client.stream(
+            "POST", url, json={"content": "How do I reset my password?"}, headers=headers
+        ) as response:
+            if not response.is_success:
+                return str(response.status_code)
+            async for line in response.aiter_lines():
+                if line == "event: delta":
+                    started.set()
+                elif line == "event: done":
+                    return "done"
+                elif line == "event: error":
+                    return "error event"
+    except httpx.HTTPError as e:
+        return f"cut ({type(e).__name__})"
+    finally:
+        # Never leave the scenario waiting for a stream that failed early
+        started.set()
+    return "cut"
+
+
+async def _late_request(port: int) -> str:
+    """Send a request on a new connection, returning what became of it."""
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=2) as client:
+            return f"answered {(await client.get('/health')).status_code}"
+    except httpx.ConnectError:
+        return "refused"
+    except (httpx.ReadError, httpx.RemoteProtocolError):
+        return "reset"
+    except httpx.TimeoutException:
+        return "not accepted"
+    except httpx.HTTPError as e:
+        return type(e).__name__
+
+
+async def _scenario(args: argparse.Namespace, graceful_timeout: float, urls: Dict[str, str]) -> None:
+    """Start the API, start the streams, stop the API halfway and report."""
+    port = free_port()
+    api = start_api(
+        port,
+        args.workers,
+        {
+            "SUPABASE_URL": urls["supabase"],
+            "OPENROUTER_BASE_URL": urls["llm"],
+            "APP_GRACEFUL_TIMEOUT": str(graceful_timeout),
+        },
+    )
+    try:
+        limits = httpx.Limits(max_connections=args.streams)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60
+        ) as client:
+            await wait_ready(client, api)
+            started = [asyncio.Event() for _ in range(args.streams)]
+            streams = [asyncio.create_task(_stream(client, event)) for event in started]
+            await asyncio.gather(*(event.wait() for event in started))
+
+            stopped_at = time.perf_counter()
+            api.send_signal(signal.SIGTERM)
+            # Let the workers get the signal before trying a new connection
+            await asyncio.sleep(0.5)
+            late = await _late_request(port)
+            outcomes = Counter(await asyncio.gather(*streams))
+            await asyncio.to_thread(api.wait)
+            exited_after = time.perf_counter() - stopped_at
+    finally:
+        if api.poll() is None:
+            api.kill()
+            api.wait()
+
+    print(f"graceful timeout {graceful_timeout:g} s")
+    print(
+        "    streams  "
+        + "   ".join(f"{outcome}: {count}" for outcome, count in sorted(outcomes.items()))
+    )
+    print(f"    request during the drain: {late}")
+    print(f"    launcher exited {exited_after:.1f} s after SIGTERM (status {api.returncode})")
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Run the scenario without, then with graceful drain."""
+    stream_seconds = args.words / args.tokens_per_second
+    print(
+        f"{args.streams} streams of {stream_seconds:.1f} s over {args.workers} workers, "
+        "SIGTERM once they have all started"
+    )
+    answer = " ".join(["word"] * args.words)
+    with FakePostgREST() as database, FakeOpenAI(
+        chunk_delay=1 / args.tokens_per_second, reply=lambda messages: answer
+    ) as llm:
+        database.register_rpc("begin_turn", lambda params: begin_turn(database, params))
+        urls = {"supabase": database.url, "llm": llm.url}
+        for graceful_timeout in (0.0, args.graceful_timeout):
+            await _scenario(args, graceful_timeout, urls)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--streams", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--words", type=int, default=100)
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--graceful-timeout", type=float, default=25.0)
+    asyncio.run(main(parser.parse_args()))
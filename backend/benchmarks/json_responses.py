@@ -0,0 +1,147 @@
+"""CPU cost of listing a 1,000-message conversation: validated vs orjson responses.
+
+Run from ``backend/``:
+
+    PYTHONPATH=. python -m benchmarks.json_responses --messages 1000 --requests 200
+
+Serves the same PostgREST-shaped rows through ``GET .../messages`` twice: with
+the previous route body (entities re-validated as ``MessageResponse`` models,
+then validated and encoded again by FastAPI against ``response_model``) and
+with the current route, which serializes the entities once with orjson. Both
+build entities from rows like the repository does; authentication and the
+database are stubbed out, so the difference is response handling alone.
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from uuid import UUID, uuid4
+
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from src.chatbot.domain.entities.message import Message
+from src.chatbot.domain.entities.page_cursor import PageCursor
+from src.chatbot.domain.entities.user import User
+from src.chatbot.infrastructure.auth.supabase_auth import get_current_user
+from src.chatbot.presentation.api.dependencies import get_get_conversation_messages_use_case
+from src.chatbot.presentation.api.responses import EntityListResponse
+from src.chatbot.presentation.api.routes import router
+from src.chatbot.presentation.schemas.message import MessageResponse
+
+
+def _rows(conversation_id: UUID, count: int) -> List[Dict[str, Any]]:
+    """Rows as decoded from a PostgREST response."""
+    started = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": str(uuid4()),
+            "conversation_id": str(conversation_id),
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": f"Message {i} " + "lorem ipsum dolor sit amet " * 8,
+            "created_at": (started + timedelta(seconds=i, microseconds=i)).isoformat(),
+        }
+        for i in range(count)
+    ]
+
+
+class StubGetConversationMessagesUseCase:
+    """Use case returning entities built from fixed rows, like the repository."""
+
+    def __init__(self, rows: List[Dict[str, Any]]) -> None:
+        """Initialize the use case with the rows to serve."""
+        self.rows = rows
+
+    async def execute(
+        self,
+        conversation_id: UUID,
+        limit: int = 100,
+        offset: int = 0,
+        after: Optional[PageCursor] = None,
+    ) -> List[Message]:
+        """Build the entities of the requested page."""
+        return [Message.from_row(row) for row in self.rows[offset : offset + limit]]
+
+
+def _previous_router(use_case: StubGetConversationMessagesUseCase) -> APIRouter:
+    """Route with the previous response handling."""
+    previous = APIRouter()
+
+    @previous.get(
+        "/previous/conversations/{conversation_id}/messages",
+        response_model=List[MessageResponse],
+    )
+    async def get_conversation_messages(
+        conversation_id: UUID,
+        current_user: User = Depends(get_current_user),
+        limit: int = 100,
+        offset: int = 0,
+    ) -> List[MessageResponse]:
+        messages = await use_case.execute(conversation_id, limit=limit, offset=offset)
+        return [MessageResponse.model_validate(m) for m in messages]
+
+    return previous
+
+
+def _cpu_per_request(client: TestClient, url: str, requests: int) -> float:
+    """Return process CPU time per request in milliseconds."""
+    client.get(url)  # warm up
+    started = time.process_time()
+    for _ in range(requests):
+        response = client.get(url)
+        assert response.status_code == 200, response.text
+    return (time.process_time() - started) / requests * 1000
+
+
+def main(messages: int, requests: int) -> None:
+    """Compare both response paths in-process."""
+    conversation_id = uuid4()
+    rows = _rows(conversation_id, messages)
+    use_case = StubGetConversationMessagesUseCase(rows)
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1")
+    app.include_router(_previous_router(use_case), prefix="/api/v1")
+    app.dependency_overrides[get_current_user] = lambda: User(id=uuid4(), email="")
+    app.dependency_overrides[get_get_conversation_messages_use_case] = lambda: use_case
+    client = TestClient(app)
+
+    query = f"conversations/{conversation_id}/messages?limit={messages}"
+    previous_url, current_url = f"/api/v1/previous/{query}", f"/api/v1/{query}"
+    assert json.loads(client.get(previous_url).content) == json.loads(
+        client.get(current_url).content
+    ), "both paths must return the same JSON"
+
+    previous = _cpu_per_request(client, previous_url, requests)
+    current = _cpu_per_request(client, current_url, requests)
+
+    # Rows to bytes alone, without HTTP handling
+    entities = [Message.from_row(row) for row in rows]
+    started = time.perf_counter()
+    for _ in range(requests):
+        EntityListResponse(entities, MessageResponse)
+    serialization = (time.perf_counter() - started) / requests * 1000
+    started = time.perf_counter()
+    for _ in range(requests):
+        [Message.from_row(row) for row in rows]
+    construction = (time.perf_counter() - started) / requests * 1000
+
+    print(f"GET messages, {messages} messages per response, {requests} requests")
+    print(f"  previous (validated 3x)  {previous:6.2f} ms CPU/request")
+    print(
+        f"  orjson                   {current:6.2f} ms CPU/request   "
+        f"({previous / current:.1f}x)"
+    )
+    print(
+        f"    rows -> entities {construction:6.2f} ms, "
+        f"entities -> bytes {serialization:5.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    main(args.messages, args.requests)
@@ -0,0 +1,150 @@
+"""Latency of asymmetric JWT verification while the JWKS rotates.
+
+Run from ``backend/``:
+
+    PYTHONPATH=. python -m benchmarks.jwks_auth --requests 2000 --rotate-every 0.05
+
+Serves a key set from a local JWKS file and verifies RS256 and ES256 tokens
+through ``get_current_user`` with the verified-token cache cleared, so every
+call checks a signature. The ES256 run is then repeated while a background
+task keeps rotating keys the way Supabase does: a standby key is published one
+rotation before it starts signing, and the oldest key is retired. Latency
+should not move, since lookups never wait for the key set to be fetched.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from uuid import uuid4
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from src.chatbot.infrastructure.auth import supabase_auth
+from src.chatbot.infrastructure.auth.jwks import JWKSKeySet
+from src.chatbot.infrastructure.auth.supabase_auth import get_current_user
+
+SigningKey = Tuple[str, str, Any]  # (kid, algorithm, private key)
+
+
+def _new_key(algorithm: str) -> SigningKey:
+    """Generate a signing key for an algorithm."""
+    if algorithm == "RS256":
+        private_key: Any = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        private_key = ec.generate_private_key(ec.SECP256R1())
+    return f"{algorithm.lower()}-{uuid4().hex[:8]}", algorithm, private_key
+
+
+def _jwk(key: SigningKey) -> Dict[str, Any]:
+    """Public JWK of a signing key."""
+    kid, algorithm, private_key = key
+    if algorithm == "RS256":
+        jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    else:
+        jwk = json.loads(jwt.algorithms.ECAlgorithm.to_jwk(private_key.public_key()))
+    return {**jwk, "kid": kid, "alg": algorithm, "use": "sig"}
+
+
+def _publish(path: Path, keys: List[SigningKey]) -> None:
+    """Atomically replace the JWKS file."""
+    staging = path.with_suffix(".tmp")
+    staging.write_text(json.dumps({"keys": [_jwk(key) for key in keys]}))
+    staging.replace(path)
+
+
+def _credentials(key: SigningKey) -> HTTPAuthorizationCredentials:
+    """Bearer credentials for a token signed with a key."""
+    kid, algorithm, private_key = key
+    now = int(time.time())
+    token = jwt.encode(
+        {"sub": str(uuid4()), "aud": "authenticated", "iat": now, "exp": now + 3600},
+        private_key,
+        algorithm=algorithm,
+        headers={"kid": kid},
+    )
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def _verify_many(keys: List[SigningKey], requests: int) -> Tuple[List[float], int]:
+    """Verify tokens signed with the active key, returning latencies and rejections."""
+    latencies, rejected = [], 0
+    for _ in range(requests):
+        credentials = _credentials(keys[-2] if len(keys) > 1 else keys[-1])
+        supabase_auth._verified_tokens().clear()
+        started = time.perf_counter()
+        try:
+            get_current_user(credentials)
+        except HTTPException:
+            rejected += 1
+        latencies.append((time.perf_counter() - started) * 1e6)
+    return latencies, rejected
+
+
+def _report(name: str, latencies: List[float], rejected: int) -> None:
+    """Print latency percentiles."""
+    ordered = sorted(latencies)
+    p99 = ordered[int(len(ordered) * 0.99) - 1]
+    print(
+        f"  {name:<22} p50 {statistics.median(ordered):7.1f} us   p99 {p99:7.1f} us   "
+        f"rejected {rejected}"
+    )
+
+
+async def main(requests: int, rotate_every: float) -> None:
+    """Verify tokens with a steady key set, then while it rotates."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "jwks.json"
+        rsa_key, ec_keys = _new_key("RS256"), [_new_key("ES256"), _new_key("ES256")]
+        _publish(path, [rsa_key, *ec_keys])
+
+        key_set = JWKSKeySet(
+            str(path), refresh_interval=rotate_every, min_refresh_interval=rotate_every / 2
+        )
+        supabase_auth.jwks = key_set
+        await key_set.start()
+
+        print(f"{requests} verifications per run, verified-token cache disabled")
+        _report("RS256", *await asyncio.to_thread(_verify_many, [rsa_key], requests))
+        _report("ES256", *await asyncio.to_thread(_verify_many, ec_keys, requests))
+
+        rotations = 0
+
+        async def rotate() -> None:
+            nonlocal rotations
+            while True:
+                await asyncio.sleep(rotate_every)
+                ec_keys.append(_new_key("ES256"))
+                del ec_keys[:-3]
+                _publish(path, [rsa_key, *ec_keys])
+                rotations += 1
+
+        rotation = asyncio.create_task(rotate())
+        result = await asyncio.to_thread(_verify_many, ec_keys, requests)
+        rotation.cancel()
+        _report(f"ES256, {rotations} rotations", *result)
+
+        # A token naming a key that is not loaded yet is rejected without waiting
+        unknown = _credentials(_new_key("ES256"))
+        started = time.perf_counter()
+        try:
+            get_current_user(unknown)
+        except HTTPException as e:
+            elapsed = (time.perf_counter() - started) * 1e6
+            print(f"  unknown kid            rejected in {elapsed:.1f} us ({e.detail})")
+
+        await key_set.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rotate-every", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.rotate_every))
@@ -0,0 +1,165 @@
+"""Page latency by depth: offset vs keyset (cursor) pagination.
+
+Run from ``backend/``:
+
+    PYTHONPATH=. python -m benchmarks.keyset_pagination --rows 500000 --page-size 50
+
+First walks a conversation page by page through ``SupabaseMessageRepository``
+against the fake PostgREST server, checking that cursors visit every message
+exactly once even when timestamps collide. Then times single pages at growing
+depths on a large synthetic table. The fake server scans lists in Python, so
+that part runs the same two query shapes on SQLite with the index of migration
+002, whose planner, like Postgres, walks and discards every skipped row for
+``OFFSET`` but seeks straight to the cursor.
+"""
+import argparse
+import asyncio
+import sqlite3
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+from uuid import uuid4
+
+from supabase import acreate_client
+
+from benchmarks.fakes import FakePostgREST
+from src.chatbot.domain.entities.message import Message, MessageRole
+from src.chatbot.domain.entities.page_cursor import PageCursor
+from src.chatbot.infrastructure.database.supabase_message_repository import (
+    SupabaseMessageRepository,
+)
+
+FAKE_KEY = "fake.anon.key"
+REPEAT = 20
+
+OFFSET_QUERY = """
+    SELECT * FROM messages
+    WHERE conversation_id = ?
+    ORDER BY created_at, id
+    LIMIT ? OFFSET ?
+"""
+
+# Same shape as the PostgREST filters built by `resume_after`
+KEYSET_QUERY = """
+    SELECT * FROM messages
+    WHERE conversation_id = ? AND created_at >= ? AND (created_at > ? OR id > ?)
+    ORDER BY created_at, id
+    LIMIT ?
+"""
+
+
+async def check_cursor_walk(messages: int, page_size: int) -> None:
+    """Page through a conversation with cursors and check nothing is skipped or repeated."""
+    conversation_id = uuid4()
+    started = datetime(2024, 1, 1)
+    # Three messages per timestamp, so pages regularly end in the middle of a tie
+    rows = [
+        Message(
+            conversation_id=conversation_id,
+            role=MessageRole.USER,
+            content=f"Message {i}",
+            created_at=started + timedelta(seconds=i // 3),
+        ).to_row()
+        for i in range(messages)
+    ]
+
+    with FakePostgREST() as fake:
+        fake.seed("messages", rows)
+        client = await acreate_client(fake.url, FAKE_KEY)
+        repository = SupabaseMessageRepository(client)
+
+        seen: List[str] = []
+        after: Optional[PageCursor] = None
+        while True:
+            page = await repository.list_by_conversation(
+                conversation_id, limit=page_size, after=after
+            )
+            seen.extend(str(m.id) for m in page)
+            if len(page) < page_size:
+                break
+            after = PageCursor.after(page[-1])
+
+        await client.postgrest.aclose()
+
+    expected = [row["id"] for row in sorted(rows, key=lambda r: (r["created_at"], r["id"]))]
+    assert seen == expected, "cursor walk skipped or repeated messages"
+    print(f"Cursor walk: {messages} messages in pages of {page_size}, none skipped or repeated")
+
+
+def _build_table(rows: int) -> sqlite3.Connection:
+    """Create an in-memory messages table holding one large conversation."""
+    db = sqlite3.connect(":memory:")
+    db.execute(
+        "CREATE TABLE messages ("
+        "id TEXT PRIMARY KEY, conversation_id TEXT, role TEXT, content TEXT, created_at TEXT)"
+    )
+    started = datetime(2024, 1, 1)
+    conversation_id = str(uuid4())
+    db.executemany(
+        "INSERT INTO messages VALUES (?, ?, 'user', ?, ?)",
+        (
+            (
+                str(uuid4()),
+                conversation_id,
+                f"Message {i}",
+                (started + timedelta(milliseconds=i)).isoformat(),
+            )
+            for i in range(rows)
+        ),
+    )
+    db.execute(
+        "CREATE INDEX idx_messages_conversation_created "
+        "ON messages(conversation_id, created_at DESC)"
+    )
+    db.execute("ANALYZE")
+    return db
+
+
+def _time(query: Callable[[], list]) -> float:
+    """Return the median latency of a query in milliseconds."""
+    samples = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        query()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def compare_depths(rows: int, page_size: int) -> None:
+    """Time one page at growing depths with OFFSET and with a cursor."""
+    db = _build_table(rows)
+    conversation_id, = db.execute("SELECT conversation_id FROM messages LIMIT 1").fetchone()
+    ordered = db.execute(
+        "SELECT created_at, id FROM messages ORDER BY created_at, id"
+    ).fetchall()
+
+    print(f"\n{rows} messages, pages of {page_size} (SQLite, median of {REPEAT})")
+    print(f"  {'depth':>9}   {'offset':>10}   {'cursor':>10}")
+    depth = 0
+    while depth < rows:
+        created_at, last_id = ordered[depth - 1] if depth else ("", "")
+        offset_ms = _time(
+            lambda: db.execute(OFFSET_QUERY, (conversation_id, page_size, depth)).fetchall()
+        )
+        keyset_ms = _time(
+            lambda: db.execute(
+                KEYSET_QUERY, (conversation_id, created_at, created_at, last_id, page_size)
+            ).fetchall()
+        )
+        print(f"  {depth:>9}   {offset_ms:7.2f} ms   {keyset_ms:7.2f} ms")
+        depth = depth * 10 if depth else page_size * 2
+
+
+async def main(rows: int, page_size: int) -> None:
+    """Check cursor correctness, then compare page latency by depth."""
+    await check_cursor_walk(min(rows, 1000), page_size)
+    compare_depths(rows, page_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.page_size))
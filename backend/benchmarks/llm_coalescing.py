@@ -0,0 +1,100 @@
+"""Upstream calls and latency of a burst of identical questions, with and without coalescing.
+
+Run from ``backend/``:
+
+    PYTHONPATH=. python -m benchmarks.llm_coalescing --users 50 --spread 0.5 --latency 0.3
+
+Users arrive at random over ``--spread`` seconds and stream the answer to one
+of a few FAQ prompts from a fake OpenAI-compatible server, which takes
+``--latency`` to the first token then ``--chunk-delay`` per word. The response
+cache is off, so only concurrent calls can be shared: with coalescing, users
+asking a question whose answer is already streaming follow that call, getting
+the words received so far at once, then the rest as they arrive.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import List, Tuple
+
+from benchmarks.fakes import FakeOpenAI
+from src.chatbot.infrastructure.config import settings
+from src.chatbot.infrastructure.langchain.chatbot_service import ChatbotService
+
+
+def _reply(messages: List[dict]) -> str:
+    """Fake completion of about 40 words."""
+    return f"About {messages[-1]['content']}: " + "here is what you need to do. " * 6
+
+
+async def _user(
+    service: ChatbotService, prompt: str, delay: float
+) -> Tuple[float, float, str]:
+    """Stream one answer, returning time to first chunk, total time and the text."""
+    await asyncio.sleep(delay)
+    started = time.perf_counter()
+    first = None
+    chunks = []
+    async for chunk in service.stream_response(prompt, []):
+        if first is None:
+            first = time.perf_counter() - started
+        chunks.append(chunk)
+    return first, time.perf_counter() - started, "".join(chunks)
+
+
+async def _burst(
+    fake: FakeOpenAI, coalesce: bool, arrivals: List[Tuple[str, float]]
+) -> None:
+    """Run one burst and print its upstream calls and latencies."""
+    service = ChatbotService(coalesce_requests=coalesce)
+    calls_before = fake.request_count
+
+    results = await asyncio.gather(
+        *(_user(service, prompt, delay) for prompt, delay in arrivals)
+    )
+    await service.aclose()
+
+    ttft = sorted(first * 1000 for first, _, _ in results)
+    total = sorted(elapsed * 1000 for _, elapsed, _ in results)
+    complete = sum(
+        text == _reply([{"content": prompt}])
+        for (prompt, _), (_, _, text) in zip(arrivals, results)
+    )
+    print(
+        f"  {'coalesced' if coalesce else 'independent':<12} "
+        f"upstream calls {fake.request_count - calls_before:3d}   "
+        f"first chunk p50 {statistics.median(ttft):5.0f} ms   "
+        f"total p50 {statistics.median(total):5.0f} ms   "
+        f"p95 {total[int(len(total) * 0.95) - 1]:5.0f} ms   "
+        f"complete answers {complete}/{len(results)}"
+    )
+
+
+async def main(
+    users: int, prompts: int, spread: float, latency: float, chunk_delay: float
+) -> None:
+    """Replay the same burst of users without, then with coalescing."""
+    rng = random.Random(42)
+    questions = [f"FAQ question {i}" for i in range(prompts)]
+    arrivals = [(rng.choice(questions), rng.uniform(0, spread)) for _ in range(users)]
+
+    with FakeOpenAI(latency=latency, chunk_delay=chunk_delay, reply=_reply) as fake:
+        settings.openrouter_base_url = fake.url
+        print(
+            f"{users} users over {spread * 1000:.0f} ms, {prompts} prompts, "
+            f"{latency * 1000:.0f} ms to first token, {chunk_delay * 1000:.0f} ms per word"
+        )
+        for coalesce in (False, True):
+            await _burst(fake, coalesce, arrivals)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--prompts", type=int, default=3)
+    parser.add_argument("--spread", type=float, default=0.5)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--chunk-delay", type=float, default=0.01)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.prompts, args.spread, args.latency, args.chunk_delay))
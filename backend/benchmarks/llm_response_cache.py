@@ -0,0 +1,96 @@
+"""Latency and upstream calls of ChatbotService with and without the response cache.
+
+Run from ``backend/``:
+
+    PYTHONPATH=. python -m benchmarks.llm_response_cache --requests 300 --latency 0.05
+
+Replays first messages drawn from a skewed (Zipf-like) set of FAQ prompts,
+with random whitespace variations, against a fake OpenAI-compatible server.
+The cached run uses the memory tier and a SQLite file; a last run simulates a
+restarted worker whose memory tier is empty but whose SQLite file is warm.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from benchmarks.fakes import FakeOpenAI
+from src.chatbot.infrastructure.cache.response import ResponseCache, SQLiteResponseStore
+from src.chatbot.infrastructure.config import settings
+from src.chatbot.infrastructure.langchain.chatbot_service import ChatbotService
+
+
+def _workload(requests: int, prompts: int, seed: int = 42) -> List[str]:
+    """First messages following a Zipf-like popularity, some with extra whitespace."""
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, prompts + 1)]
+    questions = [f"How do I reset my password for account type {i}?" for i in range(prompts)]
+    workload = []
+    for question in rng.choices(questions, weights=weights, k=requests):
+        if rng.random() < 0.2:
+            question = f"  {question.replace(' ', '  ')} "
+        workload.append(question)
+    return workload
+
+
+async def _run(service: ChatbotService, workload: List[str]) -> List[float]:
+    """Answer the workload one message at a time and return latencies in milliseconds."""
+    latencies = []
+    for message in workload:
+        started = time.perf_counter()
+        await service.generate_response(message, [])
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def _report(
+    name: str, latencies: List[float], upstream: int, cache: Optional[ResponseCache]
+) -> None:
+    """Print latency percentiles, upstream calls and the hit ratio."""
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    hit_ratio = f"{cache.stats()['hit_ratio']:6.1%}" if cache else "     -"
+    print(
+        f"  {name:<14} mean {statistics.mean(ordered):6.1f} ms   p95 {p95:6.1f} ms   "
+        f"upstream calls {upstream:4d}   hit ratio {hit_ratio}"
+    )
+
+
+async def main(requests: int, prompts: int, latency: float) -> None:
+    """Run the workload without cache, with a cold cache, then after a restart."""
+    workload = _workload(requests, prompts)
+
+    with FakeOpenAI(latency=latency) as fake, tempfile.TemporaryDirectory() as directory:
+        settings.openrouter_base_url = fake.url
+        path = str(Path(directory) / "llm_responses.sqlite3")
+        print(
+            f"{requests} first messages over {prompts} prompts, "
+            f"{latency * 1000:.0f} ms LLM latency"
+        )
+
+        runs = [
+            ("no cache", None),
+            ("cache", ResponseCache(1000, ttl=3600, store=SQLiteResponseStore(path))),
+            ("after restart", ResponseCache(1000, ttl=3600, store=SQLiteResponseStore(path))),
+        ]
+        for name, cache in runs:
+            service = ChatbotService(response_cache=cache)
+            calls_before = fake.request_count
+            latencies = await _run(service, workload)
+            _report(name, latencies, fake.request_count - calls_before, cache)
+            await service.aclose()
+            if cache:
+                cache.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--prompts", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.prompts, args.latency))
@@ -0,0 +1,167 @@
+"""Tail latency of LLM calls with one endpoint vs the router with failover and hedging.
+
+Run from ``backend/``:
+
+    PYTHONPATH=. python -m benchmarks.llm_router --requests 400 --concurrency 8
+
+Two fake OpenAI-compatible providers stand in for OpenRouter upstreams: the
+primary answers in ``--latency`` but a ``--slow-rate`` fraction of its calls
+take ``--slow-latency``; the secondary is steadier but slower. Scenarios:
+
+- tail: calls go to the primary only, without hedging, then through the
+  router, which hedges calls slower than the primary's p95 on the secondary;
+- slowdown: halfway through, the primary becomes slower than the secondary,
+  and the router moves traffic over;
+- errors: a fraction of the primary's calls fail, and the router fails over.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Callable, List, Optional, Tuple
+
+from benchmarks.fakes import FakeOpenAI
+from src.chatbot.infrastructure.config import LLMEndpointSettings, settings
+from src.chatbot.infrastructure.langchain.chatbot_service import ChatbotService
+
+
+async def _run(
+    service: ChatbotService,
+    requests: int,
+    concurrency: int,
+    halfway: Optional[Callable[[], None]] = None,
+) -> Tuple[List[float], int]:
+    """Send distinct prompts from concurrent users, returning latencies (ms) and failures."""
+    latencies: List[float] = []
+    failures = 0
+    prompts = iter(range(requests))
+
+    async def user() -> None:
+        nonlocal failures
+        for i in prompts:
+            if halfway and i == requests // 2:
+                halfway()
+            started = time.perf_counter()
+            try:
+                await service.generate_response(f"Question {i}", [])
+            except Exception:
+                failures += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return latencies, failures
+
+
+def _report(
+    name: str, latencies: List[float], failures: int, primary: int, secondary: int
+) -> None:
+    """Print latency percentiles, failed calls and the calls received by each provider."""
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    p99 = ordered[int(len(ordered) * 0.99) - 1]
+    print(
+        f"  {name:<22} p50 {statistics.median(ordered):6.0f} ms   p95 {p95:6.0f} ms   "
+        f"p99 {p99:6.0f} ms   failed {failures:3d}   "
+        f"calls primary {primary:4d}   secondary {secondary:4d}"
+    )
+
+
+async def _scenario(
+    name: str,
+    primary: FakeOpenAI,
+    secondary: FakeOpenAI,
+    routed: bool,
+    requests: int,
+    concurrency: int,
+    halfway: Optional[Callable[[], None]] = None,
+) -> None:
+    """Run one scenario with a fresh service and report it."""
+    settings.openrouter_base_url = primary.url
+    settings.llm_fallback_endpoints = (
+        [LLMEndpointSettings(model="secondary", base_url=secondary.url)] if routed else []
+    )
+    settings.llm_hedging_enabled = routed
+    service = ChatbotService(coalesce_requests=False)
+    before = primary.request_count, secondary.request_count
+
+    latencies, failures = await _run(service, requests, concurrency, halfway)
+    _report(
+        name,
+        latencies,
+        failures,
+        primary.request_count - before[0],
+        secondary.request_count - before[1],
+    )
+    router = service.router
+    if routed:
+        print(
+            f"    hedged {router.hedged}, won by the hedge {router.hedges_won}, "
+            f"failovers {router.failovers}"
+        )
+    await service.aclose()
+
+
+async def main(
+    requests: int,
+    concurrency: int,
+    latency: float,
+    slow_rate: float,
+    slow_latency: float,
+    secondary_latency: float,
+    error_rate: float,
+) -> None:
+    """Run every scenario against two fake providers."""
+    settings.llm_hedge_min_delay = 0.05
+
+    with FakeOpenAI(
+        latency=latency, slow_rate=slow_rate, slow_latency=slow_latency, seed=1
+    ) as primary, FakeOpenAI(latency=secondary_latency, seed=2) as secondary:
+        print(
+            f"{requests} calls, {concurrency} concurrent; primary {latency * 1000:.0f} ms "
+            f"({slow_rate:.0%} at {slow_latency * 1000:.0f} ms), "
+            f"secondary {secondary_latency * 1000:.0f} ms"
+        )
+
+        print("tail")
+        await _scenario("primary only", primary, secondary, False, requests, concurrency)
+        await _scenario("router", primary, secondary, True, requests, concurrency)
+
+        print("slowdown")
+
+        def slow_down() -> None:
+            primary.latency = secondary_latency * 3
+
+        await _scenario(
+            "primary only", primary, secondary, False, requests, concurrency, slow_down
+        )
+        primary.latency = latency
+        await _scenario("router", primary, secondary, True, requests, concurrency, slow_down)
+        primary.latency = latency
+
+        print("errors")
+        primary.slow_rate, primary.error_rate = 0.0, error_rate
+        await _scenario("primary only", primary, secondary, False, requests, concurrency)
+        await _scenario("router", primary, secondary, True, requests, concurrency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--slow-rate", type=float, default=0.03)
+    parser.add_argument("--slow-latency", type=float, default=1.0)
+    parser.add_argument("--secondary-latency", type=float, default=0.08)
+    parser.add_argument("--error-rate", type=float, default=0.2)
+    args = parser.parse_args()
+    asyncio.run(
+        main(
+            args.requests,
+            args.concurrency,
+            args.latency,
+            args.slow_rate,
+            args.slow_latency,
+            args.secondary_latency,
+            args.error_rate,
+        )
+    )
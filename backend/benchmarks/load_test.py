@@ -0,0 +1,501 @@
+"""Load test of the API against local fakes of Supabase and OpenRouter.
+
+Run from ``backend/``:
+
+    PYTHONPATH=. python -m benchmarks.load_test --users 50 --turns 5 --output after.json
+    PYTHONPATH=. python -m benchmarks.load_test --users 50 --turns 5 --compare before.json
+
+The API runs with the production launcher ``main.py`` (``--workers``
+processes) but pointed at a fake PostgREST server and a fake OpenAI-compatible
+server, which run in another process so that none of them competes with the
+API for the GIL. ``--db-latency`` stands in for the round-trip to Supabase,
+``--llm-latency`` for the model time to first token and ``--tokens-per-second``
+for its generation speed.
+
+Each of ``--users`` simulated users creates a conversation, sends it
+``--turns`` messages one after the other, streamed with ``--stream``, pausing
+``--think`` seconds between them, then lists its messages. Users start over
+``--ramp`` seconds. The report gives p50/p95/p99 latencies per operation,
+requests and turns per second, errors by status, and the memory and CPU time
+of the API processes.
+
+Results are written as JSON with the git commit they were measured on; with
+``--compare``, latencies, throughput and CPU are compared to a previous run
+and the exit status is 1 if any got worse by more than ``--tolerance``. As
+timings vary from run to run, ``--repeat`` reports the median of several runs.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from multiprocessing.connection import Connection
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+import httpx
+import jwt
+
+from benchmarks.fakes import FakeOpenAI, FakePostgREST, begin_turn
+from src.chatbot.infrastructure.config import settings
+
+# Parameters that do not change what is measured
+_UNCOMPARED = ("output", "compare", "tolerance")
+
+
+def _serve_fakes(
+    conn: Connection,
+    db_latency: float,
+    llm_latency: float,
+    tokens_per_second: float,
+    answer_words: int,
+) -> None:
+    """Serve both fakes until told to stop, then send back the requests they received."""
+    answer = " ".join(["word"] * answer_words)
+    with FakePostgREST(latency=db_latency) as database, FakeOpenAI(
+        latency=llm_latency,
+        chunk_delay=1 / tokens_per_second if tokens_per_second else 0.0,
+        reply=lambda messages: answer,
+    ) as llm:
+        database.register_rpc("begin_turn", lambda params: begin_turn(database, params))
+        conn.send((database.url, llm.url))
+        conn.recv()
+        conn.send({"supabase_requests": database.request_count, "llm_requests": llm.request_count})
+
+
+def free_port() -> int:
+    """Return a local TCP port nobody listens on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _process_tree(pid: int) -> List[int]:
+    """Return a process and its descendants, on Linux."""
+    children: Dict[int, List[int]] = defaultdict(list)
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as stat:
+                    # The command name in parentheses may contain spaces
+                    ppid = int(stat.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children[ppid].append(int(entry))
+    tree, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        tree.append(current)
+        pending.extend(children[current])
+    return tree
+
+
+def _resources(pid: int) -> Dict[str, float]:
+    """Return the memory in MB and CPU time in seconds of the API processes, on Linux."""
+    if not os.path.isdir("/proc"):
+        return {}
+    resources = {"rss_mb": 0.0, "peak_rss_mb": 0.0, "cpu_seconds": 0.0}
+    ticks = os.sysconf("SC_CLK_TCK")
+    for process in _process_tree(pid):
+        try:
+            with open(f"/proc/{process}/status") as status:
+                for line in status:
+                    key, _, value = line.partition(":")
+                    if key in ("VmRSS", "VmHWM"):
+                        name = "rss_mb" if key == "VmRSS" else "peak_rss_mb"
+                        resources[name] += int(value.split()[0]) / 1024
+            with open(f"/proc/{process}/stat") as stat:
+                fields = stat.read().rsplit(")", 1)[1].split()
+                resources["cpu_seconds"] += (int(fields[11]) + int(fields[12])) / ticks
+        except OSError:
+            continue
+    return resources
+
+
+def start_api(port: int, workers: int, env: Dict[str, str]) -> subprocess.Popen:
+    """Start the API with the production launcher."""
+    return subprocess.Popen(
+        [sys.executable, "main.py"],
+        env={
+            **os.environ,
+            "PYTHONPATH": ".",
+            "APP_HOST": "127.0.0.1",
+            "APP_PORT": str(port),
+            "APP_WORKERS": str(workers),
+            "APP_ACCESS_LOG": "False",
+            "DEBUG": "False",
+            **env,
+        },
+    )
+
+
+async def wait_ready(
+    client: httpx.AsyncClient, api: subprocess.Popen, interval: float = 0.1
+) -> None:
+    """Wait until the API answers its health check, polling every `interval` seconds."""
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if api.poll() is not None:
+            raise RuntimeError(f"The API exited with status {api.returncode}")
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(interval)
+    raise RuntimeError("The API did not start within 60 seconds")
+
+
+def user_token() -> str:
+    """Sign a token for a new user, like Supabase Auth would."""
+    now = int(time.time())
+    return jwt.encode(
+        {
+            "sub": str(uuid4()),
+            "email": "user@example.com",
+            "aud": "authenticated",
+            "role": "authenticated",
+            "iat": now,
+            "exp": now + 3600,
+        },
+        settings.supabase_jwt_secret,
+        algorithm="HS256",
+    )
+
+
+class Recorder:
+    """Latencies in milliseconds and errors of each operation."""
+
+    def __init__(self) -> None:
+        """Initialize an empty record."""
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Counter] = defaultdict(Counter)
+
+    async def request(
+        self, operation: str, client: httpx.AsyncClient, method: str, url: str, **kwargs: Any
+    ) -> Optional[httpx.Response]:
+        """Send a request, recording its latency if it succeeds or its error otherwise."""
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.errors[operation][type(e).__name__] += 1
+            return None
+        if response.is_success:
+            self.latencies[operation].append((time.perf_counter() - started) * 1000)
+            return response
+        self.errors[operation][str(response.status_code)] += 1
+        return None
+
+    async def stream(self, client: httpx.AsyncClient, url: str, **kwargs: Any) -> None:
+        """Stream a message, recording the time to the first delta and to the end."""
+        started = time.perf_counter()
+        first_delta = None
+        try:
+            async with client.stream("POST", url, **kwargs) as response:
+                if not response.is_success:
+                    self.errors["stream_message"][str(response.status_code)] += 1
+                    return
+                async for line in response.aiter_lines():
+                    if line == "event: delta" and first_delta is None:
+                        first_delta = time.perf_counter() - started
+                    elif line == "event: error":
+                        self.errors["stream_message"]["error event"] += 1
+                        return
+        except httpx.HTTPError as e:
+            self.errors["stream_message"][type(e).__name__] += 1
+            return
+        self.latencies["stream_message"].append((time.perf_counter() - started) * 1000)
+        if first_delta is not None:
+            self.latencies["stream_first_delta"].append(first_delta * 1000)
+
+
+async def _user(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    turns: int,
+    stream: bool,
+    think: float,
+    delay: float,
+    user: int = 0,
+) -> None:
+    """Create a conversation, chat in it, then list its messages."""
+    await asyncio.sleep(delay)
+    headers = {"Authorization": f"Bearer {user_token()}"}
+    response = await recorder.request(
+        "create_conversation",
+        client,
+        "POST",
+        "/api/v1/conversations",
+        json={"title": "Load test"},
+        headers=headers,
+    )
+    if response is None:
+        return
+    messages_url = f"/api/v1/conversations/{response.json()['id']}/messages"
+
+    for turn in range(turns):
+        if turn and think:
+            await asyncio.sleep(think)
+        # Distinct prompts, so that users do not share LLM calls
+        content = {"content": f"User {user}, question {turn}: how do I reset my password?"}
+        if stream:
+            await recorder.stream(client, f"{messages_url}/stream", json=content, headers=headers)
+        else:
+            await recorder.request(
+                "send_message", client, "POST", messages_url, json=content, headers=headers
+            )
+    await recorder.request("list_messages", client, "GET", messages_url, headers=headers)
+
+
+def _percentiles(latencies: List[float]) -> Dict[str, float]:
+    """Return the count and p50/p95/p99 of latencies."""
+    ordered = sorted(latencies)
+    summary: Dict[str, float] = {"count": len(ordered)}
+    for name, q in (("p50_ms", 0.5), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+        summary[name] = round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 2)
+    return summary
+
+
+def git_revision() -> Dict[str, Any]:
+    """Return the commit measured and whether tracked files were modified."""
+    try:
+        sha = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        changes = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return {"sha": None, "dirty": None}
+    return {"sha": sha, "dirty": bool(changes.strip())}
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Start the fakes and the API, run the load and return the results."""
+    conn, child_conn = multiprocessing.Pipe()
+    fakes = multiprocessing.get_context("spawn").Process(
+        target=_serve_fakes,
+        args=(child_conn, args.db_latency, args.llm_latency, args.tokens_per_second, args.words),
+        daemon=True,
+    )
+    fakes.start()
+    supabase_url, llm_url = conn.recv()
+
+    port = free_port()
+    env = {
+        "SUPABASE_URL": supabase_url,
+        "OPENROUTER_BASE_URL": llm_url,
+        # Simulated users send all their messages without being rate limited
+        "ADMISSION_USER_BURST": str(args.turns + 1),
+    }
+    env.update(setting.split("=", 1) for setting in args.env)
+    api = start_api(port, args.workers, env)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=args.users)
+    recorder = Recorder()
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=120
+        ) as client:
+            await wait_ready(client, api)
+            # Warm up the API, e.g. its connection pools, outside of the measure
+            await _user(client, Recorder(), 1, args.stream, 0.0, 0.0)
+
+            before = _resources(api.pid)
+            started = time.perf_counter()
+            await asyncio.gather(
+                *(
+                    _user(
+                        client,
+                        recorder,
+                        args.turns,
+                        args.stream,
+                        args.think,
+                        args.ramp * i / args.users,
+                        user=i,
+                    )
+                    for i in range(args.users)
+                )
+            )
+            duration = time.perf_counter() - started
+            after = _resources(api.pid)
+    finally:
+        api.terminate()
+        api.wait()
+        conn.send("stop")
+        upstream = conn.recv()
+        fakes.join()
+
+    requests = sum(len(latencies) for name, latencies in recorder.latencies.items())
+    requests -= len(recorder.latencies.get("stream_first_delta", []))
+    turns = len(recorder.latencies["stream_message" if args.stream else "send_message"])
+    resources: Dict[str, Any] = {}
+    if after:
+        cpu = after["cpu_seconds"] - before["cpu_seconds"]
+        resources = {
+            "rss_mb": round(after["rss_mb"], 1),
+            "peak_rss_mb": round(after["peak_rss_mb"], 1),
+            "cpu_seconds": round(cpu, 3),
+            "cpu_ms_per_turn": round(cpu * 1000 / turns, 3) if turns else None,
+        }
+    return {
+        "git": git_revision(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "params": {k: v for k, v in vars(args).items() if k not in _UNCOMPARED},
+        "duration_s": round(duration, 3),
+        "requests_per_s": round(requests / duration, 2),
+        "turns_per_s": round(turns / duration, 2),
+        "operations": {
+            name: _percentiles(latencies) for name, latencies in recorder.latencies.items()
+        },
+        "errors": {name: dict(errors) for name, errors in recorder.errors.items()},
+        "api": resources,
+        "upstream": upstream,
+    }
+
+
+def _combine(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine repeated runs, taking the median of every measure and the sum of counts."""
+    if len(runs) == 1:
+        return runs[0]
+
+    def median(values: Any) -> Optional[float]:
+        values = [value for value in values if value is not None]
+        return statistics.median(values) if values else None
+
+    combined = dict(runs[-1])
+    for key in ("duration_s", "requests_per_s", "turns_per_s"):
+        combined[key] = median(run[key] for run in runs)
+    combined["operations"] = {
+        name: {
+            key: median(run["operations"].get(name, {}).get(key) for run in runs)
+            for key in summary
+        }
+        for name, summary in runs[-1]["operations"].items()
+    }
+    combined["api"] = {key: median(run["api"].get(key) for run in runs) for key in runs[-1]["api"]}
+    errors: Dict[str, Counter] = defaultdict(Counter)
+    upstream: Counter = Counter()
+    for run in runs:
+        for name, counts in run["errors"].items():
+            errors[name].update(counts)
+        upstream.update(run["upstream"])
+    combined["errors"] = {name: dict(counts) for name, counts in errors.items()}
+    combined["upstream"] = dict(upstream)
+    combined["runs"] = runs
+    return combined
+
+
+def _print(results: Dict[str, Any]) -> None:
+    """Print a human-readable report."""
+    params = results["params"]
+    print(
+        f"{params['users']} users x {params['turns']} turns "
+        f"({'streamed' if params['stream'] else 'not streamed'}), database "
+        f"{params['db_latency'] * 1000:.0f} ms, LLM {params['llm_latency'] * 1000:.0f} ms "
+        f"+ {params['words']} words at {params['tokens_per_second']:g}/s, "
+        f"commit {(results['git']['sha'] or 'unknown')[:12]}"
+        f"{' (modified)' if results['git']['dirty'] else ''}"
+    )
+    if params["repeat"] > 1:
+        print(f"  medians of {params['repeat']} runs")
+    for name, summary in results["operations"].items():
+        print(
+            f"  {name:<20} {summary['count']:5.0f}   p50 {summary['p50_ms']:8.1f} ms   "
+            f"p95 {summary['p95_ms']:8.1f} ms   p99 {summary['p99_ms']:8.1f} ms"
+        )
+    print(
+        f"  {results['requests_per_s']:.1f} requests/s, {results['turns_per_s']:.1f} turns/s "
+        f"over {results['duration_s']:.1f} s"
+    )
+    for name, errors in results["errors"].items():
+        print(f"  errors {name}: " + ", ".join(f"{k} x{v}" for k, v in errors.items()))
+    api = results["api"]
+    if api:
+        print(
+            f"  API memory {api['rss_mb']:.0f} MB (peak {api['peak_rss_mb']:.0f} MB), "
+            f"CPU {api['cpu_seconds']:.2f} s ({api['cpu_ms_per_turn']} ms per turn)"
+        )
+    upstream = results["upstream"]
+    print(
+        f"  upstream: {upstream['supabase_requests']} Supabase requests, "
+        f"{upstream['llm_requests']} LLM requests"
+    )
+
+
+def _compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> bool:
+    """Print the changes from a baseline run and return whether any is a regression."""
+    print(f"compared to commit {(baseline['git']['sha'] or 'unknown')[:12]}:")
+    if baseline["params"] != results["params"]:
+        print("  warning: the runs used different parameters")
+
+    # Metric, baseline value, value, whether higher is better
+    rows = []
+    for name, summary in results["operations"].items():
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            previous = baseline["operations"].get(name, {}).get(key)
+            rows.append((f"{name} {key[:3]}", previous, summary[key], False))
+    for key in ("requests_per_s", "turns_per_s"):
+        rows.append((key, baseline[key], results[key], True))
+    for key in ("cpu_ms_per_turn", "peak_rss_mb"):
+        rows.append((key, baseline["api"].get(key), results["api"].get(key), False))
+
+    regressed = False
+    for metric, previous, current, higher_is_better in rows:
+        if not previous or current is None:
+            continue
+        change = (current - previous) / previous
+        worse = -change if higher_is_better else change
+        flag = ""
+        if worse > tolerance:
+            flag = "  REGRESSION"
+            regressed = True
+        print(f"  {metric:<28} {previous:10.1f} -> {current:10.1f}   {change:+7.1%}{flag}")
+    return regressed
+
+
+def main() -> None:
+    """Parse the arguments, run the load test and report it."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--think", type=float, default=0.0)
+    parser.add_argument("--ramp", type=float, default=1.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--db-latency", type=float, default=0.01)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--words", type=int, default=50)
+    parser.add_argument(
+        "--env", action="append", default=[], metavar="NAME=VALUE", help="API setting"
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="Runs to take the median of")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Compare to the results in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = _combine([asyncio.run(run(args)) for _ in range(args.repeat)])
+    _print(results)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+    if args.compare:
+        with open(args.compare) as baseline:
+            if _compare(results, json.load(baseline), args.tolerance):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
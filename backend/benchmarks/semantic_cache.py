@@ -0,0 +1,142 @@
+"""Hit ratio, wrong answers and index search time of the semantic cache.
+
+Run from ``backend/``:
+
+    PYTHONPATH=. python -m benchmarks.semantic_cache --requests 500 --latency 0.01
+
+Replays first messages asking a skewed (Zipf-like) set of support questions,
+each phrased in several ways, against a fake OpenAI-compatible server, with
+the local hashing embedder standing in for the embedding model. For each
+similarity threshold it reports how many messages the semantic cache answered
+and how many of those got the answer to another question ("reset my
+password" vs "change my password"), which is what the threshold trades off.
+Then it times a search of the vector index, with NumPy and in plain Python.
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Dict, List, Tuple
+
+from benchmarks.fakes import FakeOpenAI
+from src.chatbot.infrastructure.cache import semantic
+from src.chatbot.infrastructure.cache.semantic import HashingEmbedder, SemanticCache, VectorIndex
+from src.chatbot.infrastructure.config import settings
+from src.chatbot.infrastructure.langchain.chatbot_service import ChatbotService
+
+ACTIONS = ["reset", "change", "delete", "export", "recover", "update"]
+OBJECTS = ["my password", "my account", "my billing address", "my invoices", "my API key"]
+PHRASINGS = [
+    "How do I {action} {object}?",
+    "How can I {action} {object}?",
+    "how do i {action} {object}",
+    "Please, how do I {action} {object}?",
+    "Can you tell me how to {action} {object}?",
+    "I need to {action} {object}, how do I do that?",
+]
+ANSWER_PREFIX = "Answer: "
+
+
+def _workload(requests: int, seed: int = 42) -> Tuple[List[Tuple[str, str]], Dict[str, str]]:
+    """Return (message, question) pairs and the question of every phrasing."""
+    rng = random.Random(seed)
+    questions = [f"{action} {obj}" for action in ACTIONS for obj in OBJECTS]
+    rng.shuffle(questions)
+    weights = [1 / rank for rank in range(1, len(questions) + 1)]
+
+    question_of = {}
+    for question in questions:
+        action, obj = question.split(" ", 1)
+        for phrasing in PHRASINGS:
+            question_of[phrasing.format(action=action, object=obj)] = question
+
+    workload = []
+    for question in rng.choices(questions, weights=weights, k=requests):
+        action, obj = question.split(" ", 1)
+        workload.append((rng.choice(PHRASINGS).format(action=action, object=obj), question))
+    return workload, question_of
+
+
+def _reply(messages: List[Dict]) -> str:
+    """Fake completion naming the message it answers."""
+    return ANSWER_PREFIX + messages[-1]["content"]
+
+
+async def _run(
+    threshold: float, workload: List[Tuple[str, str]], question_of: Dict[str, str], fake: FakeOpenAI
+) -> None:
+    """Answer the workload with a semantic cache and print its accuracy."""
+    index = VectorIndex(10_000, use_numpy=semantic.np is not None)
+    cache = SemanticCache(HashingEmbedder(), index, threshold=threshold)
+    service = ChatbotService(semantic_cache=cache)
+    calls_before = fake.request_count
+    wrong = 0
+
+    started = time.perf_counter()
+    for message, question in workload:
+        answer = await service.generate_response(message, [])
+        if question_of[answer[len(ANSWER_PREFIX) :]] != question:
+            wrong += 1
+    elapsed = (time.perf_counter() - started) / len(workload) * 1000
+
+    stats = cache.stats()
+    print(
+        f"  threshold {threshold:.2f}   hit ratio {stats['hit_ratio']:6.1%}   "
+        f"wrong answers {wrong / len(workload):6.1%}   "
+        f"upstream calls {fake.request_count - calls_before:4d}   mean {elapsed:5.1f} ms"
+    )
+    await service.aclose()
+
+
+def _search_us(index: VectorIndex, queries: List[List[float]]) -> float:
+    """Return the time of one search in microseconds."""
+    started = time.perf_counter()
+    for query in queries:
+        index.search(query)
+    return (time.perf_counter() - started) / len(queries) * 1e6
+
+
+def _index_timings(seed: int = 42) -> None:
+    """Time searches of full indexes of random vectors."""
+    rng = random.Random(seed)
+    print("Vector index search")
+    for size, dimensions in [(1_000, 256), (10_000, 256), (10_000, 1536)]:
+        vectors = [[rng.gauss(0, 1) for _ in range(dimensions)] for _ in range(size)]
+        queries = vectors[:20]
+        timings = []
+        for use_numpy in (True, False):
+            if use_numpy and semantic.np is None:
+                timings.append("  n/a (NumPy not installed)")
+                continue
+            index = VectorIndex(size, use_numpy=use_numpy)
+            for vector in vectors:
+                index.add(vector, "answer")
+            timings.append(f"{_search_us(index, queries):9.0f} us")
+        print(f"  {size:6d} x {dimensions:4d}   numpy {timings[0]}   python {timings[1]}")
+
+
+async def main(requests: int, latency: float, thresholds: List[float]) -> None:
+    """Run the workload at every threshold, then time index searches."""
+    workload, question_of = _workload(requests)
+
+    with FakeOpenAI(latency=latency, reply=_reply) as fake:
+        settings.openrouter_base_url = fake.url
+        print(
+            f"{requests} first messages, {len(question_of)} phrasings of "
+            f"{len(ACTIONS) * len(OBJECTS)} questions, {latency * 1000:.0f} ms LLM latency"
+        )
+        for threshold in thresholds:
+            await _run(threshold, workload, question_of, fake)
+
+    _index_timings()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument(
+        "--thresholds", type=float, nargs="+", default=[0.6, 0.7, 0.8, 0.9, 0.95, 1.0]
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.latency, args.thresholds))
@@ -0,0 +1,169 @@
+"""Per-turn latency of SendMessageUseCase with the LLM call stubbed out.
+
+Run from ``backend/``:
+
+    PYTHONPATH=. python -m benchmarks.send_message_pipeline --turns 50 --latency 0.02
+
+Compares the pipelined turn (concurrent reads, then the user message
+saved during the generation) and the ``begin_turn`` RPC turn (one call,
+then the assistant insert) with the
+previous strictly sequential turn, against a fake PostgREST server whose
+latency stands in for the network distance to Supabase.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import AsyncIterator, List, Optional
+from uuid import UUID, uuid4
+
+from supabase import acreate_client
+
+from benchmarks.fakes import FakePostgREST, begin_turn
+from src.chatbot.application.use_cases.send_message import SendMessageUseCase
+from src.chatbot.domain.entities.conversation import Conversation
+from src.chatbot.domain.entities.message import Message, MessageRole
+from src.chatbot.infrastructure.background import BackgroundTaskRunner
+from src.chatbot.infrastructure.database.supabase_conversation_repository import (
+    SupabaseConversationRepository,
+)
+from src.chatbot.infrastructure.database.supabase_conversation_summary_repository import (
+    SupabaseConversationSummaryRepository,
+)
+from src.chatbot.infrastructure.database.supabase_message_repository import (
+    SupabaseMessageRepository,
+)
+from src.chatbot.infrastructure.database.supabase_turn_repository import SupabaseTurnRepository
+from src.chatbot.infrastructure.langchain.context_builder import ContextBuilder, TokenCounter
+from src.chatbot.infrastructure.langchain.summarizer import ConversationSummarizer
+
+FAKE_KEY = "fake.anon.key"
+
+
+class StubChatbotService:
+    """Chatbot service answering instantly, to isolate data-access latency."""
+
+    async def generate_response(
+        self,
+        user_message: str,
+        conversation_history: List[Message],
+        summary: Optional[str] = None,
+        semantic_cache_threshold: Optional[float] = None,
+        user_id: Optional[UUID] = None,
+    ) -> str:
+        """Return a canned response."""
+        return "Stub response"
+
+    async def stream_response(
+        self,
+        user_message: str,
+        conversation_history: List[Message],
+        summary: Optional[str] = None,
+        semantic_cache_threshold: Optional[float] = None,
+        user_id: Optional[UUID] = None,
+    ) -> AsyncIterator[str]:
+        """Stream a canned response."""
+        yield "Stub response"
+
+
+class SequentialSendMessageUseCase(SendMessageUseCase):
+    """Previous turn: every round-trip awaited one after the other."""
+
+    async def execute(self, conversation_id: UUID, user_id: UUID, content: str) -> Message:
+        """Execute the use case sequentially."""
+        conversation = await self.conversation_repository.get_by_id(conversation_id, user_id)
+        if not conversation:
+            raise ValueError(f"Conversation {conversation_id} not found or access denied")
+
+        recent = await self.message_repository.list_recent(
+            conversation_id, limit=self.context_builder.max_messages
+        )
+        summary = await self._get_summary(conversation_id)
+        summary_content = summary.content if summary else None
+
+        user_message = Message(
+            id=uuid4(), conversation_id=conversation_id, role=MessageRole.USER, content=content
+        )
+        await self.message_repository.create(user_message)
+
+        history = self.context_builder.build(recent, content, summary_content)
+        response = await self.chatbot_service.generate_response(content, history, summary_content)
+
+        assistant_message = Message(
+            id=uuid4(),
+            conversation_id=conversation_id,
+            role=MessageRole.ASSISTANT,
+            content=response,
+        )
+        return await self.message_repository.create(assistant_message)
+
+
+async def _measure(
+    use_case: SendMessageUseCase, conversation: Conversation, turns: int
+) -> List[float]:
+    """Run turns one after the other and return their latencies in milliseconds."""
+    latencies = []
+    for i in range(turns):
+        started = time.perf_counter()
+        await use_case.execute(conversation.id, conversation.user_id, f"Question {i}")
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def _report(name: str, latencies: List[float]) -> None:
+    """Print latency percentiles."""
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(
+        f"  {name:<11} mean {statistics.mean(ordered):7.1f} ms   "
+        f"p50 {statistics.median(ordered):7.1f} ms   p95 {p95:7.1f} ms"
+    )
+
+
+async def main(turns: int, latency: float) -> None:
+    """Run both pipelines against the same fake PostgREST server."""
+    with FakePostgREST(latency=latency) as fake:
+        fake.register_rpc("begin_turn", lambda params: begin_turn(fake, params))
+        client = await acreate_client(fake.url, FAKE_KEY)
+        message_repository = SupabaseMessageRepository(client)
+        conversation_repository = SupabaseConversationRepository(client)
+        chatbot_service = StubChatbotService()
+        context_builder = ContextBuilder(TokenCounter("gpt-3.5-turbo"), max_tokens=3000)
+        summarizer = ConversationSummarizer(
+            message_repository,
+            SupabaseConversationSummaryRepository(client),
+            chatbot_service,  # type: ignore[arg-type]
+            BackgroundTaskRunner(),
+        )
+
+        results = {}
+        for name, use_case_class, turn_repository in (
+            ("sequential", SequentialSendMessageUseCase, None),
+            ("pipelined", SendMessageUseCase, None),
+            ("rpc", SendMessageUseCase, SupabaseTurnRepository(client, FAKE_KEY)),
+        ):
+            conversation = Conversation(id=uuid4(), user_id=uuid4(), title=name)
+            fake.seed("conversations", [conversation.to_row()])
+            use_case = use_case_class(
+                message_repository,
+                conversation_repository,
+                chatbot_service,  # type: ignore[arg-type]
+                context_builder,
+                summarizer,
+                turn_repository,
+            )
+            results[name] = await _measure(use_case, conversation, turns)
+
+        await client.postgrest.aclose()
+
+    print(f"{turns} turns, {latency * 1000:.0f} ms per database round-trip, LLM stubbed")
+    for name, latencies in results.items():
+        _report(name, latencies)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.latency))
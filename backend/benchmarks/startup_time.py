@@ -0,0 +1,161 @@
+"""Import time of the application and time until a worker serves requests.
+
+Run from ``backend/``:
+
+    PYTHONPATH=. python -m benchmarks.startup_time --repeat 5 --output startup.json
+
+Each run starts fresh interpreters, like a new worker or a serverless cold
+start:
+
+- ``python -c pass``, the interpreter alone;
+- ``python -X importtime -c "import <app>"``, without any Supabase or
+  OpenRouter environment variable, which must succeed as settings are only
+  loaded at startup. The modules imported are grouped by top-level package;
+- uvicorn serving the app against local fakes of Supabase and OpenRouter,
+  until ``/health`` answers, i.e. imports plus the lifespan startup.
+
+The report gives the median of the runs, the packages taking most of the
+import time, and whether LangChain was imported with the application.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+from benchmarks.fakes import FakeOpenAI, FakePostgREST
+from benchmarks.load_test import free_port, git_revision, start_api, wait_ready
+
+APP_MODULE = "src.chatbot.presentation.api.app"
+
+# Packages whose import is deferred until the service is created
+DEFERRED_PACKAGES = ("langchain_core", "langchain_openai", "openai", "numpy", "tiktoken")
+
+
+def _bare_env() -> Dict[str, str]:
+    """Return the environment without the settings of Supabase and OpenRouter."""
+    return {
+        name: value
+        for name, value in os.environ.items()
+        if not name.startswith(("SUPABASE_", "OPENROUTER_"))
+    } | {"PYTHONPATH": "."}
+
+
+def _interpreter() -> float:
+    """Return the seconds taken by an interpreter doing nothing."""
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], env=_bare_env(), check=True)
+    return time.perf_counter() - started
+
+
+def _import() -> Tuple[float, Dict[str, float]]:
+    """Import the app in a new interpreter, returning the wall time and self time per package."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {APP_MODULE}"],
+        env=_bare_env(),
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode:
+        raise RuntimeError(f"Importing the app failed:\n{result.stderr}")
+
+    packages: Dict[str, float] = defaultdict(float)
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        packages[name.strip().split(".")[0]] += int(self_us) / 1e6
+    return elapsed, packages
+
+
+async def _ready(supabase_url: str, llm_url: str) -> float:
+    """Start the API under uvicorn, returning the seconds until its health check answers."""
+    port = free_port()
+    env = {"SUPABASE_URL": supabase_url, "OPENROUTER_BASE_URL": llm_url}
+    started = time.perf_counter()
+    api = start_api(port, workers=1, env=env)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+            await wait_ready(client, api, interval=0.01)
+        return time.perf_counter() - started
+    finally:
+        api.terminate()
+        api.wait()
+
+
+async def run(repeat: int) -> Dict[str, Any]:
+    """Measure `repeat` times and return the medians."""
+    interpreter: List[float] = []
+    imports: List[float] = []
+    ready: List[float] = []
+    packages: Dict[str, List[float]] = defaultdict(list)
+    with FakePostgREST() as database, FakeOpenAI() as llm:
+        for _ in range(repeat):
+            interpreter.append(_interpreter())
+            elapsed, run_packages = _import()
+            imports.append(elapsed)
+            for package, seconds in run_packages.items():
+                packages[package].append(seconds)
+            ready.append(await _ready(database.url, llm.url))
+
+    package_ms = {
+        package: statistics.median(seconds + [0.0] * (repeat - len(seconds))) * 1000
+        for package, seconds in packages.items()
+    }
+    return {
+        "date": datetime.now(timezone.utc).isoformat(),
+        "git": git_revision(),
+        "repeat": repeat,
+        "interpreter_ms": statistics.median(interpreter) * 1000,
+        "import_ms": statistics.median(imports) * 1000,
+        "ready_ms": statistics.median(ready) * 1000,
+        "packages_ms": dict(sorted(package_ms.items(), key=lambda item: -item[1])),
+        "deferred_imported": [package for package in DEFERRED_PACKAGES if package in packages],
+    }
+
+
+def _print(results: Dict[str, Any], top: int) -> None:
+    """Print the report."""
+    print(f"median of {results['repeat']} runs")
+    print(f"    interpreter          {results['interpreter_ms']:7.0f} ms")
+    print(f"    import the app       {results['import_ms']:7.0f} ms")
+    print(f"    serve /health        {results['ready_ms']:7.0f} ms")
+    print("import time by package")
+    for package, ms in list(results["packages_ms"].items())[:top]:
+        print(f"    {package:<20} {ms:7.0f} ms")
+    deferred = results["deferred_imported"]
+    print(
+        "imported with the app: " + ", ".join(deferred)
+        if deferred
+        else "LangChain, OpenAI, NumPy and tiktoken are not imported with the app"
+    )
+
+
+def main() -> None:
+    """Parse the arguments, measure and report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="packages listed")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.repeat))
+    _print(results, args.top)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,109 @@
 """Main entry point for the application."""
+import atexit
+import glob
+import math
+import os
+import shutil
+import tempfile
+from typing import Optional
+
 import uvicorn
 
 from src.chatbot.infrastructure.config import settings
 
-if __name__ == "__main__":
+APP = "src.chatbot.presentation.api.app:app"
+
+
+def _cgroup_cpu_quota() -> Optional[float]:
+    """Return the CPU quota of the cgroup of the process, None if unlimited or unknown."""
+    try:
+        # cgroup v2
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+    except (OSError, ValueError):
+        try:
+            # cgroup v1
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+                quota = f.read().strip()
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+                period = f.read().strip()
+        except OSError:
+            return None
+    if quota in ("max", "-1"):
+        return None
+    return int(quota) / int(period)
+
+
+def available_cpus() -> int:
+    """Return the CPUs this process may use, given its CPU affinity and cgroup quota."""
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    # Containers are often limited by a CPU quota rather than by their affinity
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, math.ceil(quota))
+    return max(1, cpus)
+
+
+def share_metrics() -> None:
+    """
+    Have the workers write their Prometheus metrics to PROMETHEUS_MULTIPROC_DIR.
+
+    The directory is created for the lifetime of the server unless set, in
+    which case the files left by a previous run are removed. It must be set
+    before the workers import prometheus_client, i.e. before they start.
+    """
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not directory:
+        directory = tempfile.mkdtemp(prefix="chatbot-metrics-")
+        atexit.register(shutil.rmtree, directory, ignore_errors=True)
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = directory
+        return
+    os.makedirs(directory, exist_ok=True)
+    # Otherwise counted as the metrics of this run
+    for path in glob.glob(os.path.join(directory, "*.db")):
+        os.remove(path)
+
+
+def main() -> None:
+    """
+    Serve the API.
+
+    In production, `app_workers` processes (one per CPU by default) share the
+    listening socket, supervised by uvicorn, which replaces the workers that
+    die. Each worker warms its connection pools during its startup, before it
+    accepts connections. On SIGTERM, workers stop accepting connections and
+    let the requests and streams in flight finish, for up to
+    `app_graceful_timeout` seconds, before shutting down. With several
+    workers, /metrics serves the metrics of all of them, merged.
+    """
+    if settings.debug:
+        uvicorn.run(
+            APP,
+            host=settings.app_host,
+            port=settings.app_port,
+            reload=True,
+            loop=settings.app_loop,
+            http=settings.app_http,
+        )
+        return
+
+    workers = settings.app_workers or available_cpus()
+    if workers > 1:
+        share_metrics()
     uvicorn.run(
-        "src.chatbot.presentation.api.app:app",
+        APP,
         host=settings.app_host,
         port=settings.app_port,
-        reload=settings.debug,
+        workers=workers,
+        loop=settings.app_loop,
+        http=settings.app_http,
+        timeout_graceful_shutdown=settings.app_graceful_timeout,
+        access_log=settings.app_access_log,
     )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
 """Create conversation use case."""
+from typing import Optional
 from uuid import UUID, uuid4
 
-from src.chatbot.domain.entities.conversation import Conversation
+from src.chatbot.domain.entities.conversation import UNTITLED, Conversation
 from src.chatbot.domain.repositories.conversation_repository import ConversationRepository
 
 
@@ -12,7 +13,17 @@ class CreateConversationUseCase:
         """Initialize use case with repositories."""
         self.conversation_repository = conversation_repository
 
-    async def execute(self, user_id: UUID, title: str) -> Conversation:
-        """Execute the use case."""
-        conversation = Conversation(id=uuid4(), user_id=user_id, title=title)
+    async def execute(
+        self,
+        user_id: UUID,
+        title: Optional[str] = None,
+        semantic_cache_threshold: Optional[float] = None,
+    ) -> Conversation:
+        """Execute the use case. Without a title, one is generated from the first message."""
+        conversation = Conversation(
+            id=uuid4(),
+            user_id=user_id,
+            title=title or UNTITLED,
+            semantic_cache_threshold=semantic_cache_threshold,
+        )
         return await self.conversation_repository.create(conversation)
@@ -1,8 +1,9 @@
 """Get conversation messages use case."""
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from src.chatbot.domain.entities.message import Message
+from src.chatbot.domain.entities.page_cursor import PageCursor
 from src.chatbot.domain.repositories.message_repository import MessageRepository
 
 
@@ -14,9 +15,13 @@ class GetConversationMessagesUseCase:
         self.message_repository = message_repository
 
     async def execute(
-        self, conversation_id: UUID, limit: int = 100, offset: int = 0
+        self,
+        conversation_id: UUID,
+        limit: int = 100,
+        offset: int = 0,
+        after: Optional[PageCursor] = None,
     ) -> List[Message]:
         """Execute the use case."""
         return await self.message_repository.list_by_conversation(
-            conversation_id, limit=limit, offset=offset
+            conversation_id, limit=limit, offset=offset, after=after
         )
@@ -1,8 +1,9 @@
 """List conversations use case."""
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from src.chatbot.domain.entities.conversation import Conversation
+from src.chatbot.domain.entities.page_cursor import PageCursor
 from src.chatbot.domain.repositories.conversation_repository import ConversationRepository
 
 
@@ -13,6 +14,14 @@ class ListConversationsUseCase:
         """Initialize use case with repositories."""
         self.conversation_repository = conversation_repository
 
-    async def execute(self, user_id: UUID, limit: int = 100, offset: int = 0) -> List[Conversation]:
+    async def execute(
+        self,
+        user_id: UUID,
+        limit: int = 100,
+        offset: int = 0,
+        after: Optional[PageCursor] = None,
+    ) -> List[Conversation]:
         """Execute the use case."""
-        return await self.conversation_repository.list_all(user_id=user_id, limit=limit, offset=offset)
+        return await self.conversation_repository.list_all(
+            user_id=user_id, limit=limit, offset=offset, after=after
+        )
@@ -1,58 +1,220 @@
 """Send message use case."""
-from typing import List
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Union
 from uuid import UUID, uuid4
 
+from src.chatbot.domain.entities.conversation import UNTITLED, Conversation
+from src.chatbot.domain.entities.conversation_summary import ConversationSummary
 from src.chatbot.domain.entities.message import Message, MessageRole
 from src.chatbot.domain.repositories.message_repository import MessageRepository
 from src.chatbot.domain.repositories.conversation_repository import ConversationRepository
+from src.chatbot.domain.repositories.turn_repository import TurnRepository
 from src.chatbot.infrastructure.langchain.chatbot_service import ChatbotService
+from src.chatbot.infrastructure.langchain.context_builder import ContextBuilder
+from src.chatbot.infrastructure.langchain.summarizer import ConversationSummarizer
+from src.chatbot.infrastructure.langchain.title_generator import ConversationTitleGenerator
+
+
+@dataclass
+class TurnContext:
+    """State of a turn between the reads and the final writes."""
+
+    user_message: Message
+    history: List[Message]
+    summary: Optional[str] = None
+    # Messages created before this date no longer fit in the context window
+    summarize_before: Optional[datetime] = None
+    # Save of the user message running alongside the generation, None if
+    # the turn started by saving it
+    user_message_saving: Optional["asyncio.Task[Message]"] = None
+    # Semantic cache threshold of the conversation, None for the default
+    semantic_cache_threshold: Optional[float] = None
+    # Conversation to title once its first turn is saved
+    untitled_conversation: Optional[Conversation] = None
 
 
 class SendMessageUseCase:
-    """Use case for sending a message and getting a response."""
+    """
+    Use case for sending a message and getting a response.
+
+    A turn is pipelined to limit database round-trips: the ownership check,
+    history and summary reads run concurrently, then the user message is
+    saved while the response is generated, and the assistant message once it
+    is complete.
+
+    When a turn repository is given, the turn instead starts with a single
+    call that checks ownership, reads the context and saves the user message.
+
+    Either way, the user message is kept when the response cannot be
+    generated: the conversation then ends with an unanswered message, which
+    the client can send again.
+
+    Once the first turn of a conversation created without a title is saved,
+    its title is generated in the background.
+    """
 
     def __init__(
         self,
         message_repository: MessageRepository,
         conversation_repository: ConversationRepository,
         chatbot_service: ChatbotService,
+        context_builder: ContextBuilder,
+        summarizer: Optional[ConversationSummarizer] = None,
+        turn_repository: Optional[TurnRepository] = None,
+        title_generator: Optional[ConversationTitleGenerator] = None,
     ) -> None:
         """Initialize use case with repositories and services."""
         self.message_repository = message_repository
         self.conversation_repository = conversation_repository
         self.chatbot_service = chatbot_service
+        self.context_builder = context_builder
+        self.summarizer = summarizer
+        self.turn_repository = turn_repository
+        self.title_generator = title_generator
 
-    async def execute(self, conversation_id: UUID, user_id: UUID, content: str) -> Message:
-        """Execute the use case."""
-        # Verify conversation exists and belongs to user
-        conversation = await self.conversation_repository.get_by_id(conversation_id, user_id)
-        if not conversation:
-            raise ValueError(f"Conversation {conversation_id} not found or access denied")
+    async def _get_summary(self, conversation_id: UUID) -> Optional[ConversationSummary]:
+        """Get the summary of older turns, if summaries are enabled."""
+        if not self.summarizer:
+            return None
+        return await self.summarizer.get_summary(conversation_id)
 
-        # Get conversation history
-        history = await self.message_repository.list_by_conversation(conversation_id)
-
-        # Create and save user message
+    async def _start_turn(self, conversation_id: UUID, user_id: UUID, content: str) -> TurnContext:
+        """Check ownership and gather the context to send with the user message."""
         user_message = Message(
             id=uuid4(),
             conversation_id=conversation_id,
             role=MessageRole.USER,
             content=content,
         )
-        await self.message_repository.create(user_message)
 
-        # Generate AI response
-        ai_response_content = await self.chatbot_service.generate_response(
-            content, history
+        user_message_saving = None
+        if self.turn_repository:
+            # Single round-trip which also saves the user message
+            started = await self.turn_repository.begin_turn(
+                user_id, user_message, history_limit=self.context_builder.max_messages
+            )
+            if started is None:
+                raise ValueError(f"Conversation {conversation_id} not found or access denied")
+            conversation, recent, summary = started
+            if not self.summarizer:
+                summary = None
+        else:
+            # Verify ownership while reading the recent history and the summary of older turns
+            conversation, recent, summary = await asyncio.gather(
+                self.conversation_repository.get_by_id(conversation_id, user_id),
+                self.message_repository.list_recent(
+                    conversation_id, limit=self.context_builder.max_messages
+                ),
+                self._get_summary(conversation_id),
+            )
+            if not conversation:
+                raise ValueError(f"Conversation {conversation_id} not found or access denied")
+            user_message_saving = asyncio.create_task(
+                self.message_repository.create(user_message)
+            )
+
+        summary_content = summary.content if summary else None
+        history = self.context_builder.build(recent, content, summary_content)
+
+        return TurnContext(
+            user_message=user_message,
+            history=history,
+            summary=summary_content,
+            summarize_before=self._summary_boundary(recent, history, user_message),
+            user_message_saving=user_message_saving,
+            semantic_cache_threshold=conversation.semantic_cache_threshold,
+            untitled_conversation=(
+                conversation if not recent and conversation.title == UNTITLED else None
+            ),
+        )
+
+    def _summary_boundary(
+        self, recent: List[Message], history: List[Message], user_message: Message
+    ) -> Optional[datetime]:
+        """Return the start of the context window if older messages were left out."""
+        kept_ids = {m.id for m in history}
+        truncated = len(recent) >= self.context_builder.max_messages or any(
+            m.id not in kept_ids for m in recent
+        )
+        if not truncated:
+            return None
+
+        return next(
+            (m.created_at for m in recent if m.id in kept_ids and m.role != MessageRole.SYSTEM),
+            user_message.created_at,
         )
 
-        # Create and save assistant message
+    async def _user_message_saved(self, turn: TurnContext) -> None:
+        """Wait for the user message to be saved, even if the generation failed."""
+        if turn.user_message_saving is not None:
+            # Not cancelled along with a turn whose client went away
+            await asyncio.shield(turn.user_message_saving)
+
+    async def _finish_turn(
+        self, conversation_id: UUID, turn: TurnContext, content: str
+    ) -> Message:
+        """Save the assistant message and schedule summarization if needed."""
         assistant_message = Message(
             id=uuid4(),
             conversation_id=conversation_id,
             role=MessageRole.ASSISTANT,
-            content=ai_response_content,
+            content=content,
         )
-        await self.message_repository.create(assistant_message)
+        assistant_message = await self.message_repository.create(assistant_message)
+
+        if self.summarizer and turn.summarize_before:
+            self.summarizer.schedule(conversation_id, turn.summarize_before)
+
+        if self.title_generator and turn.untitled_conversation:
+            self.title_generator.schedule(turn.untitled_conversation, turn.user_message.content)
 
         return assistant_message
+
+    async def execute(self, conversation_id: UUID, user_id: UUID, content: str) -> Message:
+        """Execute the use case."""
+        turn = await self._start_turn(conversation_id, user_id, content)
+
+        # Generate AI response
+        try:
+            ai_response_content = await self.chatbot_service.generate_response(
+                content, turn.history, turn.summary, turn.semantic_cache_threshold, user_id=user_id
+            )
+        finally:
+            await self._user_message_saved(turn)
+
+        return await self._finish_turn(conversation_id, turn, ai_response_content)
+
+    async def execute_stream(
+        self, conversation_id: UUID, user_id: UUID, content: str
+    ) -> AsyncIterator[Union[str, Message]]:
+        """
+        Execute the use case, streaming the AI response.
+
+        Ownership is checked before this returns, so errors surface before any
+        chunk is sent.
+
+        Returns:
+            Async iterator yielding response text chunks, then the saved
+            assistant Message once the stream has ended
+        """
+        turn = await self._start_turn(conversation_id, user_id, content)
+        return self._stream_reply(conversation_id, user_id, content, turn)
+
+    async def _stream_reply(
+        self, conversation_id: UUID, user_id: UUID, content: str, turn: TurnContext
+    ) -> AsyncIterator[Union[str, Message]]:
+        """Relay response chunks and save the assembled assistant message."""
+        chunks: List[str] = []
+
+        try:
+            async for chunk in self.chatbot_service.stream_response(
+                content, turn.history, turn.summary, turn.semantic_cache_threshold, user_id=user_id
+            ):
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            await self._user_message_saved(turn)
+
+        yield await self._finish_turn(conversation_id, turn, "".join(chunks))
@@ -1,6 +1,8 @@
 """Domain entities."""
 from src.chatbot.domain.entities.user import User
 from src.chatbot.domain.entities.conversation import Conversation
+from src.chatbot.domain.entities.conversation_summary import ConversationSummary
 from src.chatbot.domain.entities.message import Message
+from src.chatbot.domain.entities.page_cursor import PageCursor
 
-__all__ = ["User", "Conversation", "Message"]
+__all__ = ["User", "Conversation", "ConversationSummary", "Message", "PageCursor"]
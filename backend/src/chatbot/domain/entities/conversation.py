@@ -1,21 +1,52 @@
 """Conversation entity."""
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Optional
 from uuid import UUID, uuid4
 
-from pydantic import BaseModel, Field
+from src.chatbot.domain.entities.parsing import parse_reference_id
 
+# Title of conversations created without one, until a title is generated
+UNTITLED = "New conversation"
 
-class Conversation(BaseModel):
-    """Conversation domain entity."""
 
-    id: UUID = Field(default_factory=uuid4)
+@dataclass(slots=True, kw_only=True)
+class Conversation:
+    """
+    Conversation domain entity.
+
+    A slotted dataclass rather than a Pydantic model, so that rebuilding
+    entities from database rows stays cheap. Values are validated at the API
+    boundary by the response schemas, which read these attributes.
+    """
+
+    id: UUID = field(default_factory=uuid4)
     user_id: UUID
     title: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    updated_at: datetime = field(default_factory=datetime.utcnow)
+    # Similarity above which the semantic cache may answer, None for the default
+    semantic_cache_threshold: Optional[float] = None
 
-    class Config:
-        """Pydantic configuration."""
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "Conversation":
+        """Build a conversation from a database row with JSON-encoded values."""
+        return cls(
+            id=UUID(row["id"]),
+            user_id=parse_reference_id(row["user_id"]),
+            title=row["title"],
+            created_at=datetime.fromisoformat(row["created_at"]),
+            updated_at=datetime.fromisoformat(row["updated_at"]),
+            semantic_cache_threshold=row.get("semantic_cache_threshold"),
+        )
 
-        from_attributes = True
+    def to_row(self) -> Dict[str, Any]:
+        """Convert to a database row with JSON-encoded values."""
+        return {
+            "id": str(self.id),
+            "user_id": str(self.user_id),
+            "title": self.title,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+            "semantic_cache_threshold": self.semantic_cache_threshold,
+        }
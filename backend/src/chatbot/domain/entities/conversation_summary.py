@@ -0,0 +1,17 @@
+"""Conversation summary entity."""
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ConversationSummary(BaseModel):
+    """Running summary of the older turns of a conversation."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    conversation_id: UUID
+    content: str
+    summarized_until: datetime
+    message_count: int = 0
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,27 @@
+"""Page cursor entity."""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Union
+from uuid import UUID
+
+from src.chatbot.domain.entities.conversation import Conversation
+from src.chatbot.domain.entities.message import Message
+
+
+@dataclass(frozen=True)
+class PageCursor:
+    """
+    Position from which a paginated listing resumes.
+
+    Listings are ordered on (created_at, id), so a cursor holds both values of
+    the last item of the previous page; the id breaks ties between items
+    created at the same instant.
+    """
+
+    created_at: datetime
+    id: UUID
+
+    @classmethod
+    def after(cls, item: Union[Conversation, Message]) -> "PageCursor":
+        """Build the cursor resuming a listing after an item."""
+        return cls(created_at=item.created_at, id=item.id)
@@ -0,0 +1,15 @@
+"""Parsing of the JSON-encoded values of database rows."""
+from functools import lru_cache
+from uuid import UUID
+
+
+@lru_cache(maxsize=4096)
+def parse_reference_id(value: str) -> UUID:
+    """
+    Parse a foreign-key UUID, reusing recent results.
+
+    Rows loaded together mostly point to the same parent (all messages of a
+    history share their conversation ID), and parsing a UUID costs more than
+    the rest of building a message.
+    """
+    return UUID(value)
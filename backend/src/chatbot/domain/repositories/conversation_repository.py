@@ -4,6 +4,7 @@ from typing import List, Optional
 from uuid import UUID
 
 from src.chatbot.domain.entities.conversation import Conversation
+from src.chatbot.domain.entities.page_cursor import PageCursor
 
 
 class ConversationRepository(ABC):
@@ -20,8 +21,20 @@ class ConversationRepository(ABC):
         pass
 
     @abstractmethod
-    async def list_all(self, user_id: UUID, limit: int = 100, offset: int = 0) -> List[Conversation]:
-        """List all conversations for a specific user with pagination."""
+    async def list_all(
+        self,
+        user_id: UUID,
+        limit: int = 100,
+        offset: int = 0,
+        after: Optional[PageCursor] = None,
+    ) -> List[Conversation]:
+        """
+        List all conversations for a specific user with pagination, newest first.
+
+        Pages are resumed with `after`, the cursor of the last conversation of
+        the previous page. `offset` is kept for existing callers but gets slower
+        as it grows.
+        """
         pass
 
     @abstractmethod
@@ -0,0 +1,20 @@
+"""Conversation summary repository interface."""
+from abc import ABC, abstractmethod
+from typing import Optional
+from uuid import UUID
+
+from src.chatbot.domain.entities.conversation_summary import ConversationSummary
+
+
+class ConversationSummaryRepository(ABC):
+    """Repository interface for ConversationSummary entity."""
+
+    @abstractmethod
+    async def get(self, conversation_id: UUID) -> Optional[ConversationSummary]:
+        """Get the summary of a conversation."""
+        pass
+
+    @abstractmethod
+    async def save(self, summary: ConversationSummary) -> ConversationSummary:
+        """Create or replace the summary of a conversation."""
+        pass
@@ -1,9 +1,11 @@
 """Message repository interface."""
 from abc import ABC, abstractmethod
+from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
 
 from src.chatbot.domain.entities.message import Message
+from src.chatbot.domain.entities.page_cursor import PageCursor
 
 
 class MessageRepository(ABC):
@@ -14,6 +16,11 @@ class MessageRepository(ABC):
         """Create a new message."""
         pass
 
+    @abstractmethod
+    async def create_many(self, messages: List[Message]) -> List[Message]:
+        """Create several messages in a single round-trip."""
+        pass
+
     @abstractmethod
     async def get_by_id(self, message_id: UUID) -> Optional[Message]:
         """Get a message by ID."""
@@ -21,9 +28,40 @@ class MessageRepository(ABC):
 
     @abstractmethod
     async def list_by_conversation(
-        self, conversation_id: UUID, limit: int = 100, offset: int = 0
+        self,
+        conversation_id: UUID,
+        limit: int = 100,
+        offset: int = 0,
+        after: Optional[PageCursor] = None,
+    ) -> List[Message]:
+        """
+        List all messages for a conversation, oldest first.
+
+        Pages are resumed with `after`, the cursor of the last message of the
+        previous page. `offset` is kept for existing callers but gets slower as
+        it grows.
+        """
+        pass
+
+    @abstractmethod
+    async def list_recent(self, conversation_id: UUID, limit: int = 100) -> List[Message]:
+        """List the most recent messages of a conversation in chronological order."""
+        pass
+
+    @abstractmethod
+    async def count_by_conversation(self, conversation_id: UUID) -> int:
+        """Count the messages of a conversation."""
+        pass
+
+    @abstractmethod
+    async def list_before(
+        self,
+        conversation_id: UUID,
+        before: datetime,
+        after: Optional[datetime] = None,
+        limit: int = 100,
     ) -> List[Message]:
-        """List all messages for a conversation."""
+        """List the oldest messages created before a date, and after another if given."""
         pass
 
     @abstractmethod
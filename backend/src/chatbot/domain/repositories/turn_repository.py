@@ -0,0 +1,29 @@
+"""Turn repository interface."""
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from src.chatbot.domain.entities.conversation import Conversation
+from src.chatbot.domain.entities.conversation_summary import ConversationSummary
+from src.chatbot.domain.entities.message import Message
+
+
+class TurnRepository(ABC):
+    """Repository interface combining the reads and writes that start a turn."""
+
+    @abstractmethod
+    async def begin_turn(
+        self, user_id: UUID, user_message: Message, history_limit: int = 100
+    ) -> Optional[Tuple[Conversation, List[Message], Optional[ConversationSummary]]]:
+        """
+        Start a turn in a single round-trip.
+
+        Checks that the conversation of the message belongs to the user, saves
+        the user message and bumps the conversation's updated_at.
+
+        Returns:
+            The conversation, the most recent messages before the user message
+            in chronological order, and the conversation summary; None if the
+            conversation does not exist or belongs to another user
+        """
+        pass
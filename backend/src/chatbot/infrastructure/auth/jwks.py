@@ -0,0 +1,132 @@
+"""JSON Web Key Set kept in memory and refreshed in the background."""
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import httpx
+import jwt
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSKeySet:
+    """
+    Signing keys of asymmetric JWTs, looked up by `kid` without any I/O.
+
+    The whole set is replaced by a background task every `refresh_interval`
+    seconds, and sooner when a token names an unknown key, which is how a
+    rotated-in key first shows up. Requests never wait for a fetch: tokens
+    signed with a key that is not loaded yet are rejected until the refresh
+    completes. Failed refreshes keep the previous keys.
+
+    The source is an HTTP(S) URL, such as the Supabase Auth
+    `/auth/v1/.well-known/jwks.json` endpoint, or the path of a local JSON file.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        refresh_interval: float = 600.0,
+        min_refresh_interval: float = 30.0,
+        timeout: float = 5.0,
+    ) -> None:
+        """
+        Initialize an empty key set.
+
+        Args:
+            source: JWKS URL or local file path
+            refresh_interval: Seconds between scheduled refreshes
+            min_refresh_interval: Minimum seconds between two refreshes, so
+                tokens with unknown key IDs cannot hammer the source
+            timeout: Timeout of a fetch in seconds
+        """
+        self.source = source
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._last_attempt = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._refresh_requested: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._http: Optional[httpx.AsyncClient] = None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def get(self, kid: Optional[str]) -> Optional[jwt.PyJWK]:
+        """Get a key by ID, requesting a refresh if it is unknown."""
+        key = self._keys.get(kid) if kid else None
+        if key is None:
+            self.request_refresh()
+        return key
+
+    def request_refresh(self) -> None:
+        """Ask the background task to refresh soon. Safe to call from any thread."""
+        if self._loop is not None and self._refresh_requested is not None:
+            self._loop.call_soon_threadsafe(self._refresh_requested.set)
+
+    async def refresh(self) -> None:
+        """Fetch the key set and replace the loaded keys."""
+        self._last_attempt = time.monotonic()
+        key_set = jwt.PyJWKSet.from_dict(await self._fetch())
+        # Swapped in one assignment, so lookups from other threads see either set
+        self._keys = {key.key_id: key for key in key_set.keys if key.key_id}
+
+    async def _fetch(self) -> Dict[str, Any]:
+        """Read the raw JWKS document."""
+        if self.source.startswith(("http://", "https://")):
+            if self._http is None:
+                self._http = httpx.AsyncClient(timeout=self.timeout)
+            response = await self._http.get(self.source)
+            response.raise_for_status()
+            return response.json()
+
+        return json.loads(await asyncio.to_thread(Path(self.source).read_text))
+
+    async def start(self) -> None:
+        """Load the keys once, then keep them fresh in the background."""
+        self._loop = asyncio.get_running_loop()
+        self._refresh_requested = asyncio.Event()
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning("Could not load JWKS from %s: %s", self.source, e)
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        """Refresh on schedule or on request, at most every `min_refresh_interval`."""
+        assert self._refresh_requested is not None
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._refresh_requested.wait(), timeout=self.refresh_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+
+            wait = self.min_refresh_interval - (time.monotonic() - self._last_attempt)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._refresh_requested.clear()
+
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning("JWKS refresh failed, keeping %d cached keys: %s", len(self), e)
+
+    async def aclose(self) -> None:
+        """Stop refreshing and close the HTTP connection pool."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
@@ -1,16 +1,81 @@
 """Supabase authentication middleware."""
+import hashlib
+import time
+from functools import lru_cache
 import jwt
-from typing import Optional
+from typing import Any, List, Optional, Tuple
 from uuid import UUID
 from fastapi import HTTPException, Security
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
+from src.chatbot.infrastructure.auth.jwks import JWKSKeySet
+from src.chatbot.infrastructure.cache.lru import LRUCache
 from src.chatbot.infrastructure.config import settings
 from src.chatbot.domain.entities.user import User
 
 
 security = HTTPBearer()
 
+# Algorithms verified against the JWKS rather than the shared JWT secret
+ASYMMETRIC_ALGORITHMS = ["RS256", "ES256"]
+
+# Public keys of asymmetric tokens, set up with the application by `start_jwks`
+jwks: Optional[JWKSKeySet] = None
+
+
+@lru_cache(maxsize=None)
+def _verified_tokens() -> LRUCache[User]:
+    """Users of already verified tokens, keyed by token digest, until the token expires."""
+    return LRUCache(max_size=settings.auth_cache_size)
+
+
+async def start_jwks() -> None:
+    """Load the public keys and keep them fresh, if asymmetric tokens are accepted."""
+    global jwks
+    if settings.supabase_jwks_url:
+        jwks = JWKSKeySet(
+            settings.supabase_jwks_url, refresh_interval=settings.jwks_refresh_interval
+        )
+        await jwks.start()
+
+
+async def stop_jwks() -> None:
+    """Stop refreshing the public keys."""
+    global jwks
+    if jwks is not None:
+        await jwks.aclose()
+        jwks = None
+
+
+def _token_key(token: str) -> bytes:
+    """Digest identifying a token without keeping the token itself in memory."""
+    return hashlib.sha256(token.encode()).digest()
+
+
+def _verification_key(token: str) -> Tuple[Any, List[str]]:
+    """Pick the key and algorithm a token must be verified with, from its header."""
+    header = jwt.get_unverified_header(token)
+    algorithm = header.get("alg")
+
+    if algorithm not in ASYMMETRIC_ALGORITHMS:
+        return settings.supabase_jwt_secret, ["HS256"]
+
+    if jwks is None:
+        raise jwt.InvalidTokenError(f"{algorithm} tokens are not accepted")
+
+    signing_key = jwks.get(header.get("kid"))
+    if signing_key is None:
+        raise jwt.InvalidTokenError("unknown signing key")
+    if signing_key.algorithm_name != algorithm:
+        raise jwt.InvalidTokenError("signing key does not match token algorithm")
+
+    return signing_key.key, [algorithm]
+
+
+def get_access_token(credentials: HTTPAuthorizationCredentials = Security(security)) -> str:
+    """Return the JWT of the request, to call the database on behalf of its user."""
+    return credentials.credentials
+
 
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Security(security),
@@ -18,6 +83,11 @@ def get_current_user(
     """
     Extract and validate JWT token from Authorization header.
 
+    HS256 tokens are checked with the Supabase JWT secret, RS256 and ES256
+    tokens with the JWKS key named by their `kid` header. Verified tokens are
+    cached until their `exp` claim, so a client reusing the same token only
+    pays for signature and claim checks once.
+
     Args:
         credentials: HTTP Bearer token from request header
 
@@ -28,13 +98,19 @@ def get_current_user(
         HTTPException: If token is invalid or expired
     """
     token = credentials.credentials
+    key = _token_key(token)
+
+    user = _verified_tokens().get(key)
+    if user is not None:
+        return user
 
     try:
-        # Decode JWT token using Supabase JWT secret
+        # Decode JWT token using Supabase JWT secret or signing key
+        verification_key, algorithms = _verification_key(token)
         payload = jwt.decode(
             token,
-            settings.supabase_jwt_secret,
-            algorithms=["HS256"],
+            verification_key,
+            algorithms=algorithms,
             audience="authenticated",
         )
 
@@ -48,7 +124,14 @@ def get_current_user(
                 detail="Invalid authentication token: missing user ID"
             )
 
-        return User(id=UUID(user_id), email=email or "")
+        user = User(id=UUID(user_id), email=email or "")
+
+        # Tokens without expiry are verified on every request
+        expires_in = payload.get("exp", 0) - time.time()
+        if expires_in > 0:
+            _verified_tokens().set(key, user, ttl=expires_in)
+
+        return user
 
     except jwt.ExpiredSignatureError:
         raise HTTPException(
@@ -0,0 +1,64 @@
+"""Background task runner for work that must not delay responses."""
+import asyncio
+import logging
+from typing import Coroutine, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundTaskRunner:
+    """
+    Run fire-and-forget coroutines for the lifetime of a worker.
+
+    Keeps references to running tasks so they are not garbage collected,
+    logs their failures, and lets shutdown wait for them. Tasks spawned with
+    a key are deduplicated: while a task with the same key is running, new
+    ones are dropped.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty runner."""
+        self._tasks: Set[asyncio.Task] = set()
+        self._keyed: Dict[str, asyncio.Task] = {}
+
+    def spawn(self, coro: Coroutine, key: Optional[str] = None) -> bool:
+        """
+        Schedule a coroutine in the background.
+
+        Args:
+            coro: Coroutine to run
+            key: Optional deduplication key
+
+        Returns:
+            False if a task with the same key is already running
+        """
+        if key is not None and key in self._keyed:
+            coro.close()
+            return False
+
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        if key is not None:
+            self._keyed[key] = task
+        task.add_done_callback(lambda t: self._on_done(t, key))
+        return True
+
+    def _on_done(self, task: asyncio.Task, key: Optional[str]) -> None:
+        """Forget a finished task and log its failure."""
+        self._tasks.discard(task)
+        if key is not None and self._keyed.get(key) is task:
+            del self._keyed[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                "Background task %s failed", key or task.get_name(), exc_info=task.exception()
+            )
+
+    async def aclose(self, timeout: float = 10.0) -> None:
+        """Wait for running tasks up to a timeout, then cancel the rest."""
+        if not self._tasks:
+            return
+
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,204 @@
+"""Append-only cache of recent conversation history."""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from src.chatbot.domain.entities.message import Message
+
+# Approximate memory taken by a cached message besides its content
+MESSAGE_OVERHEAD_BYTES = 512
+# Conversations whose last write is tracked at once; the oldest are forgotten first
+MAX_TRACKED_WRITES = 100_000
+
+
+def _message_size(message: Message) -> int:
+    """Estimate the memory taken by a cached message."""
+    return len(message.content) + MESSAGE_OVERHEAD_BYTES
+
+
+@dataclass
+class _History:
+    """Cached tail of a conversation."""
+
+    messages: List[Message]
+    # Messages of the conversation in the database, `messages` being its tail
+    count: int
+    loaded_at: float = field(default_factory=time.monotonic)
+    size: int = 0
+
+
+class ConversationHistoryCache:
+    """
+    Per-worker cache of the most recent messages of each conversation.
+
+    Filled from the database on a miss, then kept current by appending the
+    messages written through this worker. Each entry records how many
+    messages the conversation has in the database, so that a lookup given a
+    fresh count misses once other workers wrote to it. Total memory is
+    bounded by evicting the least recently used conversations, and entries
+    expire after a TTL.
+
+    Every write to a conversation bumps its write counter, cached or not. A
+    tail loaded from the database is only cached if the counter read before
+    loading it is unchanged, so that a load racing with a write cannot hide
+    the messages written meanwhile.
+    """
+
+    def __init__(self, max_bytes: int, max_messages: int, ttl: Optional[float] = None) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Approximate memory ceiling for all cached messages
+            max_messages: Number of recent messages kept per conversation
+            ttl: Time-to-live of a conversation entry in seconds, None for no expiry
+        """
+        self.max_bytes = max_bytes
+        self.max_messages = max_messages
+        self.ttl = ttl
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[UUID, _History]" = OrderedDict()
+        # Write counters share one sequence, so that a forgotten counter can be
+        # replaced by the last value forgotten, which is at least as recent
+        self._sequence = 0
+        self._forgotten_version = 0
+        self._versions: "OrderedDict[UUID, int]" = OrderedDict()
+
+    def _expired(self, entry: _History) -> bool:
+        return self.ttl is not None and time.monotonic() - entry.loaded_at > self.ttl
+
+    def version(self, conversation_id: UUID) -> int:
+        """Get the write counter of a conversation, to pass to `put` once it is loaded."""
+        return self._versions.get(conversation_id, self._forgotten_version)
+
+    def _written(self, conversation_id: UUID) -> None:
+        """Bump the write counter of a conversation."""
+        self._sequence += 1
+        self._versions[conversation_id] = self._sequence
+        self._versions.move_to_end(conversation_id)
+        if len(self._versions) > MAX_TRACKED_WRITES:
+            _, self._forgotten_version = self._versions.popitem(last=False)
+
+    def get_recent(
+        self, conversation_id: UUID, limit: int, count: Optional[int] = None
+    ) -> Optional[List[Message]]:
+        """
+        Get the `limit` most recent messages, or None if they are not all cached.
+
+        Args:
+            conversation_id: Conversation to look up
+            limit: Number of recent messages wanted
+            count: Number of messages of the conversation in the database, the
+                entry being dropped if it holds another number; None to skip the check
+        """
+        entry = self._entries.get(conversation_id)
+        if entry is not None and (
+            self._expired(entry) or (count is not None and entry.count != count)
+        ):
+            self._drop(conversation_id)
+            entry = None
+
+        if entry is None or len(entry.messages) < min(limit, entry.count):
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(conversation_id)
+        self.hits += 1
+        return entry.messages[-limit:] if limit else []
+
+    def put(
+        self,
+        conversation_id: UUID,
+        messages: List[Message],
+        count: int,
+        version: Optional[int] = None,
+    ) -> bool:
+        """
+        Cache the tail of a conversation loaded from the database.
+
+        Args:
+            conversation_id: Conversation loaded
+            messages: Most recent messages, oldest first
+            count: Number of messages of the conversation, counted before
+                loading `messages`
+            version: Write counter of the conversation read before loading it,
+                None to cache the messages regardless
+
+        Returns:
+            False, caching nothing, if the conversation was written since `version`
+        """
+        if version is not None and self.version(conversation_id) != version:
+            return False
+
+        # Loads that started before this one are older
+        self._written(conversation_id)
+        self._drop(conversation_id)
+        entry = _History(messages=list(messages), count=count)
+        entry.size = sum(_message_size(m) for m in entry.messages)
+        self._entries[conversation_id] = entry
+        self.size += entry.size
+        self._trim(entry)
+        self._evict()
+        return True
+
+    def append(self, message: Message) -> None:
+        """Append a newly written message to its conversation if it is cached."""
+        self._written(message.conversation_id)
+        entry = self._entries.get(message.conversation_id)
+        if entry is None:
+            return
+
+        entry.messages.append(message)
+        entry.count += 1
+        entry.size += _message_size(message)
+        self.size += _message_size(message)
+        self._entries.move_to_end(message.conversation_id)
+        self._trim(entry)
+        self._evict()
+
+    def discard_message(self, message_id: UUID) -> None:
+        """Drop the conversation holding a deleted message."""
+        for conversation_id, entry in list(self._entries.items()):
+            if any(m.id == message_id for m in entry.messages):
+                self.invalidate(conversation_id)
+
+    def invalidate(self, conversation_id: UUID) -> None:
+        """Drop a conversation from the cache, as well as the loads of it in progress."""
+        self._written(conversation_id)
+        self._drop(conversation_id)
+
+    def _drop(self, conversation_id: UUID) -> None:
+        """Remove the entry of a conversation."""
+        entry = self._entries.pop(conversation_id, None)
+        if entry is not None:
+            self.size -= entry.size
+
+    def _trim(self, entry: _History) -> None:
+        """Keep at most `max_messages` messages in an entry."""
+        excess = len(entry.messages) - self.max_messages
+        if excess > 0:
+            removed = sum(_message_size(m) for m in entry.messages[:excess])
+            del entry.messages[:excess]
+            entry.size -= removed
+            self.size -= removed
+
+    def _evict(self) -> None:
+        """Evict least recently used conversations until under the memory ceiling."""
+        while self.size > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self.size -= entry.size
+
+    def stats(self) -> Dict[str, float]:
+        """Return size, hit and miss counters and the hit ratio."""
+        lookups = self.hits + self.misses
+        return {
+            "conversations": len(self._entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
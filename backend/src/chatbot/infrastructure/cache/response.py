@@ -0,0 +1,163 @@
+"""Two-tier cache of LLM responses for repeated prompts."""
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+from src.chatbot.infrastructure.cache.lru import LRUCache
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(content: str) -> str:
+    """Normalize text so that trivially different prompts share a cache entry."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", content)).strip()
+
+
+class SQLiteResponseStore:
+    """
+    Persistent response tier backed by a SQLite file.
+
+    Survives restarts and is shared by the workers of a host: the database
+    runs in WAL mode so readers do not block the writer. Calls are blocking
+    and meant to be run in a worker thread.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Open or create the database at `path`."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, expires_at REAL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_responses_expires_at "
+                "ON llm_responses(expires_at)"
+            )
+            self._connection.commit()
+
+    def get(self, key: str) -> Optional[Tuple[str, Optional[float]]]:
+        """Get a response and its expiry (wall-clock time), or None if missing or expired."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response, expires_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return row[0], row[1]
+
+    def set(self, key: str, response: str, expires_at: Optional[float]) -> None:
+        """Store a response, dropping expired entries on the way."""
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, response, expires_at) "
+                "VALUES (?, ?, ?)",
+                (key, response, expires_at),
+            )
+            self._connection.execute(
+                "DELETE FROM llm_responses WHERE expires_at <= ?", (time.time(),)
+            )
+            self._connection.commit()
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._connection.close()
+
+
+class ResponseCache:
+    """
+    Cache of LLM responses keyed on model, temperature and prompt.
+
+    Lookups go to an in-memory LRU tier first, then to an optional persistent
+    tier whose hits are promoted to memory. Responses larger than
+    `max_entry_bytes` are not cached, and every entry expires after `ttl`.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: Optional[float] = None,
+        max_entry_bytes: int = 32 * 1024,
+        store: Optional[SQLiteResponseStore] = None,
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of responses kept in memory
+            ttl: Time-to-live of a response in seconds, None for no expiry
+            max_entry_bytes: Largest response cached, in UTF-8 bytes
+            store: Optional persistent tier
+        """
+        self.ttl = ttl
+        self.max_entry_bytes = max_entry_bytes
+        self.memory: LRUCache[str] = LRUCache(max_size, ttl=ttl)
+        self.store = store
+        self.store_hits = 0
+
+    @staticmethod
+    def key(model: str, temperature: float, messages: Sequence[Tuple[str, str]]) -> str:
+        """
+        Fingerprint a prompt.
+
+        Args:
+            model: Model name
+            temperature: Sampling temperature
+            messages: (role, content) pairs of the prompt, in order
+        """
+        normalized = [[role, normalize_prompt(content)] for role, content in messages]
+        payload = json.dumps([model, temperature, normalized], ensure_ascii=False)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Get a cached response."""
+        response = self.memory.get(key)
+        if response is not None or self.store is None:
+            return response
+
+        stored = await asyncio.to_thread(self.store.get, key)
+        if stored is None:
+            return None
+
+        response, expires_at = stored
+        self.store_hits += 1
+        ttl = expires_at - time.time() if expires_at is not None else None
+        self.memory.set(key, response, ttl=ttl)
+        return response
+
+    async def set(self, key: str, response: str) -> bool:
+        """Cache a response, returning False if it is too large to be cached."""
+        if len(response.encode()) > self.max_entry_bytes:
+            return False
+
+        self.memory.set(key, response)
+        if self.store is not None:
+            expires_at = time.time() + self.ttl if self.ttl is not None else None
+            await asyncio.to_thread(self.store.set, key, response, expires_at)
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        """Return memory tier counters, persistent tier hits and the overall hit ratio."""
+        stats = self.memory.stats()
+        # Memory misses answered by the persistent tier count as hits overall
+        lookups = stats["hits"] + stats["misses"]
+        hits = stats["hits"] + self.store_hits
+        stats["store_hits"] = self.store_hits
+        stats["hit_ratio"] = hits / lookups if lookups else 0.0
+        return stats
+
+    def close(self) -> None:
+        """Close the persistent tier."""
+        if self.store is not None:
+            self.store.close()
@@ -0,0 +1,295 @@
+"""Semantic cache answering prompts similar to one already answered."""
+import asyncio
+import logging
+import math
+import re
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import httpx
+
+from src.chatbot.infrastructure.cache.response import normalize_prompt
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+
+
+def _unit(vector: Sequence[float]) -> List[float]:
+    """Scale a vector to unit length, so that dot products are cosine similarities."""
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else list(vector)
+
+
+class Embedder(ABC):
+    """Interface of the text embedding models used by the semantic cache."""
+
+    @abstractmethod
+    async def embed(self, text: str) -> List[float]:
+        """Embed a text."""
+        pass
+
+    async def aclose(self) -> None:
+        """Release the resources of the embedder."""
+
+
+class HashingEmbedder(Embedder):
+    """
+    Local embedding stub standing in for a real model in tests and benchmarks.
+
+    Hashes lowercased words and word pairs into a fixed number of signed
+    buckets. Texts sharing most of their words end up close, which is enough
+    to exercise the cache, but paraphrases using other words do not.
+    """
+
+    def __init__(self, dimensions: int = 256) -> None:
+        """Initialize the embedder with the size of its vectors."""
+        self.dimensions = dimensions
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed a text."""
+        words = _WORD.findall(normalize_prompt(text).lower())
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+        vector = [0.0] * self.dimensions
+        for feature in features:
+            digest = zlib.crc32(feature.encode())
+            vector[digest % self.dimensions] += 1.0 if digest & 0x80000000 else -1.0
+        return _unit(vector)
+
+
+class OpenAIEmbedder(Embedder):
+    """Embedding model served by an OpenAI-compatible API, such as OpenRouter."""
+
+    def __init__(self, model: str, api_key: str, base_url: str) -> None:
+        """Initialize the embedder with its own pooled HTTP client."""
+        from langchain_openai import OpenAIEmbeddings
+
+        self.http_client = httpx.AsyncClient()
+        self.embeddings = OpenAIEmbeddings(
+            model=model,
+            openai_api_key=api_key,
+            openai_api_base=base_url,
+            http_async_client=self.http_client,
+            # Token-based chunking only applies to OpenAI's own models
+            check_embedding_ctx_length=False,
+        )
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed a text."""
+        return await self.embeddings.aembed_query(text)
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP connections."""
+        await self.http_client.aclose()
+
+
+class VectorIndex:
+    """
+    Bounded in-process index of answers by embedding, searched by cosine similarity.
+
+    Requires NumPy: the plain Python search, kept for small indexes in tests
+    and benchmarks, holds the GIL for tens of milliseconds on a full index.
+    Entries are only returned to searches of their own scope, e.g. the user
+    who got the answer. Once full, the oldest entry is replaced, and entries
+    older than `ttl` are never returned. Thread-safe, so that searches can run
+    in a worker thread.
+    """
+
+    def __init__(self, capacity: int, ttl: Optional[float] = None, use_numpy: bool = True) -> None:
+        """
+        Initialize the index.
+
+        Args:
+            capacity: Maximum number of entries
+            ttl: Time-to-live of an entry in seconds, None for no expiry
+            use_numpy: False to search in plain Python, only for small indexes
+        """
+        if use_numpy and np is None:
+            raise RuntimeError(
+                'The semantic cache requires the "semantic" extra: pip install -e ".[semantic]"'
+            )
+        self.capacity = capacity
+        self.ttl = ttl
+        self.use_numpy = use_numpy
+        self._vectors: List[List[float]] = []
+        self._matrix = None  # NumPy array of the vectors, allocated on first add
+        self._answers: List[str] = []
+        self._scopes: List[str] = []
+        self._expires: List[float] = []
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of entries, expired or not."""
+        return len(self._answers)
+
+    def add(self, vector: Sequence[float], answer: str, scope: str = "") -> None:
+        """Add an answer to a scope, replacing the oldest entry if the index is full."""
+        vector = _unit(vector)
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else math.inf
+
+        with self._lock:
+            if self.use_numpy and self._matrix is None:
+                self._matrix = np.zeros((self.capacity, len(vector)), dtype=np.float32)
+
+            if len(self._answers) < self.capacity:
+                slot = len(self._answers)
+                self._answers.append(answer)
+                self._scopes.append(scope)
+                self._expires.append(expires_at)
+                if not self.use_numpy:
+                    self._vectors.append(vector)
+            else:
+                slot = self._next
+                self._answers[slot] = answer
+                self._scopes[slot] = scope
+                self._expires[slot] = expires_at
+                if not self.use_numpy:
+                    self._vectors[slot] = vector
+            self._next = (slot + 1) % self.capacity
+
+            if self.use_numpy:
+                self._matrix[slot] = vector
+
+    def search(self, vector: Sequence[float], scope: str = "") -> Optional[Tuple[float, str]]:
+        """Return the similarity and answer of the closest live entry of a scope, if any."""
+        vector = _unit(vector)
+        now = time.monotonic()
+
+        with self._lock:
+            if not self._answers:
+                return None
+
+            if self.use_numpy:
+                matrix = self._matrix[: len(self._answers)]
+                scores = matrix @ np.asarray(vector, dtype=np.float32)
+                scores[np.asarray(self._expires) <= now] = -np.inf
+                scores[np.asarray(self._scopes) != scope] = -np.inf
+                best = int(np.argmax(scores))
+                score = float(scores[best])
+            else:
+                best, score = -1, -math.inf
+                for i, candidate in enumerate(self._vectors):
+                    if self._expires[i] > now and self._scopes[i] == scope:
+                        similarity = sum(a * b for a, b in zip(candidate, vector))
+                        if similarity > score:
+                            best, score = i, similarity
+
+            if score == -math.inf:
+                return None
+            return score, self._answers[best]
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._vectors.clear()
+            self._answers.clear()
+            self._scopes.clear()
+            self._expires.clear()
+            self._matrix = None
+            self._next = 0
+
+
+class SemanticCache:
+    """
+    Cache of LLM responses looked up by the meaning of the prompt.
+
+    A lookup hits when an answered prompt has an embedding whose cosine
+    similarity with the new one reaches the threshold. The threshold can be
+    overridden per lookup, e.g. per conversation. Embedding errors are logged
+    and treated as misses, so the LLM still answers.
+
+    Answers are only served back to the user they were given to, unless the
+    cache is shared: a user may then get the answer to another user's similar
+    message, including anything that message disclosed.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        index: VectorIndex,
+        threshold: float = 0.92,
+        max_entry_bytes: int = 32 * 1024,
+        shared: bool = False,
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            embedder: Embedding model of the prompts
+            index: Index of the answers
+            threshold: Default similarity required for a hit, between 0 and 1
+            max_entry_bytes: Largest response cached, in UTF-8 bytes
+            shared: Serve answers to every user instead of the user they were given to
+        """
+        self.embedder = embedder
+        self.index = index
+        self.threshold = threshold
+        self.max_entry_bytes = max_entry_bytes
+        self.shared = shared
+        self.hits = 0
+        self.misses = 0
+
+    async def embed(self, text: str) -> Optional[List[float]]:
+        """Embed a prompt, or return None if the embedder failed."""
+        try:
+            return await self.embedder.embed(text)
+        except Exception as e:
+            # The cache is an optimization: never fail a turn because of it
+            logger.warning("Could not embed prompt for the semantic cache: %s", e)
+            return None
+
+    def _scope(self, user_id: Optional[UUID]) -> str:
+        """Return the index scope of the answers given to a user."""
+        return "" if self.shared or user_id is None else str(user_id)
+
+    async def lookup(
+        self,
+        vector: Sequence[float],
+        threshold: Optional[float] = None,
+        user_id: Optional[UUID] = None,
+    ) -> Optional[str]:
+        """Get the answer of the closest prompt if it is similar enough."""
+        threshold = self.threshold if threshold is None else threshold
+        # Searching a large index takes milliseconds: keep it off the event loop
+        found = await asyncio.to_thread(self.index.search, vector, self._scope(user_id))
+        if found is not None and found[0] >= threshold:
+            self.hits += 1
+            return found[1]
+
+        self.misses += 1
+        return None
+
+    def store(
+        self, vector: Sequence[float], response: str, user_id: Optional[UUID] = None
+    ) -> bool:
+        """Cache a response, returning False if it is too large to be cached."""
+        if len(response.encode()) > self.max_entry_bytes:
+            return False
+
+        self.index.add(vector, response, self._scope(user_id))
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        """Return size, hit and miss counters and the hit ratio."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.index),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    async def aclose(self) -> None:
+        """Release the embedder."""
+        await self.embedder.aclose()
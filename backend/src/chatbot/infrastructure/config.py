@@ -1,7 +1,20 @@
 """Application configuration using environment variables."""
+from functools import lru_cache
+from typing import Any, List, Literal, Optional, cast
+
+from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class LLMEndpointSettings(BaseModel):
+    """An LLM endpoint of the router: a model behind an OpenAI-compatible API."""
+
+    model: str
+    # Default to the OpenRouter URL and key
+    base_url: Optional[str] = None
+    api_key: Optional[str] = None
+
+
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
 
@@ -16,16 +29,159 @@ class Settings(BaseSettings):
     supabase_key: str
     supabase_jwt_secret: str
 
+    # Repositories: "supabase" goes through PostgREST over HTTP, "postgres"
+    # connects to the database directly (requires the "postgres" extra)
+    repository_backend: Literal["supabase", "postgres"] = "supabase"
+    # Direct connection, e.g. postgresql://postgres:<pw>@db.<project>.supabase.co:5432/postgres
+    database_url: Optional[str] = None
+    # Connection pool (per worker) and longest query in seconds
+    database_pool_min_size: int = 2
+    database_pool_max_size: int = 10
+    database_pool_max_idle: float = 300.0
+    database_command_timeout: float = 10.0
+    # Prepared statements kept per connection; 0 behind a pooler in
+    # transaction mode (Supavisor on port 6543), which cannot keep them
+    database_statement_cache_size: int = 100
+    # Role queries run as, so that the row level security policies apply
+    database_role: str = "authenticated"
+
+    # Asymmetric (RS256/ES256) JWT verification: JWKS URL or local JSON file,
+    # e.g. https://<project>.supabase.co/auth/v1/.well-known/jwks.json
+    supabase_jwks_url: Optional[str] = None
+    jwks_refresh_interval: float = 600.0
+
+    # Verified JWT cache (per worker), entries expire with their token
+    auth_cache_size: int = 10_000
+
     # OpenRouter Configuration
     openrouter_api_key: str
     openrouter_base_url: str = "https://openrouter.ai/api/v1"
     llm_model: str = "openai/gpt-3.5-turbo"
 
+    # Extra endpoints the router may send calls to besides LLM_MODEL, as JSON, e.g.
+    # [{"model": "anthropic/claude-3-haiku"}, {"model": "gpt-4o-mini",
+    #   "base_url": "https://api.openai.com/v1", "api_key": "sk-..."}]
+    llm_fallback_endpoints: List[LLMEndpointSettings] = []
+    # Hedge calls slower than this latency percentile of their endpoint
+    llm_hedging_enabled: bool = True
+    llm_hedge_percentile: float = 0.95
+    llm_hedge_min_delay: float = 0.25
+    llm_hedge_max_ratio: float = 0.1
+    llm_latency_window: int = 200
+
+    # LLM HTTP connection pool (one pool per worker)
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+    llm_keepalive_expiry: float = 30.0
+
+    # Titles of conversations created without one, generated in the background
+    # from the first message with a cheaper model
+    title_generation_enabled: bool = True
+    title_model: str = "openai/gpt-4o-mini"
+    title_max_attempts: int = 3
+    title_retry_backoff: float = 1.0
+
+    # Concurrent calls with an identical prompt share one LLM call (per worker)
+    llm_coalesce_requests: bool = True
+
+    # Prometheus metrics are served on /metrics, merged across workers when
+    # PROMETHEUS_MULTIPROC_DIR is set (by main.py with several workers), in
+    # which case the statistics of /stats are published every interval seconds.
+    # Spans are exported to an OpenTelemetry collector if set, e.g.
+    # http://localhost:4318/v1/traces
+    metrics_stats_interval: float = Field(5.0, gt=0)
+    otlp_traces_endpoint: Optional[str] = None
+    otel_service_name: str = "supabase-chatbot"
+
+    # Admission control of message turns (per worker): turns running at once,
+    # turns waiting across users and per user, per-user rate limit (messages
+    # per second and burst) and longest wait before answering 503
+    admission_enabled: bool = True
+    admission_max_concurrent: int = 32
+    admission_max_queue: int = 128
+    admission_max_user_queue: int = 4
+    admission_user_rate: float = Field(1.0, gt=0)
+    admission_user_burst: int = Field(10, ge=1)
+    admission_queue_timeout: float = 30.0
+
+    # Opt-in LLM response cache for repeated prompts: in memory per worker,
+    # plus a SQLite file shared by the workers of a host if a path is set
+    llm_cache_enabled: bool = False
+    llm_cache_size: int = 1_000
+    llm_cache_ttl: float = 24 * 3600.0
+    llm_cache_max_entry_bytes: int = 32 * 1024
+    llm_cache_path: Optional[str] = ".cache/llm_responses.sqlite3"
+
+    # Opt-in semantic cache answering first messages similar to one already
+    # answered (per worker). Conversations may override the threshold.
+    semantic_cache_enabled: bool = False
+    semantic_cache_threshold: float = 0.92
+    semantic_cache_size: int = 10_000
+    semantic_cache_ttl: float = 24 * 3600.0
+    # PRIVACY: answers are only served back to the user who got them. Sharing
+    # them lets a user get the answer to another user's similar message,
+    # including anything that message disclosed: only for public content.
+    semantic_cache_shared: bool = False
+    # "openai": embedding model behind an OpenAI-compatible API (OpenRouter by
+    # default); "hashing": local stub for tests and benchmarks
+    embedding_provider: Literal["openai", "hashing"] = "openai"
+    embedding_model: str = "openai/text-embedding-3-small"
+    embedding_base_url: Optional[str] = None
+
+    # Conversation ownership cache (per worker)
+    conversation_cache_size: int = 10_000
+    conversation_cache_ttl: float = 60.0
+
+    # Recent conversation history cache (per worker), served once the message count of
+    # the conversation in the database matches, so that writes of other workers are seen
+    history_cache_max_bytes: int = 64 * 1024 * 1024
+    history_cache_ttl: float = 300.0
+
+    # Start send-message turns with the single round-trip `begin_turn` RPC
+    # (requires migration 006)
+    send_message_rpc: bool = False
+
+    # Conversation context sent to the LLM
+    context_max_tokens: int = 3000
+    context_max_messages: int = 100
+    context_pin_system_messages: bool = True
+
+    # Rolling summary of the turns that fall out of the context window
+    summary_enabled: bool = True
+    summary_batch_size: int = 50
+
     # Application Configuration
     app_host: str = "0.0.0.0"
     app_port: int = 8000
+    # Worker processes of `main.py`, 0 for one per CPU available to the process
+    app_workers: int = 0
+    # Event loop and HTTP parser: "auto" uses uvloop and httptools when installed
+    app_loop: Literal["auto", "asyncio", "uvloop"] = "auto"
+    app_http: Literal["auto", "h11", "httptools"] = "auto"
+    # Seconds in-flight requests and streams get to finish on SIGTERM before
+    # they are cancelled; keep it below the grace period of the orchestrator
+    app_graceful_timeout: float = 25.0
+    app_access_log: bool = True
+    # Single process reloaded on code changes
     debug: bool = False
 
 
-# Global settings instance
-settings = Settings()
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Load the settings from the environment on first use."""
+    return Settings()
+
+
+class _LazySettings:
+    """Proxy to the settings, loaded on first attribute access."""
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(get_settings(), name, value)
+
+
+# Global settings instance. Loading is deferred so that modules can be
+# imported, e.g. by tools and tests, without a complete environment.
+settings = cast(Settings, _LazySettings())
@@ -0,0 +1,73 @@
+"""Caching decorator for ConversationRepository."""
+from typing import List, Optional
+from uuid import UUID
+
+from src.chatbot.domain.entities.conversation import Conversation
+from src.chatbot.domain.entities.page_cursor import PageCursor
+from src.chatbot.domain.repositories.conversation_repository import ConversationRepository
+from src.chatbot.infrastructure.cache.lru import LRUCache
+
+
+class CachedConversationRepository(ConversationRepository):
+    """
+    Conversation repository serving ownership lookups from an in-process cache.
+
+    `get_by_id` results are cached per (conversation_id, user_id) and dropped
+    on update or delete. The cache is per worker, so a conversation deleted
+    through another worker may still be seen here until its entry expires.
+    """
+
+    def __init__(
+        self,
+        repository: ConversationRepository,
+        cache: LRUCache[Conversation],
+    ) -> None:
+        """Initialize repository wrapping another repository with a shared cache."""
+        self.repository = repository
+        self.cache = cache
+
+    def _invalidate(self, conversation_id: UUID) -> None:
+        """Drop every cached entry of a conversation."""
+        self.cache.delete_where(lambda key: key[0] == conversation_id)
+
+    async def create(self, conversation: Conversation) -> Conversation:
+        """Create a new conversation."""
+        created = await self.repository.create(conversation)
+        self.cache.set((created.id, created.user_id), created)
+        return created
+
+    async def get_by_id(self, conversation_id: UUID, user_id: UUID) -> Optional[Conversation]:
+        """Get a conversation by ID for a specific user."""
+        key = (conversation_id, user_id)
+        conversation = self.cache.get(key)
+        if conversation is not None:
+            return conversation
+
+        conversation = await self.repository.get_by_id(conversation_id, user_id)
+        if conversation is not None:
+            self.cache.set(key, conversation)
+        return conversation
+
+    async def list_all(
+        self,
+        user_id: UUID,
+        limit: int = 100,
+        offset: int = 0,
+        after: Optional[PageCursor] = None,
+    ) -> List[Conversation]:
+        """List all conversations for a specific user with pagination, newest first."""
+        return await self.repository.list_all(user_id, limit=limit, offset=offset, after=after)
+
+    async def update(self, conversation: Conversation) -> Conversation:
+        """Update an existing conversation."""
+        try:
+            return await self.repository.update(conversation)
+        finally:
+            self._invalidate(conversation.id)
+
+    async def delete(self, conversation_id: UUID) -> bool:
+        """Delete a conversation by ID."""
+        try:
+            return await self.repository.delete(conversation_id)
+        finally:
+            self._invalidate(conversation_id)
@@ -0,0 +1,93 @@
+"""Caching decorator for MessageRepository."""
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+from src.chatbot.domain.entities.message import Message
+from src.chatbot.domain.entities.page_cursor import PageCursor
+from src.chatbot.domain.repositories.message_repository import MessageRepository
+from src.chatbot.infrastructure.cache.history import ConversationHistoryCache
+
+
+class CachedMessageRepository(MessageRepository):
+    """
+    Message repository serving recent history from an in-process cache.
+
+    `list_recent` is answered from the cache when it holds enough messages and
+    falls back to the database otherwise. Messages created through this
+    repository are appended to the cache, so a hot conversation is read from
+    the database once rather than on every turn. The cache is per worker:
+    a cached tail is only served once the messages of the conversation are
+    counted in the database, which costs a single-row query instead of the
+    tail, and is reloaded when other workers wrote to it.
+    """
+
+    def __init__(self, repository: MessageRepository, cache: ConversationHistoryCache) -> None:
+        """Initialize repository wrapping another repository with a shared cache."""
+        self.repository = repository
+        self.cache = cache
+
+    async def create(self, message: Message) -> Message:
+        """Create a new message."""
+        created = await self.repository.create(message)
+        self.cache.append(created)
+        return created
+
+    async def create_many(self, messages: List[Message]) -> List[Message]:
+        """Create several messages in a single round-trip."""
+        created = await self.repository.create_many(messages)
+        for message in created:
+            self.cache.append(message)
+        return created
+
+    async def get_by_id(self, message_id: UUID) -> Optional[Message]:
+        """Get a message by ID."""
+        return await self.repository.get_by_id(message_id)
+
+    async def list_by_conversation(
+        self,
+        conversation_id: UUID,
+        limit: int = 100,
+        offset: int = 0,
+        after: Optional[PageCursor] = None,
+    ) -> List[Message]:
+        """List all messages for a conversation, oldest first."""
+        return await self.repository.list_by_conversation(
+            conversation_id, limit=limit, offset=offset, after=after
+        )
+
+    async def list_recent(self, conversation_id: UUID, limit: int = 100) -> List[Message]:
+        """List the most recent messages of a conversation in chronological order."""
+        # Messages written during the load are not in it: it is then not cached
+        version = self.cache.version(conversation_id)
+        # Counted before loading the tail, so that a message written meanwhile
+        # makes the count too low rather than goes unnoticed
+        count = await self.repository.count_by_conversation(conversation_id)
+        messages = self.cache.get_recent(conversation_id, limit, count)
+        if messages is not None:
+            return messages
+
+        messages = await self.repository.list_recent(conversation_id, limit=limit)
+        self.cache.put(conversation_id, messages, count, version=version)
+        return list(messages)
+
+    async def count_by_conversation(self, conversation_id: UUID) -> int:
+        """Count the messages of a conversation."""
+        return await self.repository.count_by_conversation(conversation_id)
+
+    async def list_before(
+        self,
+        conversation_id: UUID,
+        before: datetime,
+        after: Optional[datetime] = None,
+        limit: int = 100,
+    ) -> List[Message]:
+        """List the oldest messages created before a date, and after another if given."""
+        return await self.repository.list_before(conversation_id, before, after=after, limit=limit)
+
+    async def delete(self, message_id: UUID) -> bool:
+        """Delete a message by ID."""
+        try:
+            return await self.repository.delete(message_id)
+        finally:
+            self.cache.discard_message(message_id)
@@ -0,0 +1,45 @@
+"""Caching decorator for TurnRepository."""
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from src.chatbot.domain.entities.conversation import Conversation
+from src.chatbot.domain.entities.conversation_summary import ConversationSummary
+from src.chatbot.domain.entities.message import Message
+from src.chatbot.domain.repositories.turn_repository import TurnRepository
+from src.chatbot.infrastructure.cache.history import ConversationHistoryCache
+
+
+class CachedTurnRepository(TurnRepository):
+    """
+    Turn repository keeping the history cache in sync.
+
+    The history returned when a turn starts is fresh from the database, so it
+    replaces the cached tail of the conversation, followed by the user message.
+    The cached tail is dropped instead if the history was cut at the limit, as
+    the number of messages of the conversation is then unknown, or if the
+    conversation was written meanwhile, e.g. by another turn saving its
+    answer, as neither the tail nor the history holds all the messages.
+    """
+
+    def __init__(self, repository: TurnRepository, cache: ConversationHistoryCache) -> None:
+        """Initialize repository wrapping another repository with a shared cache."""
+        self.repository = repository
+        self.cache = cache
+
+    async def begin_turn(
+        self, user_id: UUID, user_message: Message, history_limit: int = 100
+    ) -> Optional[Tuple[Conversation, List[Message], Optional[ConversationSummary]]]:
+        """Start a turn in a single round-trip."""
+        conversation_id = user_message.conversation_id
+        version = self.cache.version(conversation_id)
+        result = await self.repository.begin_turn(user_id, user_message, history_limit)
+
+        if result is not None:
+            _, history, _ = result
+            cached = len(history) < history_limit and self.cache.put(
+                conversation_id, history + [user_message], len(history) + 1, version=version
+            )
+            if not cached:
+                self.cache.invalidate(conversation_id)
+
+        return result
@@ -0,0 +1,24 @@
+"""Keyset pagination helpers for PostgREST queries."""
+from typing import TypeVar
+
+from postgrest.base_request_builder import BaseFilterRequestBuilder
+
+from src.chatbot.domain.entities.page_cursor import PageCursor
+
+Query = TypeVar("Query", bound=BaseFilterRequestBuilder)
+
+
+def resume_after(query: Query, cursor: PageCursor, desc: bool) -> Query:
+    """
+    Restrict a query ordered on (created_at, id) to the rows after a cursor.
+
+    PostgREST has no row-value comparison, so `(created_at, id) < cursor` is
+    spelled as a range on `created_at`, which the (owner, created_at) indexes
+    answer with a seek, plus an `or` filter breaking ties on `id`.
+    """
+    created_at = cursor.created_at.isoformat()
+    operator = "lt" if desc else "gt"
+
+    query = query.lte("created_at", created_at) if desc else query.gte("created_at", created_at)
+    # Values holding reserved characters (":", ".") must be quoted inside `or`
+    return query.or_(f'created_at.{operator}."{created_at}",id.{operator}.{cursor.id}')
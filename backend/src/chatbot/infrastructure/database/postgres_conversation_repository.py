@@ -0,0 +1,126 @@
+"""Postgres implementation of ConversationRepository."""
+from typing import TYPE_CHECKING, Any, List, Mapping, Optional
+from uuid import UUID
+
+from src.chatbot.domain.entities.conversation import Conversation
+from src.chatbot.domain.entities.page_cursor import PageCursor
+from src.chatbot.domain.repositories.conversation_repository import ConversationRepository
+from src.chatbot.infrastructure.observability import instrument_repository
+
+if TYPE_CHECKING:
+    from src.chatbot.infrastructure.postgres.pool import UserDatabase
+
+# The threshold is a REAL: read it back as the decimal it was written as
+_COLUMNS = (
+    "id, user_id, title, created_at, updated_at, "
+    "semantic_cache_threshold::numeric::float8 AS semantic_cache_threshold"
+)
+
+_INSERT = f"""
+    INSERT INTO conversations (id, user_id, title, created_at, updated_at, semantic_cache_threshold)
+    VALUES ($1, $2, $3, $4, $5, $6)
+    RETURNING {_COLUMNS}
+"""
+_GET = f"SELECT {_COLUMNS} FROM conversations WHERE id = $1 AND user_id = $2"
+_LIST = f"""
+    SELECT {_COLUMNS} FROM conversations
+    WHERE user_id = $1
+    ORDER BY created_at DESC, id DESC
+    LIMIT $2 OFFSET $3
+"""
+_LIST_AFTER = f"""
+    SELECT {_COLUMNS} FROM conversations
+    WHERE user_id = $1 AND (created_at, id) < ($4, $5)
+    ORDER BY created_at DESC, id DESC
+    LIMIT $2 OFFSET $3
+"""
+_UPDATE = f"""
+    UPDATE conversations SET title = $2, updated_at = $3, semantic_cache_threshold = $4
+    WHERE id = $1
+    RETURNING {_COLUMNS}
+"""
+_DELETE = "DELETE FROM conversations WHERE id = $1 RETURNING id"
+
+
+def _conversation(record: Mapping[str, Any]) -> Conversation:
+    """Build a conversation from a database record."""
+    return Conversation(
+        id=record["id"],
+        user_id=record["user_id"],
+        title=record["title"],
+        created_at=record["created_at"],
+        updated_at=record["updated_at"],
+        semantic_cache_threshold=record["semantic_cache_threshold"],
+    )
+
+
+@instrument_repository("conversations")
+class PostgresConversationRepository(ConversationRepository):
+    """Postgres implementation of conversation repository, under the user's row level security."""
+
+    def __init__(self, database: "UserDatabase") -> None:
+        """Initialize repository with the connection pool of the current user."""
+        self.database = database
+
+    async def create(self, conversation: Conversation) -> Conversation:
+        """Create a new conversation."""
+        async with self.database.transaction() as connection:
+            record = await connection.fetchrow(
+                _INSERT,
+                conversation.id,
+                conversation.user_id,
+                conversation.title,
+                conversation.created_at,
+                conversation.updated_at,
+                conversation.semantic_cache_threshold,
+            )
+
+        return _conversation(record)
+
+    async def get_by_id(self, conversation_id: UUID, user_id: UUID) -> Optional[Conversation]:
+        """Get a conversation by ID for a specific user."""
+        async with self.database.transaction() as connection:
+            record = await connection.fetchrow(_GET, conversation_id, user_id)
+
+        return _conversation(record) if record is not None else None
+
+    async def list_all(
+        self,
+        user_id: UUID,
+        limit: int = 100,
+        offset: int = 0,
+        after: Optional[PageCursor] = None,
+    ) -> List[Conversation]:
+        """List all conversations for a specific user with pagination, newest first."""
+        async with self.database.transaction() as connection:
+            if after is None:
+                records = await connection.fetch(_LIST, user_id, limit, offset)
+            else:
+                records = await connection.fetch(
+                    _LIST_AFTER, user_id, limit, offset, after.created_at, after.id
+                )
+
+        return [_conversation(record) for record in records]
+
+    async def update(self, conversation: Conversation) -> Conversation:
+        """Update an existing conversation."""
+        async with self.database.transaction() as connection:
+            record = await connection.fetchrow(
+                _UPDATE,
+                conversation.id,
+                conversation.title,
+                conversation.updated_at,
+                conversation.semantic_cache_threshold,
+            )
+
+        if record is None:
+            raise Exception("Failed to update conversation")
+
+        return _conversation(record)
+
+    async def delete(self, conversation_id: UUID) -> bool:
+        """Delete a conversation by ID."""
+        async with self.database.transaction() as connection:
+            deleted = await connection.fetchval(_DELETE, conversation_id)
+
+        return deleted is not None
@@ -0,0 +1,62 @@
+"""Postgres implementation of ConversationSummaryRepository."""
+from typing import TYPE_CHECKING, Optional
+from uuid import UUID
+
+from src.chatbot.domain.entities.conversation_summary import ConversationSummary
+from src.chatbot.domain.repositories.conversation_summary_repository import (
+    ConversationSummaryRepository,
+)
+from src.chatbot.infrastructure.observability import instrument_repository
+
+if TYPE_CHECKING:
+    from src.chatbot.infrastructure.postgres.pool import UserDatabase
+
+_COLUMNS = "conversation_id, content, summarized_until, message_count, updated_at"
+
+_GET = f"SELECT {_COLUMNS} FROM conversation_summaries WHERE conversation_id = $1"
+_SAVE = f"""
+    INSERT INTO conversation_summaries ({_COLUMNS})
+    VALUES ($1, $2, $3, $4, $5)
+    ON CONFLICT (conversation_id) DO UPDATE SET
+        content = EXCLUDED.content,
+        summarized_until = EXCLUDED.summarized_until,
+        message_count = EXCLUDED.message_count,
+        updated_at = EXCLUDED.updated_at
+    RETURNING {_COLUMNS}
+"""
+
+
+@instrument_repository("conversation_summaries")
+class PostgresConversationSummaryRepository(ConversationSummaryRepository):
+    """Postgres implementation of conversation summary repository."""
+
+    def __init__(self, database: "UserDatabase") -> None:
+        """Initialize repository with the connection pool of the current user."""
+        self.database = database
+
+    async def get(self, conversation_id: UUID) -> Optional[ConversationSummary]:
+        """Get the summary of a conversation."""
+        async with self.database.transaction() as connection:
+            record = await connection.fetchrow(_GET, conversation_id)
+
+        if record is None:
+            return None
+
+        return ConversationSummary(**record)
+
+    async def save(self, summary: ConversationSummary) -> ConversationSummary:
+        """Create or replace the summary of a conversation."""
+        async with self.database.transaction() as connection:
+            record = await connection.fetchrow(
+                _SAVE,
+                summary.conversation_id,
+                summary.content,
+                summary.summarized_until,
+                summary.message_count,
+                summary.updated_at,
+            )
+
+        if record is None:
+            raise Exception("Failed to save conversation summary")
+
+        return ConversationSummary(**record)
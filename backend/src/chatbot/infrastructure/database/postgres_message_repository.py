@@ -0,0 +1,175 @@
+"""Postgres implementation of MessageRepository."""
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, List, Mapping, Optional
+from uuid import UUID
+
+from src.chatbot.domain.entities.message import Message, MessageRole
+from src.chatbot.domain.entities.page_cursor import PageCursor
+from src.chatbot.domain.repositories.message_repository import MessageRepository
+from src.chatbot.infrastructure.observability import instrument_repository
+
+if TYPE_CHECKING:
+    from src.chatbot.infrastructure.postgres.pool import UserDatabase
+
+_COLUMNS = "id, conversation_id, role, content, created_at"
+
+_INSERT = f"""
+    INSERT INTO messages ({_COLUMNS})
+    VALUES ($1, $2, $3, $4, $5)
+    RETURNING {_COLUMNS}
+"""
+# One statement whatever the number of messages
+_INSERT_MANY = f"""
+    INSERT INTO messages ({_COLUMNS})
+    SELECT * FROM unnest($1::uuid[], $2::uuid[], $3::text[], $4::text[], $5::timestamptz[])
+    RETURNING {_COLUMNS}
+"""
+_GET = f"SELECT {_COLUMNS} FROM messages WHERE id = $1"
+_LIST = f"""
+    SELECT {_COLUMNS} FROM messages
+    WHERE conversation_id = $1
+    ORDER BY created_at, id
+    LIMIT $2 OFFSET $3
+"""
+_LIST_AFTER = f"""
+    SELECT {_COLUMNS} FROM messages
+    WHERE conversation_id = $1 AND (created_at, id) > ($4, $5)
+    ORDER BY created_at, id
+    LIMIT $2 OFFSET $3
+"""
+_LIST_RECENT = f"""
+    SELECT {_COLUMNS} FROM messages
+    WHERE conversation_id = $1
+    ORDER BY created_at DESC
+    LIMIT $2
+"""
+_COUNT = "SELECT count(*) FROM messages WHERE conversation_id = $1"
+_LIST_BEFORE = f"""
+    SELECT {_COLUMNS} FROM messages
+    WHERE conversation_id = $1 AND created_at < $2
+    ORDER BY created_at
+    LIMIT $3
+"""
+_LIST_BETWEEN = f"""
+    SELECT {_COLUMNS} FROM messages
+    WHERE conversation_id = $1 AND created_at < $2 AND created_at > $4
+    ORDER BY created_at
+    LIMIT $3
+"""
+_DELETE = "DELETE FROM messages WHERE id = $1 RETURNING id"
+
+# Roles by value, quicker to look up than MessageRole(value)
+_ROLES = {role.value: role for role in MessageRole}
+
+
+def _message(record: Mapping[str, Any]) -> Message:
+    """Build a message from a database record."""
+    return Message(
+        id=record["id"],
+        conversation_id=record["conversation_id"],
+        role=_ROLES[record["role"]],
+        content=record["content"],
+        created_at=record["created_at"],
+    )
+
+
+@instrument_repository("messages")
+class PostgresMessageRepository(MessageRepository):
+    """Postgres implementation of message repository, under the user's row level security."""
+
+    def __init__(self, database: "UserDatabase") -> None:
+        """Initialize repository with the connection pool of the current user."""
+        self.database = database
+
+    async def create(self, message: Message) -> Message:
+        """Create a new message."""
+        async with self.database.transaction() as connection:
+            record = await connection.fetchrow(
+                _INSERT,
+                message.id,
+                message.conversation_id,
+                message.role.value,
+                message.content,
+                message.created_at,
+            )
+
+        return _message(record)
+
+    async def create_many(self, messages: List[Message]) -> List[Message]:
+        """Create several messages in a single round-trip."""
+        async with self.database.transaction() as connection:
+            records = await connection.fetch(
+                _INSERT_MANY,
+                [message.id for message in messages],
+                [message.conversation_id for message in messages],
+                [message.role.value for message in messages],
+                [message.content for message in messages],
+                [message.created_at for message in messages],
+            )
+
+        if len(records) != len(messages):
+            raise Exception("Failed to create messages")
+
+        return [_message(record) for record in records]
+
+    async def get_by_id(self, message_id: UUID) -> Optional[Message]:
+        """Get a message by ID."""
+        async with self.database.transaction() as connection:
+            record = await connection.fetchrow(_GET, message_id)
+
+        return _message(record) if record is not None else None
+
+    async def list_by_conversation(
+        self,
+        conversation_id: UUID,
+        limit: int = 100,
+        offset: int = 0,
+        after: Optional[PageCursor] = None,
+    ) -> List[Message]:
+        """List all messages for a conversation, oldest first."""
+        async with self.database.transaction() as connection:
+            if after is None:
+                records = await connection.fetch(_LIST, conversation_id, limit, offset)
+            else:
+                records = await connection.fetch(
+                    _LIST_AFTER, conversation_id, limit, offset, after.created_at, after.id
+                )
+
+        return [_message(record) for record in records]
+
+    async def list_recent(self, conversation_id: UUID, limit: int = 100) -> List[Message]:
+        """List the most recent messages of a conversation in chronological order."""
+        async with self.database.transaction() as connection:
+            records = await connection.fetch(_LIST_RECENT, conversation_id, limit)
+
+        return [_message(record) for record in reversed(records)]
+
+    async def count_by_conversation(self, conversation_id: UUID) -> int:
+        """Count the messages of a conversation."""
+        async with self.database.transaction() as connection:
+            return await connection.fetchval(_COUNT, conversation_id)
+
+    async def list_before(
+        self,
+        conversation_id: UUID,
+        before: datetime,
+        after: Optional[datetime] = None,
+        limit: int = 100,
+    ) -> List[Message]:
+        """List the oldest messages created before a date, and after another if given."""
+        async with self.database.transaction() as connection:
+            if after is None:
+                records = await connection.fetch(_LIST_BEFORE, conversation_id, before, limit)
+            else:
+                records = await connection.fetch(
+                    _LIST_BETWEEN, conversation_id, before, limit, after
+                )
+
+        return [_message(record) for record in records]
+
+    async def delete(self, message_id: UUID) -> bool:
+        """Delete a message by ID."""
+        async with self.database.transaction() as connection:
+            deleted = await connection.fetchval(_DELETE, message_id)
+
+        return deleted is not None
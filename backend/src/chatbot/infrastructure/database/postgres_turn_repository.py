@@ -0,0 +1,54 @@
+"""Postgres implementation of TurnRepository."""
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from uuid import UUID
+
+import orjson
+
+from src.chatbot.domain.entities.conversation import Conversation
+from src.chatbot.domain.entities.conversation_summary import ConversationSummary
+from src.chatbot.domain.entities.message import Message
+from src.chatbot.domain.repositories.turn_repository import TurnRepository
+from src.chatbot.infrastructure.observability import instrument_repository
+
+if TYPE_CHECKING:
+    from src.chatbot.infrastructure.postgres.pool import UserDatabase
+
+_BEGIN_TURN = "SELECT begin_turn($1, $2, $3, $4, $5, $6)"
+
+
+@instrument_repository("turns")
+class PostgresTurnRepository(TurnRepository):
+    """Postgres implementation of turn repository, backed by the `begin_turn` function."""
+
+    def __init__(self, database: "UserDatabase") -> None:
+        """Initialize repository with the connection pool of the current user."""
+        self.database = database
+
+    async def begin_turn(
+        self, user_id: UUID, user_message: Message, history_limit: int = 100
+    ) -> Optional[Tuple[Conversation, List[Message], Optional[ConversationSummary]]]:
+        """Start a turn in a single round-trip."""
+        async with self.database.transaction() as connection:
+            result = await connection.fetchval(
+                _BEGIN_TURN,
+                user_message.conversation_id,
+                user_id,
+                user_message.id,
+                user_message.content,
+                user_message.created_at,
+                history_limit,
+            )
+
+        if result is None:
+            return None
+
+        # asyncpg returns JSON values as text
+        data = orjson.loads(result)
+        history = [Message.from_row(item) for item in data["history"]]
+        summary = data["summary"]
+
+        return (
+            Conversation.from_row(data["conversation"]),
+            history,
+            ConversationSummary(**summary) if summary else None,
+        )
@@ -2,40 +2,36 @@
 from typing import List, Optional
 from uuid import UUID
 
-from supabase import Client
+from supabase import AsyncClient
 
 from src.chatbot.domain.entities.conversation import Conversation
+from src.chatbot.domain.entities.page_cursor import PageCursor
 from src.chatbot.domain.repositories.conversation_repository import ConversationRepository
+from src.chatbot.infrastructure.database.pagination import resume_after
+from src.chatbot.infrastructure.observability import instrument_repository
 
 
+@instrument_repository("conversations")
 class SupabaseConversationRepository(ConversationRepository):
     """Supabase implementation of conversation repository."""
 
-    def __init__(self, client: Client) -> None:
-        """Initialize repository with Supabase client."""
+    def __init__(self, client: AsyncClient) -> None:
+        """Initialize repository with async Supabase client."""
         self.client = client
         self.table_name = "conversations"
 
     async def create(self, conversation: Conversation) -> Conversation:
         """Create a new conversation."""
-        data = {
-            "id": str(conversation.id),
-            "user_id": str(conversation.user_id),
-            "title": conversation.title,
-            "created_at": conversation.created_at.isoformat(),
-            "updated_at": conversation.updated_at.isoformat(),
-        }
-
-        result = self.client.table(self.table_name).insert(data).execute()
+        result = await self.client.table(self.table_name).insert(conversation.to_row()).execute()
 
         if not result.data:
             raise Exception("Failed to create conversation")
 
-        return Conversation(**result.data[0])
+        return Conversation.from_row(result.data[0])
 
     async def get_by_id(self, conversation_id: UUID, user_id: UUID) -> Optional[Conversation]:
         """Get a conversation by ID for a specific user."""
-        result = (
+        result = await (
             self.client.table(self.table_name)
             .select("*")
             .eq("id", str(conversation_id))
@@ -46,30 +42,37 @@ class SupabaseConversationRepository(ConversationRepository):
         if not result.data:
             return None
 
-        return Conversation(**result.data[0])
-
-    async def list_all(self, user_id: UUID, limit: int = 100, offset: int = 0) -> List[Conversation]:
-        """List all conversations for a specific user with pagination."""
-        result = (
-            self.client.table(self.table_name)
-            .select("*")
-            .eq("user_id", str(user_id))
-            .order("created_at", desc=True)
-            .limit(limit)
-            .offset(offset)
-            .execute()
+        return Conversation.from_row(result.data[0])
+
+    async def list_all(
+        self,
+        user_id: UUID,
+        limit: int = 100,
+        offset: int = 0,
+        after: Optional[PageCursor] = None,
+    ) -> List[Conversation]:
+        """List all conversations for a specific user with pagination, newest first."""
+        query = self.client.table(self.table_name).select("*").eq("user_id", str(user_id))
+        if after is not None:
+            query = resume_after(query, after, desc=True)
+        if offset:
+            query = query.offset(offset)
+
+        result = await (
+            query.order("created_at", desc=True).order("id", desc=True).limit(limit).execute()
         )
 
-        return [Conversation(**item) for item in result.data]
+        return [Conversation.from_row(item) for item in result.data]
 
     async def update(self, conversation: Conversation) -> Conversation:
         """Update an existing conversation."""
         data = {
             "title": conversation.title,
             "updated_at": conversation.updated_at.isoformat(),
+            "semantic_cache_threshold": conversation.semantic_cache_threshold,
         }
 
-        result = (
+        result = await (
             self.client.table(self.table_name)
             .update(data)
             .eq("id", str(conversation.id))
@@ -79,11 +82,11 @@ class SupabaseConversationRepository(ConversationRepository):
         if not result.data:
             raise Exception("Failed to update conversation")
 
-        return Conversation(**result.data[0])
+        return Conversation.from_row(result.data[0])
 
     async def delete(self, conversation_id: UUID) -> bool:
         """Delete a conversation by ID."""
-        result = (
+        result = await (
             self.client.table(self.table_name)
             .delete()
             .eq("id", str(conversation_id))
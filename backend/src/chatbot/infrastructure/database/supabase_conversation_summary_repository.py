@@ -0,0 +1,56 @@
+"""Supabase implementation of ConversationSummaryRepository."""
+from typing import Optional
+from uuid import UUID
+
+from supabase import AsyncClient
+
+from src.chatbot.domain.entities.conversation_summary import ConversationSummary
+from src.chatbot.domain.repositories.conversation_summary_repository import (
+    ConversationSummaryRepository,
+)
+from src.chatbot.infrastructure.observability import instrument_repository
+
+
+@instrument_repository("conversation_summaries")
+class SupabaseConversationSummaryRepository(ConversationSummaryRepository):
+    """Supabase implementation of conversation summary repository."""
+
+    def __init__(self, client: AsyncClient) -> None:
+        """Initialize repository with async Supabase client."""
+        self.client = client
+        self.table_name = "conversation_summaries"
+
+    async def get(self, conversation_id: UUID) -> Optional[ConversationSummary]:
+        """Get the summary of a conversation."""
+        result = await (
+            self.client.table(self.table_name)
+            .select("*")
+            .eq("conversation_id", str(conversation_id))
+            .execute()
+        )
+
+        if not result.data:
+            return None
+
+        return ConversationSummary(**result.data[0])
+
+    async def save(self, summary: ConversationSummary) -> ConversationSummary:
+        """Create or replace the summary of a conversation."""
+        data = {
+            "conversation_id": str(summary.conversation_id),
+            "content": summary.content,
+            "summarized_until": summary.summarized_until.isoformat(),
+            "message_count": summary.message_count,
+            "updated_at": summary.updated_at.isoformat(),
+        }
+
+        result = await (
+            self.client.table(self.table_name)
+            .upsert(data, on_conflict="conversation_id")
+            .execute()
+        )
+
+        if not result.data:
+            raise Exception("Failed to save conversation summary")
+
+        return ConversationSummary(**result.data[0])
@@ -1,41 +1,50 @@
 """Supabase implementation of MessageRepository."""
+from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
 
-from supabase import Client
+from postgrest.types import CountMethod
+from supabase import AsyncClient
 
 from src.chatbot.domain.entities.message import Message
+from src.chatbot.domain.entities.page_cursor import PageCursor
 from src.chatbot.domain.repositories.message_repository import MessageRepository
+from src.chatbot.infrastructure.database.pagination import resume_after
+from src.chatbot.infrastructure.observability import instrument_repository
 
 
+@instrument_repository("messages")
 class SupabaseMessageRepository(MessageRepository):
     """Supabase implementation of message repository."""
 
-    def __init__(self, client: Client) -> None:
-        """Initialize repository with Supabase client."""
+    def __init__(self, client: AsyncClient) -> None:
+        """Initialize repository with async Supabase client."""
         self.client = client
         self.table_name = "messages"
 
     async def create(self, message: Message) -> Message:
         """Create a new message."""
-        data = {
-            "id": str(message.id),
-            "conversation_id": str(message.conversation_id),
-            "role": message.role.value,
-            "content": message.content,
-            "created_at": message.created_at.isoformat(),
-        }
-
-        result = self.client.table(self.table_name).insert(data).execute()
+        result = await self.client.table(self.table_name).insert(message.to_row()).execute()
 
         if not result.data:
             raise Exception("Failed to create message")
 
-        return Message(**result.data[0])
+        return Message.from_row(result.data[0])
+
+    async def create_many(self, messages: List[Message]) -> List[Message]:
+        """Create several messages in a single round-trip."""
+        data = [message.to_row() for message in messages]
+
+        result = await self.client.table(self.table_name).insert(data).execute()
+
+        if len(result.data) != len(messages):
+            raise Exception("Failed to create messages")
+
+        return [Message.from_row(item) for item in result.data]
 
     async def get_by_id(self, message_id: UUID) -> Optional[Message]:
         """Get a message by ID."""
-        result = (
+        result = await (
             self.client.table(self.table_name)
             .select("*")
             .eq("id", str(message_id))
@@ -45,27 +54,80 @@ class SupabaseMessageRepository(MessageRepository):
         if not result.data:
             return None
 
-        return Message(**result.data[0])
+        return Message.from_row(result.data[0])
 
     async def list_by_conversation(
-        self, conversation_id: UUID, limit: int = 100, offset: int = 0
+        self,
+        conversation_id: UUID,
+        limit: int = 100,
+        offset: int = 0,
+        after: Optional[PageCursor] = None,
     ) -> List[Message]:
-        """List all messages for a conversation."""
-        result = (
+        """List all messages for a conversation, oldest first."""
+        query = (
+            self.client.table(self.table_name)
+            .select("*")
+            .eq("conversation_id", str(conversation_id))
+        )
+        if after is not None:
+            query = resume_after(query, after, desc=False)
+        if offset:
+            query = query.offset(offset)
+
+        result = await (
+            query.order("created_at", desc=False).order("id", desc=False).limit(limit).execute()
+        )
+
+        return [Message.from_row(item) for item in result.data]
+
+    async def list_recent(self, conversation_id: UUID, limit: int = 100) -> List[Message]:
+        """List the most recent messages of a conversation in chronological order."""
+        result = await (
             self.client.table(self.table_name)
             .select("*")
             .eq("conversation_id", str(conversation_id))
-            .order("created_at", desc=False)
+            .order("created_at", desc=True)
             .limit(limit)
-            .offset(offset)
             .execute()
         )
 
-        return [Message(**item) for item in result.data]
+        return [Message.from_row(item) for item in reversed(result.data)]
+
+    async def count_by_conversation(self, conversation_id: UUID) -> int:
+        """Count the messages of a conversation."""
+        result = await (
+            self.client.table(self.table_name)
+            .select("id", count=CountMethod.exact, head=True)
+            .eq("conversation_id", str(conversation_id))
+            .execute()
+        )
+
+        return result.count or 0
+
+    async def list_before(
+        self,
+        conversation_id: UUID,
+        before: datetime,
+        after: Optional[datetime] = None,
+        limit: int = 100,
+    ) -> List[Message]:
+        """List the oldest messages created before a date, and after another if given."""
+        query = (
+            self.client.table(self.table_name)
+            .select("*")
+            .eq("conversation_id", str(conversation_id))
+            .lt("created_at", before.isoformat())
+        )
+        if after is not None:
+            query = query.gt("created_at", after.isoformat())
+
+        result = await query.order("created_at", desc=False).limit(limit).execute()
+
+        return [Message.from_row(item) for item in result.data]
 
     async def delete(self, message_id: UUID) -> bool:
         """Delete a message by ID."""
-        result = (
+        result = await (
             self.client.table(self.table_name)
             .delete()
             .eq("id", str(message_id))
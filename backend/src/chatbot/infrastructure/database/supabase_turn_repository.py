@@ -0,0 +1,57 @@
+"""Supabase implementation of TurnRepository."""
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from supabase import AsyncClient
+
+from src.chatbot.domain.entities.conversation import Conversation
+from src.chatbot.domain.entities.conversation_summary import ConversationSummary
+from src.chatbot.domain.entities.message import Message
+from src.chatbot.domain.repositories.turn_repository import TurnRepository
+from src.chatbot.infrastructure.observability import instrument_repository
+
+
+@instrument_repository("turns")
+class SupabaseTurnRepository(TurnRepository):
+    """
+    Supabase implementation of turn repository, backed by the `begin_turn` RPC.
+
+    The function only acts for the user of the JWT it is called with, so it
+    is called with the token of the request rather than the key of the client.
+    """
+
+    def __init__(self, client: AsyncClient, access_token: str) -> None:
+        """Initialize repository with async Supabase client and the JWT of the user."""
+        self.client = client
+        self.access_token = access_token
+
+    async def begin_turn(
+        self, user_id: UUID, user_message: Message, history_limit: int = 100
+    ) -> Optional[Tuple[Conversation, List[Message], Optional[ConversationSummary]]]:
+        """Start a turn in a single round-trip."""
+        params = {
+            "p_conversation_id": str(user_message.conversation_id),
+            "p_user_id": str(user_id),
+            "p_message_id": str(user_message.id),
+            "p_content": user_message.content,
+            "p_created_at": user_message.created_at.isoformat(),
+            "p_history_limit": history_limit,
+        }
+
+        query = self.client.rpc("begin_turn", params)
+        # postgrest >= 2.25 keeps the request of a query in `request`, older versions its headers
+        headers = query.request.headers if hasattr(query, "request") else query.headers
+        headers["Authorization"] = f"Bearer {self.access_token}"
+        result = await query.execute()
+
+        if not result.data:
+            return None
+
+        history = [Message.from_row(item) for item in result.data["history"]]
+        summary = result.data["summary"]
+
+        return (
+            Conversation.from_row(result.data["conversation"]),
+            history,
+            ConversationSummary(**summary) if summary else None,
+        )
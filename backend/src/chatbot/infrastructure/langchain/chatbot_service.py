@@ -1,29 +1,133 @@
 """LangChain chatbot service implementation."""
-from typing import List
+import logging
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional, Tuple
+from uuid import UUID
 
-from langchain_openai import ChatOpenAI
-from langchain.schema import HumanMessage, AIMessage, SystemMessage
+import httpx
 
 from src.chatbot.domain.entities.message import Message, MessageRole
-from src.chatbot.infrastructure.config import settings
+from src.chatbot.infrastructure.cache.response import ResponseCache
+from src.chatbot.infrastructure.config import LLMEndpointSettings, settings
+from src.chatbot.infrastructure.langchain.llm_router import LLMEndpoint, LLMRouter
+from src.chatbot.infrastructure.single_flight import SingleFlight
+
+if TYPE_CHECKING:
+    from src.chatbot.infrastructure.cache.semantic import SemanticCache
+
+logger = logging.getLogger(__name__)
 
 
 class ChatbotService:
-    """Service for chatbot interactions using LangChain."""
+    """
+    Service for chatbot interactions using LangChain.
+
+    One instance is shared by all requests of a worker so that calls to
+    OpenRouter reuse pooled keep-alive connections. Calls go through a router
+    picking the fastest configured endpoint, with failover and hedging. When given a response
+    cache, replies to a prompt already answered are served from it. When given
+    a semantic cache, a message opening a conversation may also be answered
+    with the reply to a similar enough first message. Unless disabled,
+    concurrent calls with an identical prompt share a single LLM call.
 
-    def __init__(self) -> None:
+    LangChain is only imported once the service is created, so that importing
+    the application stays fast.
+    """
+
+    def __init__(
+        self,
+        response_cache: Optional[ResponseCache] = None,
+        semantic_cache: Optional["SemanticCache"] = None,
+        coalesce_requests: bool = True,
+    ) -> None:
         """Initialize the chatbot service with OpenRouter."""
-        self.llm = ChatOpenAI(
-            model=settings.llm_model,
-            temperature=0.7,
+        from langchain_openai import ChatOpenAI
+
+        self.response_cache = response_cache
+        self.semantic_cache = semantic_cache
+        self.single_flight = SingleFlight() if coalesce_requests else None
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.llm_max_connections,
+                max_keepalive_connections=settings.llm_max_keepalive_connections,
+                keepalive_expiry=settings.llm_keepalive_expiry,
+            ),
+        )
+        endpoints = [LLMEndpointSettings(model=settings.llm_model)]
+        endpoints += settings.llm_fallback_endpoints
+        self.router = LLMRouter(
+            [
+                LLMEndpoint(
+                    self._endpoint_name(endpoint),
+                    ChatOpenAI(
+                        model=endpoint.model,
+                        temperature=0.7,
+                        openai_api_key=endpoint.api_key or settings.openrouter_api_key,
+                        openai_api_base=endpoint.base_url or settings.openrouter_base_url,
+                        http_async_client=self.http_client,
+                        # Streamed responses end with their token usage
+                        stream_usage=True,
+                        # The router fails over to another endpoint rather than retrying
+                        max_retries=0 if len(endpoints) > 1 else 2,
+                    ),
+                    window=settings.llm_latency_window,
+                )
+                for endpoint in endpoints
+            ],
+            hedging=settings.llm_hedging_enabled,
+            hedge_percentile=settings.llm_hedge_percentile,
+            hedge_min_delay=settings.llm_hedge_min_delay,
+            max_hedge_ratio=settings.llm_hedge_max_ratio,
+        )
+        # Primary endpoint, whose model and temperature identify cached responses
+        self.llm = self.router.endpoints[0].llm
+        # Titles are short and need no more than a small model
+        self.title_llm = ChatOpenAI(
+            model=settings.title_model,
+            temperature=0.3,
+            max_tokens=30,
             openai_api_key=settings.openrouter_api_key,
             openai_api_base=settings.openrouter_base_url,
+            http_async_client=self.http_client,
         )
 
-    def _convert_messages(self, messages: List[Message]) -> List:
-        """Convert domain messages to LangChain messages."""
+    @staticmethod
+    def _endpoint_name(endpoint: LLMEndpointSettings) -> str:
+        """Name of an endpoint in statistics."""
+        return f"{endpoint.model} ({endpoint.base_url})" if endpoint.base_url else endpoint.model
+
+    async def warmup(self) -> None:
+        """Open a pooled connection to every LLM provider before serving traffic."""
+        providers = {
+            (endpoint.llm.openai_api_base, endpoint.llm.openai_api_key.get_secret_value())
+            for endpoint in self.router.endpoints
+        }
+        for base_url, api_key in providers:
+            try:
+                await self.http_client.get(
+                    f"{base_url.rstrip('/')}/models",
+                    headers={"Authorization": f"Bearer {api_key}"},
+                )
+            except httpx.HTTPError as e:
+                # Not fatal: the first request will open the connection instead
+                logger.warning("Could not warm up LLM connection pool: %s", e)
+
+    async def aclose(self) -> None:
+        """Cancel the LLM calls in flight and close the pooled HTTP connections."""
+        if self.single_flight:
+            await self.single_flight.aclose()
+        await self.http_client.aclose()
+
+    def _convert_messages(self, messages: List[Message], summary: Optional[str] = None) -> List:
+        """Convert domain messages to LangChain messages, prefixed by the summary if any."""
+        from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
         langchain_messages = []
 
+        if summary:
+            langchain_messages.append(
+                SystemMessage(content=f"Summary of the earlier conversation:\n{summary}")
+            )
+
         for msg in messages:
             if msg.role == MessageRole.USER:
                 langchain_messages.append(HumanMessage(content=msg.content))
@@ -34,26 +138,191 @@ class ChatbotService:
 
         return langchain_messages
 
+    def _build_prompt(
+        self,
+        user_message: str,
+        conversation_history: List[Message],
+        summary: Optional[str] = None,
+    ) -> List:
+        """Build the LangChain prompt from the history and the new user message."""
+        from langchain_core.messages import HumanMessage
+
+        messages = self._convert_messages(conversation_history, summary)
+        messages.append(HumanMessage(content=user_message))
+        return messages
+
+    def _cache_key(self, messages: List) -> str:
+        """Fingerprint a prompt for the response cache."""
+        return ResponseCache.key(
+            self.llm.model_name,
+            self.llm.temperature,
+            [(message.type, message.content) for message in messages],
+        )
+
+    async def _cached_response(
+        self,
+        messages: List,
+        standalone_message: Optional[str],
+        semantic_cache_threshold: Optional[float],
+        user_id: Optional[UUID],
+    ) -> Tuple[Optional[str], Optional[str], Optional[List[float]]]:
+        """
+        Look a prompt up in the response cache, then in the semantic cache.
+
+        Only a standalone message, sent without history or summary, goes
+        through the semantic cache: a similar message means the same thing
+        only when no earlier turn gives it context. Its answers are those
+        given to the same user, unless the semantic cache is shared.
+
+        Returns:
+            The cached response if any, the response cache key and the
+            embedding of the message, with which to cache a new response
+        """
+        key = embedding = None
+
+        if self.response_cache:
+            key = self._cache_key(messages)
+            cached = await self.response_cache.get(key)
+            if cached is not None:
+                return cached, key, None
+
+        if self.semantic_cache and standalone_message is not None:
+            embedding = await self.semantic_cache.embed(standalone_message)
+            if embedding is not None:
+                cached = await self.semantic_cache.lookup(
+                    embedding, semantic_cache_threshold, user_id
+                )
+                if cached is not None:
+                    return cached, key, None
+
+        return None, key, embedding
+
+    async def _cache_response(
+        self,
+        response: str,
+        key: Optional[str],
+        embedding: Optional[List[float]],
+        user_id: Optional[UUID],
+    ) -> None:
+        """Cache a new response under its key and the embedding of its message."""
+        if key is not None:
+            await self.response_cache.set(key, response)
+        if embedding is not None:
+            self.semantic_cache.store(embedding, response, user_id)
+
+    async def _call_llm(
+        self,
+        messages: List,
+        stream: bool,
+        key: Optional[str],
+        embedding: Optional[List[float]],
+        user_id: Optional[UUID],
+    ) -> AsyncIterator[str]:
+        """Call the LLM, streamed or not, and cache the complete response."""
+        if stream:
+            chunks = []
+            async for chunk in self.router.astream(messages):
+                if chunk.content:
+                    chunks.append(chunk.content)
+                    yield chunk.content
+            response = "".join(chunks)
+        else:
+            response = (await self.router.ainvoke(messages)).content
+            yield response
+
+        # Only complete responses are cached
+        if response:
+            await self._cache_response(response, key, embedding, user_id)
+
+    def _generate(
+        self,
+        messages: List,
+        stream: bool,
+        key: Optional[str],
+        embedding: Optional[List[float]],
+        user_id: Optional[UUID],
+    ) -> AsyncIterator[str]:
+        """Get the response chunks, following an identical call in flight if any."""
+        if not self.single_flight:
+            return self._call_llm(messages, stream, key, embedding, user_id)
+
+        # Chunks are shared by streamed and non-streamed calls alike
+        return self.single_flight.stream(
+            key or self._cache_key(messages),
+            lambda: self._call_llm(messages, stream, key, embedding, user_id),
+        )
+
     async def generate_response(
-        self, user_message: str, conversation_history: List[Message]
+        self,
+        user_message: str,
+        conversation_history: List[Message],
+        summary: Optional[str] = None,
+        semantic_cache_threshold: Optional[float] = None,
+        user_id: Optional[UUID] = None,
     ) -> str:
         """Generate a response using the LLM."""
-        # Convert conversation history to LangChain format
-        messages = self._convert_messages(conversation_history)
+        messages = self._build_prompt(user_message, conversation_history, summary)
+        standalone = None if conversation_history or summary else user_message
 
-        # Add the new user message
-        messages.append(HumanMessage(content=user_message))
+        cached, key, embedding = await self._cached_response(
+            messages, standalone, semantic_cache_threshold, user_id
+        )
+        if cached is not None:
+            return cached
 
         # Get response from LLM
-        response = await self.llm.ainvoke(messages)
+        chunks = [chunk async for chunk in self._generate(messages, False, key, embedding, user_id)]
+        return "".join(chunks)
 
-        return response.content
+    async def stream_response(
+        self,
+        user_message: str,
+        conversation_history: List[Message],
+        summary: Optional[str] = None,
+        semantic_cache_threshold: Optional[float] = None,
+        user_id: Optional[UUID] = None,
+    ) -> AsyncIterator[str]:
+        """Stream the response from the LLM token by token."""
+        messages = self._build_prompt(user_message, conversation_history, summary)
+        standalone = None if conversation_history or summary else user_message
+
+        cached, key, embedding = await self._cached_response(
+            messages, standalone, semantic_cache_threshold, user_id
+        )
+        if cached is not None:
+            yield cached
+            return
+
+        async for chunk in self._generate(messages, True, key, embedding, user_id):
+            yield chunk
 
     async def generate_conversation_title(self, first_message: str) -> str:
         """Generate a title for the conversation based on the first message."""
-        prompt = f"Generate a short title (max 50 characters) for a conversation that starts with: '{first_message}'. Only return the title, nothing else."
+        from langchain_core.messages import HumanMessage
+
+        prompt = (
+            "Generate a short title (max 50 characters) for a conversation that starts with: "
+            f"'{first_message}'. Only return the title, nothing else."
+        )
 
         messages = [HumanMessage(content=prompt)]
-        response = await self.llm.ainvoke(messages)
+        response = await self.title_llm.ainvoke(messages)
+
+        return response.content.strip().strip('"')
+
+    async def summarize(self, previous_summary: Optional[str], messages: List[Message]) -> str:
+        """Fold new conversation lines into a running summary."""
+        from langchain_core.messages import HumanMessage
+
+        lines = "\n".join(f"{msg.role.value}: {msg.content}" for msg in messages)
+        prompt = (
+            "Progressively summarize the lines of conversation provided, adding onto the "
+            "previous summary and returning a new summary. Keep facts, decisions and open "
+            "questions; drop small talk. Only return the summary, nothing else.\n\n"
+            f"Previous summary:\n{previous_summary or '(none)'}\n\n"
+            f"New lines of conversation:\n{lines}"
+        )
+
+        response = await self.router.ainvoke([HumanMessage(content=prompt)], kind="summary")
 
         return response.content.strip()
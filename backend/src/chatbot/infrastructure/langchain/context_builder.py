@@ -0,0 +1,139 @@
+"""Token-budgeted context window for conversation history."""
+import logging
+from collections import OrderedDict
+from typing import Any, List, Optional
+from uuid import UUID
+
+from src.chatbot.domain.entities.message import Message, MessageRole
+
+logger = logging.getLogger(__name__)
+
+# Tokens added by the chat format around each message (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Rough characters-per-token ratio used when no tokenizer is available
+FALLBACK_CHARS_PER_TOKEN = 4
+
+
+class TokenCounter:
+    """
+    Count prompt tokens for messages.
+
+    Uses the tiktoken encoding of the configured model, falling back to a
+    character-based estimate when the encoding cannot be loaded (unknown model
+    or no network access to fetch the encoding files). Message counts are
+    cached by message ID since stored messages never change.
+    """
+
+    def __init__(self, model: str, cache_size: int = 10_000) -> None:
+        """Initialize the counter for a model, e.g. "openai/gpt-3.5-turbo"."""
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[UUID, int]" = OrderedDict()
+        self._encoding = self._load_encoding(model)
+
+    @staticmethod
+    def _load_encoding(model: str) -> Optional[Any]:
+        """Load the tiktoken encoding for an OpenRouter model name."""
+        import tiktoken
+
+        try:
+            try:
+                return tiktoken.encoding_for_model(model.split("/")[-1])
+            except KeyError:
+                return tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.warning("Tokenizer unavailable, estimating token counts: %s", e)
+            return None
+
+    def count_text(self, text: str) -> int:
+        """Count the tokens of a raw text."""
+        if self._encoding is None:
+            return len(text) // FALLBACK_CHARS_PER_TOKEN + 1
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    def count(self, message: Message) -> int:
+        """Count the tokens a message takes in the prompt."""
+        cached = self._cache.get(message.id)
+        if cached is not None:
+            self._cache.move_to_end(message.id)
+            return cached
+
+        tokens = self.count_text(message.content) + MESSAGE_OVERHEAD_TOKENS
+        self._cache[message.id] = tokens
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        return tokens
+
+
+class ContextBuilder:
+    """
+    Select the conversation history sent to the LLM.
+
+    Keeps the most recent messages that fit in a token budget, after
+    reserving room for the new user message and, optionally, for system
+    messages which are always kept.
+    """
+
+    def __init__(
+        self,
+        token_counter: TokenCounter,
+        max_tokens: int,
+        max_messages: int = 100,
+        pin_system_messages: bool = True,
+    ) -> None:
+        """
+        Initialize the builder.
+
+        Args:
+            token_counter: Counter used to measure messages
+            max_tokens: Token budget for history plus the new user message
+            max_messages: Number of recent messages to load as candidates
+            pin_system_messages: Always keep system messages among the candidates
+        """
+        self.token_counter = token_counter
+        self.max_tokens = max_tokens
+        self.max_messages = max_messages
+        self.pin_system_messages = pin_system_messages
+
+    def build(
+        self, history: List[Message], user_message: str, summary: Optional[str] = None
+    ) -> List[Message]:
+        """
+        Select the messages of the history to send with a new user message.
+
+        Args:
+            history: Candidate messages in chronological order
+            user_message: Content of the message being sent
+            summary: Summary of earlier turns sent along with the history
+
+        Returns:
+            Pinned system messages followed by the most recent messages that
+            fit in the budget, in chronological order
+        """
+        budget = (
+            self.max_tokens
+            - self.token_counter.count_text(user_message)
+            - MESSAGE_OVERHEAD_TOKENS
+        )
+        if summary:
+            budget -= self.token_counter.count_text(summary) + MESSAGE_OVERHEAD_TOKENS
+
+        pinned: List[Message] = []
+        candidates = history
+        if self.pin_system_messages:
+            pinned = [m for m in history if m.role == MessageRole.SYSTEM]
+            candidates = [m for m in history if m.role != MessageRole.SYSTEM]
+            budget -= sum(self.token_counter.count(m) for m in pinned)
+
+        selected: List[Message] = []
+        for message in reversed(candidates):
+            tokens = self.token_counter.count(message)
+            if tokens > budget:
+                # Stop at the first message that does not fit to keep the window contiguous
+                break
+            budget -= tokens
+            selected.append(message)
+
+        selected.reverse()
+        return pinned + selected
@@ -0,0 +1,355 @@
+"""Routing of LLM calls across several endpoints with failover and hedging."""
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from contextlib import aclosing
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+
+from opentelemetry import trace
+
+from src.chatbot.infrastructure.observability import (
+    LLM_CALL_DURATION,
+    LLM_FIRST_TOKEN,
+    record_llm_usage,
+    tracer,
+)
+
+if TYPE_CHECKING:
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import BaseMessage
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the output of an attempt
+_DONE = object()
+
+
+class LatencyWindow:
+    """Rolling window of the latest latency samples, in seconds."""
+
+    def __init__(self, size: int) -> None:
+        """Initialize an empty window keeping up to `size` samples."""
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        """Return the number of samples."""
+        return len(self._samples)
+
+    def add(self, latency: float) -> None:
+        """Record a sample, dropping the oldest one if the window is full."""
+        self._samples.append(latency)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Return the `q` quantile (0-1) of the samples, or None without samples."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LLMEndpoint:
+    """
+    A chat model behind one provider, with rolling statistics of its calls.
+
+    Latencies are tracked separately for complete responses, for the first
+    chunk of streamed ones and for summaries, whose long prompts would skew
+    the latency of conversation turns. Outcomes older than `error_window` seconds
+    no longer count towards the error rate, so that a failing endpoint gets
+    traffic again once it has been left alone for a while.
+    """
+
+    def __init__(
+        self, name: str, llm: "BaseChatModel", window: int = 200, error_window: float = 60.0
+    ) -> None:
+        """
+        Initialize the endpoint.
+
+        Args:
+            name: Name reported in statistics, e.g. the model
+            llm: Chat model calling the endpoint
+            window: Number of latency samples and outcomes kept
+            error_window: Age in seconds after which an outcome is forgotten
+        """
+        self.name = name
+        self.llm = llm
+        self.error_window = error_window
+        self.latency = {
+            kind: LatencyWindow(window) for kind in ("complete", "first_chunk", "summary")
+        }
+        self._outcomes: Deque[Tuple[float, bool]] = deque(maxlen=window)
+
+    def record(self, kind: str, latency: Optional[float], ok: bool) -> None:
+        """Record the outcome of a call, and its latency if known."""
+        if latency is not None:
+            self.latency[kind].add(latency)
+        self._outcomes.append((time.monotonic(), ok))
+
+    @property
+    def error_rate(self) -> float:
+        """Fraction of recent calls that failed."""
+        since = time.monotonic() - self.error_window
+        recent = [ok for at, ok in self._outcomes if at >= since]
+        return recent.count(False) / len(recent) if recent else 0.0
+
+    def score(self, kind: str) -> float:
+        """Expected latency penalized by the error rate; lower is better."""
+        p50 = self.latency[kind].percentile(0.5)
+        error_rate = self.error_rate
+        if p50 is None:
+            # Endpoints without samples are tried first to learn their latency,
+            # unless they only failed recently
+            return math.inf if error_rate else 0.0
+        return p50 / (1.0 - min(error_rate, 0.99))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return latency percentiles in milliseconds and the error rate."""
+        stats: Dict[str, Any] = {"error_rate": self.error_rate}
+        for kind, window in self.latency.items():
+            for name, q in (("p50", 0.5), ("p95", 0.95)):
+                value = window.percentile(q)
+                stats[f"{kind}_{name}_ms"] = value * 1000 if value is not None else None
+        return stats
+
+
+class _Attempt:
+    """One call to an endpoint, relaying its output to a queue shared by a race."""
+
+    def __init__(
+        self,
+        endpoint: LLMEndpoint,
+        kind: str,
+        output: AsyncIterator[Any],
+        queue: "asyncio.Queue[Tuple[_Attempt, Any]]",
+    ) -> None:
+        """Start the call in a task of its own."""
+        self.endpoint = endpoint
+        self.kind = kind
+        self.started = time.monotonic()
+        self.answered = False
+        self._queue = queue
+        self.task = asyncio.create_task(self._run(output))
+
+    async def _run(self, output: AsyncIterator[Any]) -> None:
+        """Relay the output in a span of its own, timing the call."""
+        outcome = "error"
+        with tracer.start_as_current_span(
+            f"llm.{self.kind}",
+            kind=trace.SpanKind.CLIENT,
+            attributes={"llm.endpoint": self.endpoint.name},
+        ) as span:
+            try:
+                outcome = await self._relay(output, span)
+            except asyncio.CancelledError:
+                outcome = "cancelled"
+                raise
+            finally:
+                LLM_CALL_DURATION.labels(self.endpoint.name, self.kind, outcome).observe(
+                    time.monotonic() - self.started
+                )
+
+    async def _relay(self, output: AsyncIterator[Any], span: trace.Span) -> str:
+        """Put every item of the output on the queue, then the end marker or the error."""
+        try:
+            async for item in output:
+                if not self.answered:
+                    self.answered = True
+                    latency = time.monotonic() - self.started
+                    self.endpoint.record(self.kind, latency, ok=True)
+                    if self.kind == "first_chunk":
+                        LLM_FIRST_TOKEN.labels(self.endpoint.name).observe(latency)
+                usage = getattr(item, "usage_metadata", None)
+                if usage:
+                    record_llm_usage(self.endpoint.name, usage)
+                self._queue.put_nowait((self, item))
+            self._queue.put_nowait((self, _DONE))
+            return "ok"
+        except asyncio.CancelledError:
+            if not self.answered:
+                # Lost the race: the call took at least this long
+                self.endpoint.record(self.kind, time.monotonic() - self.started, ok=True)
+            raise
+        except Exception as e:
+            if not self.answered:
+                self.endpoint.record(self.kind, None, ok=False)
+            span.record_exception(e)
+            span.set_status(trace.Status(trace.StatusCode.ERROR, str(e)))
+            self._queue.put_nowait((self, e))
+            return "error"
+
+    def cancel(self) -> None:
+        """Cancel the call."""
+        self.task.cancel()
+
+
+class LLMRouter:
+    """
+    Send each LLM call to the best of several endpoints.
+
+    Endpoints are ranked by their rolling median latency, penalized by their
+    recent error rate. A call that fails before answering fails over to the
+    next endpoint. A call still unanswered once it is slower than the
+    `hedge_percentile` latency of its endpoint is hedged: a second request is
+    sent to the next endpoint (or the same one if it is the only one), the
+    first to answer wins and the other is cancelled. For streamed calls the
+    race is on the first chunk. At most a `max_hedge_ratio` fraction of calls
+    are hedged, so a slow provider does not double the load.
+
+    Statistics only change for endpoints that get calls, so one call in
+    `probe_every` goes to another endpoint first, letting one that recovered
+    win its traffic back.
+    """
+
+    def __init__(
+        self,
+        endpoints: List[LLMEndpoint],
+        hedging: bool = True,
+        hedge_percentile: float = 0.95,
+        hedge_min_delay: float = 0.25,
+        hedge_min_samples: int = 20,
+        max_hedge_ratio: float = 0.1,
+        probe_every: int = 20,
+    ) -> None:
+        """
+        Initialize the router.
+
+        Args:
+            endpoints: Endpoints in order of preference when they perform alike
+            hedging: Whether slow calls are hedged
+            hedge_percentile: Latency quantile (0-1) after which a call is hedged
+            hedge_min_delay: Shortest delay before hedging, in seconds
+            hedge_min_samples: Latency samples an endpoint needs before its calls are hedged
+            max_hedge_ratio: Largest fraction of calls hedged
+            probe_every: Send one call in this many to another endpoint than the best
+        """
+        if not endpoints:
+            raise ValueError("At least one LLM endpoint is required")
+        self.endpoints = endpoints
+        self.hedging = hedging
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.max_hedge_ratio = max_hedge_ratio
+        self.probe_every = probe_every
+        self.calls = 0
+        self.hedged = 0
+        self.hedges_won = 0
+        self.failovers = 0
+
+    def rank(self, kind: str) -> List[LLMEndpoint]:
+        """Return the endpoints from best to worst for a kind of call."""
+        ranked = sorted(self.endpoints, key=lambda endpoint: endpoint.score(kind))
+        if len(ranked) > 1 and self.calls % self.probe_every == 0:
+            # Probe the other endpoints in turn
+            probed = 1 + (self.calls // self.probe_every) % (len(ranked) - 1)
+            ranked.insert(0, ranked.pop(probed))
+        return ranked
+
+    def _hedge_delay(self, endpoint: LLMEndpoint, kind: str) -> Optional[float]:
+        """Return how long to wait for an endpoint before hedging, None not to hedge."""
+        window = endpoint.latency[kind]
+        if not self.hedging or len(window) < self.hedge_min_samples:
+            return None
+        if self.hedged >= self.max_hedge_ratio * self.calls:
+            return None
+        return max(self.hedge_min_delay, window.percentile(self.hedge_percentile))
+
+    async def _race(
+        self, kind: str, call: Callable[["BaseChatModel"], AsyncIterator[Any]]
+    ) -> AsyncIterator[Any]:
+        """Run a call on the best endpoint, failing over and hedging, and relay its output."""
+        self.calls += 1
+        ranked = self.rank(kind)
+        untried = deque(ranked)
+        queue: "asyncio.Queue[Tuple[_Attempt, Any]]" = asyncio.Queue()
+        attempts: List[_Attempt] = []
+
+        def launch(endpoint: LLMEndpoint) -> _Attempt:
+            attempt = _Attempt(endpoint, kind, call(endpoint.llm), queue)
+            attempts.append(attempt)
+            return attempt
+
+        launch(untried.popleft())
+        hedge_delay = self._hedge_delay(ranked[0], kind)
+        hedge: Optional[_Attempt] = None
+        winner: Optional[_Attempt] = None
+
+        try:
+            # Wait for the first attempt to answer
+            while winner is None:
+                try:
+                    attempt, item = await asyncio.wait_for(queue.get(), hedge_delay)
+                except asyncio.TimeoutError:
+                    hedge_delay = None
+                    self.hedged += 1
+                    hedge = launch(untried.popleft() if untried else ranked[0])
+                    continue
+
+                if isinstance(item, Exception):
+                    if any(not a.task.done() for a in attempts if a is not attempt):
+                        continue
+                    if not untried:
+                        raise item
+                    self.failovers += 1
+                    logger.warning(
+                        "LLM endpoint %s failed, failing over: %s", attempt.endpoint.name, item
+                    )
+                    launch(untried.popleft())
+                    continue
+
+                winner = attempt
+                if attempt is hedge:
+                    self.hedges_won += 1
+                for other in attempts:
+                    if other is not winner:
+                        other.cancel()
+
+            # Relay the output of the winner only
+            while True:
+                if attempt is winner:
+                    if item is _DONE:
+                        return
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+                attempt, item = await queue.get()
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+
+    async def ainvoke(
+        self, messages: List["BaseMessage"], kind: str = "complete"
+    ) -> "BaseMessage":
+        """
+        Get a complete response.
+
+        Args:
+            messages: Prompt of the call
+            kind: Latency statistics the call is ranked, hedged and recorded
+                with: "complete" for conversation turns, "summary" for summaries
+        """
+
+        async def call(llm: "BaseChatModel") -> AsyncIterator["BaseMessage"]:
+            yield await llm.ainvoke(messages)
+
+        async with aclosing(self._race(kind, call)) as responses:
+            async for response in responses:
+                return response
+        raise RuntimeError("LLM call ended without a response")
+
+    async def astream(self, messages: List["BaseMessage"]) -> AsyncIterator[Any]:
+        """Stream a response chunk by chunk."""
+        async with aclosing(self._race("first_chunk", lambda llm: llm.astream(messages))) as chunks:
+            async for chunk in chunks:
+                yield chunk
+
+    def stats(self) -> Dict[str, Any]:
+        """Return call, hedge and failover counters, and the statistics of each endpoint."""
+        return {
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedges_won": self.hedges_won,
+            "failovers": self.failovers,
+            "endpoints": {endpoint.name: endpoint.stats() for endpoint in self.endpoints},
+        }
@@ -0,0 +1,75 @@
+"""Incremental rolling summarization of long conversations."""
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from src.chatbot.domain.entities.conversation_summary import ConversationSummary
+from src.chatbot.domain.repositories.conversation_summary_repository import (
+    ConversationSummaryRepository,
+)
+from src.chatbot.domain.repositories.message_repository import MessageRepository
+from src.chatbot.infrastructure.background import BackgroundTaskRunner
+from src.chatbot.infrastructure.langchain.chatbot_service import ChatbotService
+
+
+class ConversationSummarizer:
+    """
+    Maintain a running summary of the turns outside the context window.
+
+    The summary is updated incrementally in the background: only messages
+    created after the last summarized one are folded into it, in batches.
+    """
+
+    def __init__(
+        self,
+        message_repository: MessageRepository,
+        summary_repository: ConversationSummaryRepository,
+        chatbot_service: ChatbotService,
+        task_runner: BackgroundTaskRunner,
+        batch_size: int = 50,
+    ) -> None:
+        """Initialize summarizer with repositories and services."""
+        self.message_repository = message_repository
+        self.summary_repository = summary_repository
+        self.chatbot_service = chatbot_service
+        self.task_runner = task_runner
+        self.batch_size = batch_size
+
+    async def get_summary(self, conversation_id: UUID) -> Optional[ConversationSummary]:
+        """Get the current summary of a conversation."""
+        return await self.summary_repository.get(conversation_id)
+
+    def schedule(self, conversation_id: UUID, before: datetime) -> None:
+        """Schedule a background update covering messages created before a date."""
+        self.task_runner.spawn(
+            self.update(conversation_id, before), key=f"summary:{conversation_id}"
+        )
+
+    async def update(self, conversation_id: UUID, before: datetime) -> None:
+        """Fold the messages not yet summarized and created before a date into the summary."""
+        summary = await self.summary_repository.get(conversation_id)
+
+        while True:
+            messages = await self.message_repository.list_before(
+                conversation_id,
+                before,
+                after=summary.summarized_until if summary else None,
+                limit=self.batch_size,
+            )
+            if not messages:
+                return
+
+            content = await self.chatbot_service.summarize(
+                summary.content if summary else None, messages
+            )
+            summary = await self.summary_repository.save(
+                ConversationSummary(
+                    conversation_id=conversation_id,
+                    content=content,
+                    summarized_until=messages[-1].created_at,
+                    message_count=(summary.message_count if summary else 0) + len(messages),
+                )
+            )
+
+            if len(messages) < self.batch_size:
+                return
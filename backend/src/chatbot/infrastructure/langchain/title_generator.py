@@ -0,0 +1,79 @@
+"""Background title generation for new conversations."""
+import asyncio
+import dataclasses
+import logging
+import random
+from datetime import datetime
+
+from src.chatbot.domain.entities.conversation import Conversation
+from src.chatbot.domain.repositories.conversation_repository import ConversationRepository
+from src.chatbot.infrastructure.background import BackgroundTaskRunner
+from src.chatbot.infrastructure.langchain.chatbot_service import ChatbotService
+
+logger = logging.getLogger(__name__)
+
+# Longest title stored, matching the limit given to the model
+MAX_TITLE_LENGTH = 50
+
+
+class ConversationTitleGenerator:
+    """
+    Title untitled conversations from their first message.
+
+    Titles are generated in the background once the first turn is saved, so
+    the user never waits for them. A failed attempt, whether generating or
+    saving the title, is retried with exponential backoff and jitter.
+    """
+
+    def __init__(
+        self,
+        conversation_repository: ConversationRepository,
+        chatbot_service: ChatbotService,
+        task_runner: BackgroundTaskRunner,
+        max_attempts: int = 3,
+        backoff: float = 1.0,
+    ) -> None:
+        """Initialize title generator with repositories and services."""
+        self.conversation_repository = conversation_repository
+        self.chatbot_service = chatbot_service
+        self.task_runner = task_runner
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+
+    def schedule(self, conversation: Conversation, first_message: str) -> None:
+        """Schedule a background task titling a conversation."""
+        self.task_runner.spawn(
+            self.generate(conversation, first_message), key=f"title:{conversation.id}"
+        )
+
+    async def generate(self, conversation: Conversation, first_message: str) -> None:
+        """Generate a title from the first message and save it, retrying on failure."""
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                title = await self.chatbot_service.generate_conversation_title(first_message)
+                if not title:
+                    return
+
+                # The conversation may be shared with the ownership cache: never mutate it
+                await self.conversation_repository.update(
+                    dataclasses.replace(
+                        conversation,
+                        title=title[:MAX_TITLE_LENGTH],
+                        updated_at=datetime.utcnow(),
+                    )
+                )
+                return
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    raise
+                delay = self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+                logger.warning(
+                    "Title generation for conversation %s failed (attempt %d/%d), "
+                    "retrying in %.1fs: %s",
+                    conversation.id,
+                    attempt,
+                    self.max_attempts,
+                    delay,
+                    e,
+                )
+                await asyncio.sleep(delay)
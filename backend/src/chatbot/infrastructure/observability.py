@@ -0,0 +1,291 @@
+"""Prometheus metrics and OpenTelemetry tracing of every layer of a turn."""
+import asyncio
+import functools
+import inspect
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Mapping, Tuple, TypeVar
+
+from opentelemetry import trace
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+from prometheus_client.core import GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+
+# Spans are dropped unless tracing is configured with `configure_tracing`
+tracer = trace.get_tracer("chatbot")
+
+# LLM calls take from a fraction of a second to tens of seconds
+_LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "chatbot_http_request_duration_seconds",
+    "Time to serve an HTTP request, until the end of the response body",
+    ["method", "route", "status"],
+)
+REPOSITORY_CALL_DURATION = Histogram(
+    "chatbot_repository_call_duration_seconds",
+    "Time of a repository call to the database",
+    ["repository", "operation", "outcome"],
+)
+LLM_FIRST_TOKEN = Histogram(
+    "chatbot_llm_time_to_first_token_seconds",
+    "Time until the first chunk of a streamed LLM call",
+    ["endpoint"],
+    buckets=_LLM_BUCKETS,
+)
+LLM_CALL_DURATION = Histogram(
+    "chatbot_llm_call_duration_seconds",
+    "Time of an LLM call to one endpoint, until its last chunk",
+    ["endpoint", "kind", "outcome"],
+    buckets=_LLM_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "chatbot_llm_tokens",
+    "Tokens of the LLM calls, as reported by the provider",
+    ["endpoint", "type"],
+)
+ADMISSION_QUEUE_WAIT = Histogram(
+    "chatbot_admission_queue_wait_seconds",
+    "Time a turn waited for an admission slot",
+    buckets=(0.0, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+T = TypeVar("T")
+
+
+def record_llm_usage(endpoint: str, usage: Mapping[str, Any]) -> None:
+    """Count the prompt and completion tokens of an LLM response's usage metadata."""
+    LLM_TOKENS.labels(endpoint, "prompt").inc(usage.get("input_tokens") or 0)
+    LLM_TOKENS.labels(endpoint, "completion").inc(usage.get("output_tokens") or 0)
+
+
+def _instrumented(
+    repository: str, operation: str, method: Callable[..., Awaitable[Any]]
+) -> Callable[..., Awaitable[Any]]:
+    """Wrap a repository coroutine in a span and time it."""
+
+    @functools.wraps(method)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        outcome = "error"
+        with tracer.start_as_current_span(
+            f"{repository}.{operation}",
+            kind=trace.SpanKind.CLIENT,
+            attributes={"db.system": "postgresql", "db.operation": operation},
+        ):
+            try:
+                result = await method(*args, **kwargs)
+                outcome = "ok"
+                return result
+            except asyncio.CancelledError:
+                outcome = "cancelled"
+                raise
+            finally:
+                REPOSITORY_CALL_DURATION.labels(repository, operation, outcome).observe(
+                    time.perf_counter() - started
+                )
+
+    return wrapper
+
+
+def instrument_repository(name: str) -> Callable[[T], T]:
+    """
+    Class decorator tracing and timing every public coroutine of a repository.
+
+    Args:
+        name: Repository name in spans and metrics, e.g. the table
+    """
+
+    def decorate(cls: T) -> T:
+        for attribute, value in list(vars(cls).items()):
+            if not attribute.startswith("_") and inspect.iscoroutinefunction(value):
+                setattr(cls, attribute, _instrumented(name, attribute, value))
+        return cls
+
+    return decorate
+
+
+def _route_template(scope: Dict[str, Any]) -> str:
+    """Return the path template of the route a request matched, or "unmatched"."""
+    # Set by the router once the request is matched
+    route = getattr(scope.get("route"), "path", None)
+    return "unmatched" if route is None else route
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing each request per route, in a span of its own.
+
+    Requests are labelled with their route template rather than their path,
+    so that IDs do not multiply the series.
+    """
+
+    def __init__(self, app: Callable) -> None:
+        """Wrap an ASGI application."""
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        """Serve a request, recording its duration once the response is sent."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        with tracer.start_as_current_span(method, kind=trace.SpanKind.SERVER) as span:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = _route_template(scope)
+                span.update_name(f"{method} {route}")
+                span.set_attribute("http.request.method", method)
+                span.set_attribute("http.route", route)
+                span.set_attribute("http.response.status_code", status)
+                HTTP_REQUEST_DURATION.labels(method, route, str(status)).observe(
+                    time.perf_counter() - started
+                )
+
+
+def multiprocess_metrics() -> bool:
+    """Return whether the metrics of all the workers are shared through PROMETHEUS_MULTIPROC_DIR."""
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def metrics_registry() -> CollectorRegistry:
+    """
+    Return the registry to serve on /metrics.
+
+    With several workers sharing a port, a scrape lands on any of them, so
+    each worker writes its metrics to files in PROMETHEUS_MULTIPROC_DIR and
+    the registry serves the metrics of all of them, merged.
+    """
+    if not multiprocess_metrics():
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def mark_worker_stopped() -> None:
+    """Drop the live gauges of this worker from the shared metrics."""
+    if multiprocess_metrics():
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def _multiprocess_mode(name: str) -> str:
+    """Return how the values of a statistic are merged across workers."""
+    # Ratios, rates and percentiles cannot be added up: keep one series per worker
+    if name.endswith(("_ratio", "_rate", "_ms")):
+        return "liveall"
+    return "livesum"
+
+
+class StatsCollector(Collector):
+    """
+    Expose the statistics of the worker components as gauges.
+
+    Nested statistics are flattened into metric names, e.g.
+    `{"admission": {"running": 3}}` becomes `chatbot_admission_running 3`,
+    except caches and LLM endpoints, which become labels.
+
+    Registered in a single process, the gauges are built on each scrape. With
+    shared metrics, `publish_every` writes them to the gauges of the worker
+    instead: counts and sizes are summed across workers, ratios, rates and
+    percentiles are kept per worker, with a `pid` label.
+    """
+
+    # Sections keyed by component name: metric prefix and label
+    _LABELLED: Dict[str, Tuple[str, str]] = {
+        "caches": ("chatbot_cache", "cache"),
+        "endpoints": ("chatbot_llm_endpoint", "endpoint"),
+    }
+
+    def __init__(self, stats: Callable[[], Dict[str, Any]]) -> None:
+        """Initialize with a function returning the worker statistics."""
+        self._stats = stats
+        self._gauges: Dict[str, Gauge] = {}
+
+    def _samples(self) -> List[Tuple[str, str, Dict[str, str], float]]:
+        """Flatten the current statistics into (name, key, labels, value) samples."""
+        samples: List[Tuple[str, str, Dict[str, str], float]] = []
+
+        def walk(prefix: str, stats: Dict[str, Any], labels: Dict[str, str]) -> None:
+            for key, value in stats.items():
+                if isinstance(value, dict):
+                    if key in self._LABELLED:
+                        metric_prefix, label = self._LABELLED[key]
+                        for component, component_stats in value.items():
+                            walk(metric_prefix, component_stats, {**labels, label: component})
+                    else:
+                        walk(f"{prefix}_{key}", value, labels)
+                elif isinstance(value, (int, float)):
+                    samples.append((f"{prefix}_{key}", key, labels, float(value)))
+
+        walk("chatbot", self._stats(), {})
+        return samples
+
+    def collect(self) -> Iterator[Metric]:
+        """Build the gauges from the current statistics."""
+        families: Dict[str, GaugeMetricFamily] = {}
+        for name, key, labels, value in self._samples():
+            if name not in families:
+                families[name] = GaugeMetricFamily(
+                    name, f"Worker statistic {key}", labels=list(labels)
+                )
+            families[name].add_metric(list(labels.values()), value)
+        return iter(families.values())
+
+    def publish(self) -> None:
+        """Write the current statistics to the gauges of this worker in the shared metrics."""
+        for name, key, labels, value in self._samples():
+            gauge = self._gauges.get(name)
+            if gauge is None:
+                gauge = self._gauges[name] = Gauge(
+                    name,
+                    f"Worker statistic {key}",
+                    list(labels),
+                    registry=None,
+                    multiprocess_mode=_multiprocess_mode(name),
+                )
+            (gauge.labels(*labels.values()) if labels else gauge).set(value)
+
+    async def publish_every(self, interval: float) -> None:
+        """Publish the statistics every `interval` seconds, until cancelled."""
+        while True:
+            self.publish()
+            await asyncio.sleep(interval)
+
+
+def configure_tracing(endpoint: str, service_name: str) -> Any:
+    """
+    Export spans to an OpenTelemetry collector over OTLP/HTTP.
+
+    Args:
+        endpoint: Collector traces URL, e.g. http://localhost:4318/v1/traces
+        service_name: Service name of the spans
+
+    Returns:
+        Tracer provider, to shut down on exit so that pending spans are sent
+    """
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError as e:
+        raise RuntimeError(
+            'OTLP export requires the "otlp" extra: pip install -e ".[otlp]"'
+        ) from e
+
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint)))
+    trace.set_tracer_provider(provider)
+    return provider
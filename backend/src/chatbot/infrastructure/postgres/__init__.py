@@ -0,0 +1 @@
+"""Direct Postgres connection pool."""
@@ -0,0 +1,126 @@
+"""Postgres connection pool, for the repositories bypassing PostgREST."""
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Optional
+from uuid import UUID
+
+from src.chatbot.infrastructure.config import settings
+
+if TYPE_CHECKING:
+    import asyncpg
+
+logger = logging.getLogger(__name__)
+
+# Shared pool of the worker, created on first use
+_pool: Optional["asyncpg.Pool"] = None
+_pool_lock = asyncio.Lock()
+
+
+async def init_connection(connection: "asyncpg.Connection") -> None:
+    """Decode UUIDs as uuid.UUID rather than the asyncpg subclass, which orjson rejects."""
+    await connection.set_type_codec(
+        "uuid",
+        schema="pg_catalog",
+        encoder=lambda value: value.bytes,
+        decoder=lambda data: UUID(bytes=data),
+        format="binary",
+    )
+
+
+async def get_postgres_pool() -> "asyncpg.Pool":
+    """Get the shared connection pool, creating it on first use."""
+    global _pool
+
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                try:
+                    import asyncpg
+                except ImportError as e:
+                    raise RuntimeError(
+                        'The postgres repository backend requires the "postgres" extra: '
+                        'pip install -e ".[postgres]"'
+                    ) from e
+                if not settings.database_url:
+                    raise RuntimeError("DATABASE_URL is required by the postgres backend")
+
+                _pool = await asyncpg.create_pool(
+                    settings.database_url,
+                    min_size=settings.database_pool_min_size,
+                    max_size=settings.database_pool_max_size,
+                    max_inactive_connection_lifetime=settings.database_pool_max_idle,
+                    command_timeout=settings.database_command_timeout,
+                    statement_cache_size=settings.database_statement_cache_size,
+                    init=init_connection,
+                )
+
+    return _pool
+
+
+async def warmup_postgres_pool() -> None:
+    """Create the shared pool, which opens its first connections, before serving traffic."""
+    await get_postgres_pool()
+
+
+async def close_postgres_pool() -> None:
+    """Close the connections of the shared pool."""
+    global _pool
+
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+def _literal(value: str) -> str:
+    """Quote a string as an SQL literal (standard_conforming_strings is on by default)."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+class UserDatabase:
+    """
+    Connection pool acting as one user, under row level security.
+
+    Like PostgREST does for each request, every transaction switches to the
+    database role of API users and sets the JWT claims that the RLS policies
+    read through auth.uid(). Both settings are local to the transaction, so
+    connections go back to the pool as they were, and transaction-mode
+    poolers such as Supavisor are supported.
+    """
+
+    def __init__(self, pool: "asyncpg.Pool", user_id: UUID, role: str = "authenticated") -> None:
+        """
+        Initialize for a user.
+
+        Args:
+            pool: Shared connection pool
+            user_id: User whose rows are visible
+            role: Database role of API users
+        """
+        self.pool = pool
+        self.user_id = user_id
+        claims = json.dumps({"sub": str(user_id), "role": role})
+        # Sent with the simple query protocol to start the transaction in the
+        # same round-trip, hence literals rather than parameters
+        self._begin = (
+            "BEGIN; SELECT set_config('role', {}, true), "
+            "set_config('request.jwt.claims', {}, true)"
+        ).format(_literal(role), _literal(claims))
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator["asyncpg.Connection"]:
+        """Run queries in a transaction as the user, committed unless an exception is raised."""
+        async with self.pool.acquire() as connection:
+            await connection.execute(self._begin)
+            try:
+                yield connection
+            except BaseException:
+                if not connection.is_closed():
+                    try:
+                        await connection.execute("ROLLBACK")
+                    except Exception as e:
+                        # The pool resets or closes the connection on release
+                        logger.debug("Could not roll back transaction: %s", e)
+                raise
+            await connection.execute("COMMIT")
@@ -0,0 +1,131 @@
+"""Coalescing of identical concurrent upstream calls."""
+import asyncio
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+
+class FlightCancelled(Exception):
+    """Raised to the followers of an upstream call cancelled before it ended."""
+
+
+class _Flight:
+    """An upstream call and the chunks it has produced so far."""
+
+    def __init__(self) -> None:
+        """Initialize a flight that has not produced anything yet."""
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[Exception] = None
+        self.followers = 0
+        self.task: Optional[asyncio.Task] = None
+        # Replaced on every change, so that each waiter wakes up once
+        self.changed = asyncio.Event()
+
+    def notify(self) -> None:
+        """Wake up the followers waiting for a change."""
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+
+class SingleFlight:
+    """
+    Share one upstream call between concurrent calls with the same key.
+
+    The first caller of a key starts the upstream call in a task of its own;
+    callers arriving while it runs follow it instead of starting another one.
+    Every follower first replays the chunks already produced, then receives
+    new ones as they arrive, and all of them get the same error if the call
+    fails, or `FlightCancelled` if it is cancelled, e.g. on shutdown. The call
+    is cancelled only once every follower has gone, so one client
+    disconnecting does not cut the others off.
+
+    Only concurrent calls are coalesced: a key is forgotten as soon as its
+    call ends.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with no call in flight."""
+        self._flights: Dict[str, _Flight] = {}
+        self.started = 0
+        self.joined = 0
+
+    async def stream(
+        self, key: str, produce: Callable[[], AsyncIterator[str]]
+    ) -> AsyncIterator[str]:
+        """
+        Follow the upstream call of a key, starting it if none is in flight.
+
+        Args:
+            key: Fingerprint of the call
+            produce: Function starting the upstream call, only invoked when
+                no call with the same key is in flight
+
+        Returns:
+            Async iterator over every chunk produced by the call
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            self._flights[key] = flight
+            flight.task = asyncio.create_task(self._run(key, flight, produce()))
+            self.started += 1
+        else:
+            self.joined += 1
+
+        flight.followers += 1
+        try:
+            received = 0
+            while True:
+                if received < len(flight.chunks):
+                    received += 1
+                    yield flight.chunks[received - 1]
+                elif flight.done:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+                else:
+                    await flight.changed.wait()
+        finally:
+            flight.followers -= 1
+            if flight.followers == 0 and not flight.done:
+                # Nobody is left to receive the result
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    async def _run(self, key: str, flight: _Flight, source: AsyncIterator[str]) -> None:
+        """Relay the chunks of the upstream call to its followers."""
+        try:
+            async for chunk in source:
+                flight.chunks.append(chunk)
+                flight.notify()
+        except Exception as e:
+            flight.error = e
+        except asyncio.CancelledError:
+            # Followers are not cancelled themselves and must not end as if the call completed
+            flight.error = FlightCancelled("Upstream call was cancelled")
+            raise
+        finally:
+            flight.done = True
+            self._forget(key, flight)
+            flight.notify()
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        """Stop new callers from following a flight."""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> Dict[str, float]:
+        """Return calls in flight, calls started and followed, and the coalesced ratio."""
+        calls = self.started + self.joined
+        return {
+            "in_flight": len(self._flights),
+            "started": self.started,
+            "joined": self.joined,
+            "coalesced_ratio": self.joined / calls if calls else 0.0,
+        }
+
+    async def aclose(self) -> None:
+        """Cancel the calls in flight."""
+        tasks = [flight.task for flight in self._flights.values() if flight.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,13 +1,48 @@
 """Supabase client configuration."""
-from supabase import create_client, Client
+import asyncio
+import logging
+from typing import Optional
+
+import httpx
+from postgrest.exceptions import APIError
+from supabase import AsyncClient, acreate_client
 
 from src.chatbot.infrastructure.config import settings
 
+logger = logging.getLogger(__name__)
+
+# Shared async client instance, created on first use
+_client: Optional[AsyncClient] = None
+_client_lock = asyncio.Lock()
+
+
+async def get_supabase_client() -> AsyncClient:
+    """Get the shared async Supabase client, creating it on first use."""
+    global _client
+
+    if _client is None:
+        async with _client_lock:
+            if _client is None:
+                _client = await acreate_client(settings.supabase_url, settings.supabase_key)
+
+    return _client
+
+
+async def warmup_supabase_client() -> None:
+    """Create the shared client and open a pooled connection before serving traffic."""
+    client = await get_supabase_client()
+    try:
+        # Any cheap query will do: it also runs the lazy setup of the client
+        await client.table("conversations").select("id").limit(1).execute()
+    except (APIError, httpx.HTTPError) as e:
+        # Not fatal: the first request will open the connection instead
+        logger.warning("Could not warm up Supabase connection pool: %s", e)
 
-def get_supabase_client() -> Client:
-    """Get configured Supabase client."""
-    return create_client(settings.supabase_url, settings.supabase_key)
 
+async def close_supabase_client() -> None:
+    """Close the pooled HTTP connections of the shared Supabase client."""
+    global _client
 
-# Global client instance
-supabase_client = get_supabase_client()
+    if _client is not None:
+        await _client.postgrest.aclose()
+        _client = None
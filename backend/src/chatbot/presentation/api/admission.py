@@ -0,0 +1,247 @@
+"""Admission control of the turns calling the LLM."""
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, Request
+
+from src.chatbot.domain.entities.user import User
+from src.chatbot.infrastructure.auth.supabase_auth import get_current_user
+from src.chatbot.infrastructure.cache.lru import LRUCache
+from src.chatbot.infrastructure.langchain.llm_router import LatencyWindow
+from src.chatbot.infrastructure.observability import ADMISSION_QUEUE_WAIT
+
+# Users whose rate is tracked at once; idle users are forgotten first
+MAX_TRACKED_USERS = 100_000
+
+
+class TokenBucket:
+    """Rate limit refilling `rate` tokens per second, up to `burst` tokens."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """Initialize a full bucket."""
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token, returning 0 on success or the seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionTicket:
+    """A slot held by an admitted turn until it is released."""
+
+    def __init__(self, controller: "AdmissionController") -> None:
+        """Initialize a ticket holding a slot from now on."""
+        self._controller = controller
+        self._admitted_at = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        """Give the slot back; releasing it again does nothing."""
+        if not self._released:
+            self._released = True
+            self._controller._release(time.monotonic() - self._admitted_at)
+
+
+class AdmissionController:
+    """
+    Bound the turns calling the LLM at once, fairly across users.
+
+    At most `max_concurrent` turns run at once. Turns beyond that wait in a
+    queue per user, and the queues are served in turn, so a user sending many
+    messages at once only delays their own messages. Besides, every user has
+    a token bucket limiting their sustained rate of messages.
+
+    Requests are rejected at once rather than left to time out: with 429 when
+    the user is over their rate or has too many messages waiting, with 503
+    when the queues are full or a turn waited longer than `queue_timeout`.
+    Both carry a `Retry-After` header.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue: int,
+        max_user_queue: int,
+        user_rate: float,
+        user_burst: int,
+        queue_timeout: float,
+        window: int = 1000,
+    ) -> None:
+        """
+        Initialize the controller.
+
+        Args:
+            max_concurrent: Turns running at once
+            max_queue: Turns waiting at once, across users
+            max_user_queue: Turns of one user waiting at once
+            user_rate: Sustained messages per second allowed per user
+            user_burst: Messages a user may send at once after being idle
+            queue_timeout: Longest wait for a slot in seconds
+            window: Number of queue wait samples kept
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_user_queue = max_user_queue
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.queue_timeout = queue_timeout
+        self.running = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rate_limited = 0
+        self.shed = 0
+        self.timed_out = 0
+        self.queue_wait = LatencyWindow(window)
+        # Average time a turn holds its slot, to tell shed clients when to retry
+        self._hold_time = 1.0
+        self._queues: "OrderedDict[UUID, Deque[asyncio.Future]]" = OrderedDict()
+        # A bucket unused for burst / rate seconds is full again, like a new one,
+        # so it may be forgotten then: its expiry is pushed back on every use
+        self._buckets: LRUCache[TokenBucket] = LRUCache(
+            MAX_TRACKED_USERS, ttl=user_burst / user_rate
+        )
+
+    async def admit(self, user_id: UUID) -> AdmissionTicket:
+        """
+        Wait for a slot for a turn of a user.
+
+        Raises:
+            HTTPException: 429 or 503 when the turn is not admitted
+        """
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = TokenBucket(self.user_rate, self.user_burst)
+        retry_after = bucket.take()
+        self._buckets.set(user_id, bucket)
+        if retry_after:
+            self.rate_limited += 1
+            raise self._reject(429, "Too many messages, slow down", retry_after)
+
+        if self.running < self.max_concurrent and not self.queued:
+            self.running += 1
+            self.admitted += 1
+            self._record_wait(0.0)
+            return AdmissionTicket(self)
+
+        if self.queued >= self.max_queue:
+            self.shed += 1
+            raise self._reject(503, "Server busy, try again later", self._expected_wait())
+        queue = self._queues.get(user_id)
+        if queue is not None and len(queue) >= self.max_user_queue:
+            self.rate_limited += 1
+            raise self._reject(
+                429, "Too many messages waiting for a response", self._expected_wait()
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(user_id, deque()).append(waiter)
+        self.queued += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait ended: pass it on
+                self._release(0.0)
+            else:
+                self._dequeue(user_id, waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                self.timed_out += 1
+                raise self._reject(503, "Server busy, try again later", self._expected_wait())
+            raise
+
+        self.admitted += 1
+        self._record_wait(time.monotonic() - started)
+        return AdmissionTicket(self)
+
+    def _record_wait(self, wait: float) -> None:
+        """Record the time a turn waited for its slot."""
+        self.queue_wait.add(wait)
+        ADMISSION_QUEUE_WAIT.observe(wait)
+
+    def _release(self, held: float) -> None:
+        """Hand a released slot over to the next user waiting, or free it."""
+        self._hold_time += 0.1 * (held - self._hold_time)
+        while self._queues:
+            user_id, queue = next(iter(self._queues.items()))
+            waiter = queue.popleft()
+            self.queued -= 1
+            # Serve the queues in turn
+            if queue:
+                self._queues.move_to_end(user_id)
+            else:
+                del self._queues[user_id]
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.running -= 1
+
+    def _dequeue(self, user_id: UUID, waiter: asyncio.Future) -> None:
+        """Remove a waiter that gave up from its queue."""
+        queue = self._queues.get(user_id)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            self.queued -= 1
+            if not queue:
+                del self._queues[user_id]
+
+    def _expected_wait(self) -> float:
+        """Estimate how long until the turns queued now got a slot."""
+        return (self.queued / self.max_concurrent + 1) * self._hold_time
+
+    @staticmethod
+    def _reject(status_code: int, detail: str, retry_after: float) -> HTTPException:
+        """Build a rejection telling the client when to retry."""
+        return HTTPException(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Return slot usage, admission counters and queue wait percentiles in milliseconds."""
+        stats: Dict[str, Any] = {
+            "running": self.running,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rate_limited": self.rate_limited,
+            "shed": self.shed,
+            "timed_out": self.timed_out,
+        }
+        for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            value = self.queue_wait.percentile(q)
+            stats[f"queue_wait_{name}_ms"] = value * 1000 if value is not None else None
+        return stats
+
+
+async def admit_llm_turn(
+    request: Request, current_user: User = Depends(get_current_user)
+) -> AsyncIterator[Optional[AdmissionTicket]]:
+    """
+    Hold a slot of the worker admission controller for the whole request.
+
+    The slot is released once the response is sent, after the end of the
+    stream for streamed responses.
+    """
+    controller: Optional[AdmissionController] = request.app.state.admission
+    if controller is None:
+        yield None
+        return
+    ticket = await controller.admit(current_user.id)
+    try:
+        yield ticket
+    finally:
+        ticket.release()
@@ -1,14 +1,160 @@
 """FastAPI application."""
-from fastapi import FastAPI
+import asyncio
+import importlib
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
 
+from src.chatbot.presentation.api.admission import AdmissionController
+from src.chatbot.presentation.api.pagination import NEXT_CURSOR_HEADER
 from src.chatbot.presentation.api.routes import router
+from src.chatbot.infrastructure.auth.supabase_auth import start_jwks, stop_jwks
+from src.chatbot.infrastructure.background import BackgroundTaskRunner
+from src.chatbot.infrastructure.cache.history import ConversationHistoryCache
+from src.chatbot.infrastructure.cache.lru import LRUCache
+from src.chatbot.infrastructure.cache.response import ResponseCache, SQLiteResponseStore
 from src.chatbot.infrastructure.config import settings
+from src.chatbot.infrastructure.langchain.chatbot_service import ChatbotService
+from src.chatbot.infrastructure.langchain.context_builder import ContextBuilder, TokenCounter
+from src.chatbot.infrastructure.observability import (
+    MetricsMiddleware,
+    StatsCollector,
+    configure_tracing,
+    mark_worker_stopped,
+    metrics_registry,
+    multiprocess_metrics,
+)
+from src.chatbot.infrastructure.postgres.pool import close_postgres_pool, warmup_postgres_pool
+from src.chatbot.infrastructure.supabase.client import (
+    close_supabase_client,
+    warmup_supabase_client,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Manage resources shared across requests for the worker lifetime."""
+    tracer_provider = None
+    if settings.otlp_traces_endpoint:
+        tracer_provider = configure_tracing(
+            settings.otlp_traces_endpoint, settings.otel_service_name
+        )
+    # Importing LangChain takes most of the startup: do it while the JWKS and
+    # the tokenizer are fetched
+    langchain_import = asyncio.create_task(
+        asyncio.to_thread(importlib.import_module, "langchain_openai")
+    )
+    await start_jwks()
+    app.state.task_runner = BackgroundTaskRunner()
+    app.state.conversation_cache = LRUCache(
+        settings.conversation_cache_size, ttl=settings.conversation_cache_ttl
+    )
+    app.state.history_cache = ConversationHistoryCache(
+        settings.history_cache_max_bytes,
+        max_messages=settings.context_max_messages,
+        ttl=settings.history_cache_ttl,
+    )
+    app.state.response_cache = None
+    if settings.llm_cache_enabled:
+        app.state.response_cache = ResponseCache(
+            settings.llm_cache_size,
+            ttl=settings.llm_cache_ttl,
+            max_entry_bytes=settings.llm_cache_max_entry_bytes,
+            store=SQLiteResponseStore(settings.llm_cache_path) if settings.llm_cache_path else None,
+        )
+    app.state.semantic_cache = None
+    if settings.semantic_cache_enabled:
+        # Imports NumPy, only needed by the semantic cache: fails without it
+        from src.chatbot.infrastructure.cache.semantic import (
+            HashingEmbedder,
+            OpenAIEmbedder,
+            SemanticCache,
+            VectorIndex,
+        )
+
+        if settings.embedding_provider == "hashing":
+            embedder = HashingEmbedder()
+        else:
+            embedder = OpenAIEmbedder(
+                settings.embedding_model,
+                api_key=settings.openrouter_api_key,
+                base_url=settings.embedding_base_url or settings.openrouter_base_url,
+            )
+        app.state.semantic_cache = SemanticCache(
+            embedder,
+            VectorIndex(settings.semantic_cache_size, ttl=settings.semantic_cache_ttl),
+            threshold=settings.semantic_cache_threshold,
+            max_entry_bytes=settings.llm_cache_max_entry_bytes,
+            shared=settings.semantic_cache_shared,
+        )
+    token_counter = await asyncio.to_thread(TokenCounter, settings.llm_model)
+    await langchain_import
+    app.state.chatbot_service = ChatbotService(
+        response_cache=app.state.response_cache,
+        semantic_cache=app.state.semantic_cache,
+        coalesce_requests=settings.llm_coalesce_requests,
+    )
+    # Connect before accepting traffic, which only starts once startup is done
+    if settings.repository_backend == "postgres":
+        warmup_database = warmup_postgres_pool()
+    else:
+        warmup_database = warmup_supabase_client()
+    await asyncio.gather(app.state.chatbot_service.warmup(), warmup_database)
+    app.state.admission = None
+    if settings.admission_enabled:
+        app.state.admission = AdmissionController(
+            settings.admission_max_concurrent,
+            max_queue=settings.admission_max_queue,
+            max_user_queue=settings.admission_max_user_queue,
+            user_rate=settings.admission_user_rate,
+            user_burst=settings.admission_user_burst,
+            queue_timeout=settings.admission_queue_timeout,
+        )
+    app.state.context_builder = ContextBuilder(
+        token_counter,
+        max_tokens=settings.context_max_tokens,
+        max_messages=settings.context_max_messages,
+        pin_system_messages=settings.context_pin_system_messages,
+    )
+
+    app.state.stats_collector = StatsCollector(lambda: _worker_stats(app.state))
+    stats_publisher = None
+    if multiprocess_metrics():
+        # Scrapes land on any worker: each one publishes its statistics for the others
+        stats_publisher = asyncio.create_task(
+            app.state.stats_collector.publish_every(settings.metrics_stats_interval)
+        )
+    else:
+        REGISTRY.register(app.state.stats_collector)
+
+    yield
+
+    if stats_publisher is not None:
+        stats_publisher.cancel()
+    else:
+        REGISTRY.unregister(app.state.stats_collector)
+    await app.state.task_runner.aclose()
+    await app.state.chatbot_service.aclose()
+    if app.state.response_cache is not None:
+        app.state.response_cache.close()
+    if app.state.semantic_cache is not None:
+        await app.state.semantic_cache.aclose()
+    await close_supabase_client()
+    await close_postgres_pool()
+    await stop_jwks()
+    if tracer_provider is not None:
+        tracer_provider.shutdown()
+    mark_worker_stopped()
+
 
 app = FastAPI(
     title="Supabase Chatbot API",
     description="A chatbot API using Supabase, LangChain, and FastAPI",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # CORS configuration
@@ -18,10 +164,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
+app.add_middleware(MetricsMiddleware)
 
 # Include routers
-app.include_router(router, prefix="/api/v1", tags=["chatbot"])
+app.include_router(router)
 
 
 @app.get("/")
@@ -38,3 +186,35 @@ async def root() -> dict:
 async def health() -> dict:
     """Health check endpoint."""
     return {"status": "healthy"}
+
+
+def _worker_stats(state: Any) -> Dict[str, Any]:
+    """Collect the statistics of the caches, LLM calls and admission control of the worker."""
+    caches = {
+        "conversations": state.conversation_cache.stats(),
+        "history": state.history_cache.stats(),
+    }
+    if state.response_cache is not None:
+        caches["llm_responses"] = state.response_cache.stats()
+    if state.semantic_cache is not None:
+        caches["semantic"] = state.semantic_cache.stats()
+    worker_stats = {"caches": caches, "llm_router": state.chatbot_service.router.stats()}
+    if state.chatbot_service.single_flight is not None:
+        worker_stats["llm_requests"] = state.chatbot_service.single_flight.stats()
+    if state.admission is not None:
+        worker_stats["admission"] = state.admission.stats()
+    return worker_stats
+
+
+@app.get("/stats")
+async def stats(request: Request) -> dict:
+    """Size and hit ratio of the caches of this worker, and statistics of its LLM calls."""
+    return _worker_stats(request.app.state)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request) -> Response:
+    """Prometheus metrics of this worker, or of all the workers when they are shared."""
+    if multiprocess_metrics():
+        request.app.state.stats_collector.publish()
+    return Response(generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
@@ -1,12 +1,54 @@
 """FastAPI dependencies."""
-from src.chatbot.infrastructure.supabase.client import supabase_client
+from typing import Optional
+
+from fastapi import Depends, Request
+
+from src.chatbot.domain.entities.conversation import Conversation
+from src.chatbot.domain.entities.user import User
+from src.chatbot.domain.repositories.conversation_repository import ConversationRepository
+from src.chatbot.domain.repositories.conversation_summary_repository import (
+    ConversationSummaryRepository,
+)
+from src.chatbot.domain.repositories.message_repository import MessageRepository
+from src.chatbot.domain.repositories.turn_repository import TurnRepository
+from src.chatbot.infrastructure.auth.supabase_auth import get_access_token, get_current_user
+from src.chatbot.infrastructure.background import BackgroundTaskRunner
+from src.chatbot.infrastructure.cache.history import ConversationHistoryCache
+from src.chatbot.infrastructure.cache.lru import LRUCache
+from src.chatbot.infrastructure.config import settings
+from src.chatbot.infrastructure.supabase.client import get_supabase_client
+from src.chatbot.infrastructure.database.cached_conversation_repository import (
+    CachedConversationRepository,
+)
+from src.chatbot.infrastructure.database.cached_message_repository import (
+    CachedMessageRepository,
+)
+from src.chatbot.infrastructure.database.cached_turn_repository import CachedTurnRepository
 from src.chatbot.infrastructure.database.supabase_conversation_repository import (
     SupabaseConversationRepository,
 )
 from src.chatbot.infrastructure.database.supabase_message_repository import (
     SupabaseMessageRepository,
 )
+from src.chatbot.infrastructure.database.supabase_conversation_summary_repository import (
+    SupabaseConversationSummaryRepository,
+)
+from src.chatbot.infrastructure.database.supabase_turn_repository import SupabaseTurnRepository
+from src.chatbot.infrastructure.database.postgres_conversation_repository import (
+    PostgresConversationRepository,
+)
+from src.chatbot.infrastructure.database.postgres_message_repository import (
+    PostgresMessageRepository,
+)
+from src.chatbot.infrastructure.database.postgres_conversation_summary_repository import (
+    PostgresConversationSummaryRepository,
+)
+from src.chatbot.infrastructure.database.postgres_turn_repository import PostgresTurnRepository
+from src.chatbot.infrastructure.postgres.pool import UserDatabase, get_postgres_pool
 from src.chatbot.infrastructure.langchain.chatbot_service import ChatbotService
+from src.chatbot.infrastructure.langchain.context_builder import ContextBuilder
+from src.chatbot.infrastructure.langchain.summarizer import ConversationSummarizer
+from src.chatbot.infrastructure.langchain.title_generator import ConversationTitleGenerator
 from src.chatbot.application.use_cases.create_conversation import CreateConversationUseCase
 from src.chatbot.application.use_cases.get_conversation import GetConversationUseCase
 from src.chatbot.application.use_cases.list_conversations import ListConversationsUseCase
@@ -17,47 +59,167 @@ from src.chatbot.application.use_cases.get_conversation_messages import (
 
 
 # Repositories
-def get_conversation_repository() -> SupabaseConversationRepository:
-    """Get conversation repository instance."""
-    return SupabaseConversationRepository(supabase_client)
+async def get_database(
+    current_user: User = Depends(get_current_user),
+) -> Optional[UserDatabase]:
+    """Get the Postgres pool acting as the current user, or None when repositories use PostgREST."""
+    if settings.repository_backend != "postgres":
+        return None
+    return UserDatabase(await get_postgres_pool(), current_user.id, role=settings.database_role)
+
+
+async def get_conversation_repository(
+    request: Request,
+    database: Optional[UserDatabase] = Depends(get_database),
+) -> ConversationRepository:
+    """Get conversation repository instance, backed by the worker-wide cache."""
+    cache: LRUCache[Conversation] = request.app.state.conversation_cache
+    repository: ConversationRepository
+    if database is not None:
+        repository = PostgresConversationRepository(database)
+    else:
+        repository = SupabaseConversationRepository(await get_supabase_client())
+    return CachedConversationRepository(repository, cache)
+
+
+async def get_message_repository(
+    request: Request,
+    database: Optional[UserDatabase] = Depends(get_database),
+) -> MessageRepository:
+    """Get message repository instance, backed by the worker-wide history cache."""
+    cache: ConversationHistoryCache = request.app.state.history_cache
+    repository: MessageRepository
+    if database is not None:
+        repository = PostgresMessageRepository(database)
+    else:
+        repository = SupabaseMessageRepository(await get_supabase_client())
+    return CachedMessageRepository(repository, cache)
+
+
+async def get_conversation_summary_repository(
+    database: Optional[UserDatabase] = Depends(get_database),
+) -> ConversationSummaryRepository:
+    """Get conversation summary repository instance."""
+    if database is not None:
+        return PostgresConversationSummaryRepository(database)
+    return SupabaseConversationSummaryRepository(await get_supabase_client())
+
+
+async def get_turn_repository(
+    request: Request,
+    database: Optional[UserDatabase] = Depends(get_database),
+    access_token: str = Depends(get_access_token),
+) -> Optional[TurnRepository]:
+    """Get turn repository instance, or None when turns do not use the RPC."""
+    if not settings.send_message_rpc:
+        return None
+    cache: ConversationHistoryCache = request.app.state.history_cache
+    repository: TurnRepository
+    if database is not None:
+        repository = PostgresTurnRepository(database)
+    else:
+        repository = SupabaseTurnRepository(await get_supabase_client(), access_token)
+    return CachedTurnRepository(repository, cache)
 
 
-def get_message_repository() -> SupabaseMessageRepository:
-    """Get message repository instance."""
-    return SupabaseMessageRepository(supabase_client)
+# Services
+def get_chatbot_service(request: Request) -> ChatbotService:
+    """Get the worker-wide chatbot service instance created at startup."""
+    return request.app.state.chatbot_service
+
+
+def get_context_builder(request: Request) -> ContextBuilder:
+    """Get the worker-wide context builder, which caches token counts."""
+    return request.app.state.context_builder
+
+
+def get_task_runner(request: Request) -> BackgroundTaskRunner:
+    """Get the worker-wide background task runner."""
+    return request.app.state.task_runner
+
+
+def get_summarizer(
+    message_repository: MessageRepository = Depends(get_message_repository),
+    summary_repository: ConversationSummaryRepository = Depends(
+        get_conversation_summary_repository
+    ),
+    chatbot_service: ChatbotService = Depends(get_chatbot_service),
+    task_runner: BackgroundTaskRunner = Depends(get_task_runner),
+) -> Optional[ConversationSummarizer]:
+    """Get conversation summarizer, or None when summaries are disabled."""
+    if not settings.summary_enabled:
+        return None
+    return ConversationSummarizer(
+        message_repository,
+        summary_repository,
+        chatbot_service,
+        task_runner,
+        batch_size=settings.summary_batch_size,
+    )
 
 
-# Services
-def get_chatbot_service() -> ChatbotService:
-    """Get chatbot service instance."""
-    return ChatbotService()
+def get_title_generator(
+    conversation_repository: ConversationRepository = Depends(get_conversation_repository),
+    chatbot_service: ChatbotService = Depends(get_chatbot_service),
+    task_runner: BackgroundTaskRunner = Depends(get_task_runner),
+) -> Optional[ConversationTitleGenerator]:
+    """Get conversation title generator, or None when titles are not generated."""
+    if not settings.title_generation_enabled:
+        return None
+    return ConversationTitleGenerator(
+        conversation_repository,
+        chatbot_service,
+        task_runner,
+        max_attempts=settings.title_max_attempts,
+        backoff=settings.title_retry_backoff,
+    )
 
 
 # Use cases
-def get_create_conversation_use_case() -> CreateConversationUseCase:
+def get_create_conversation_use_case(
+    conversation_repository: ConversationRepository = Depends(get_conversation_repository),
+) -> CreateConversationUseCase:
     """Get create conversation use case."""
-    return CreateConversationUseCase(get_conversation_repository())
+    return CreateConversationUseCase(conversation_repository)
 
 
-def get_get_conversation_use_case() -> GetConversationUseCase:
+def get_get_conversation_use_case(
+    conversation_repository: ConversationRepository = Depends(get_conversation_repository),
+) -> GetConversationUseCase:
     """Get conversation use case."""
-    return GetConversationUseCase(get_conversation_repository())
+    return GetConversationUseCase(conversation_repository)
 
 
-def get_list_conversations_use_case() -> ListConversationsUseCase:
+def get_list_conversations_use_case(
+    conversation_repository: ConversationRepository = Depends(get_conversation_repository),
+) -> ListConversationsUseCase:
     """Get list conversations use case."""
-    return ListConversationsUseCase(get_conversation_repository())
-
-
-def get_send_message_use_case() -> SendMessageUseCase:
+    return ListConversationsUseCase(conversation_repository)
+
+
+def get_send_message_use_case(
+    message_repository: MessageRepository = Depends(get_message_repository),
+    conversation_repository: ConversationRepository = Depends(get_conversation_repository),
+    chatbot_service: ChatbotService = Depends(get_chatbot_service),
+    context_builder: ContextBuilder = Depends(get_context_builder),
+    summarizer: Optional[ConversationSummarizer] = Depends(get_summarizer),
+    turn_repository: Optional[TurnRepository] = Depends(get_turn_repository),
+    title_generator: Optional[ConversationTitleGenerator] = Depends(get_title_generator),
+) -> SendMessageUseCase:
     """Get send message use case."""
     return SendMessageUseCase(
-        get_message_repository(),
-        get_conversation_repository(),
-        get_chatbot_service(),
+        message_repository,
+        conversation_repository,
+        chatbot_service,
+        context_builder,
+        summarizer,
+        turn_repository,
+        title_generator,
     )
 
 
-def get_get_conversation_messages_use_case() -> GetConversationMessagesUseCase:
+def get_get_conversation_messages_use_case(
+    message_repository: MessageRepository = Depends(get_message_repository),
+) -> GetConversationMessagesUseCase:
     """Get conversation messages use case."""
-    return GetConversationMessagesUseCase(get_message_repository())
+    return GetConversationMessagesUseCase(message_repository)
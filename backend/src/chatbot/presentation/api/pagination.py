@@ -0,0 +1,44 @@
+"""Opaque page cursors exchanged with API clients."""
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional, Sequence, Union
+from uuid import UUID
+
+from fastapi import HTTPException, Response
+
+from src.chatbot.domain.entities.conversation import Conversation
+from src.chatbot.domain.entities.message import Message
+from src.chatbot.domain.entities.page_cursor import PageCursor
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(cursor: PageCursor) -> str:
+    """Encode a cursor as an URL-safe token."""
+    raw = f"{cursor.created_at.isoformat()}|{cursor.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> PageCursor:
+    """Decode a cursor token, raising a 400 error if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        created_at, _, cursor_id = raw.partition("|")
+        return PageCursor(created_at=datetime.fromisoformat(created_at), id=UUID(cursor_id))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_cursor(cursor: Optional[str]) -> Optional[PageCursor]:
+    """Decode the optional `cursor` query parameter."""
+    return decode_cursor(cursor) if cursor else None
+
+
+def set_next_cursor(
+    response: Response, page: Sequence[Union[Conversation, Message]], limit: int
+) -> None:
+    """Advertise the cursor of the next page when the page is full."""
+    if limit and len(page) >= limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(PageCursor.after(page[-1]))
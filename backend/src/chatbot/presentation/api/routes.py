@@ -1,9 +1,13 @@
 """API routes."""
-from typing import List
+import json
+import logging
+from typing import AsyncIterator, List, Optional, Union
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 
+from src.chatbot.domain.entities.message import Message
 from src.chatbot.domain.entities.user import User
 from src.chatbot.infrastructure.auth.supabase_auth import get_current_user
 from src.chatbot.presentation.schemas.conversation import (
@@ -11,6 +15,7 @@ from src.chatbot.presentation.schemas.conversation import (
     ConversationResponse,
 )
 from src.chatbot.presentation.schemas.message import MessageSendRequest, MessageResponse
+from src.chatbot.presentation.api.admission import admit_llm_turn
 from src.chatbot.presentation.api.dependencies import (
     get_create_conversation_use_case,
     get_get_conversation_use_case,
@@ -18,6 +23,8 @@ from src.chatbot.presentation.api.dependencies import (
     get_send_message_use_case,
     get_get_conversation_messages_use_case,
 )
+from src.chatbot.presentation.api.pagination import parse_cursor, set_next_cursor
+from src.chatbot.presentation.api.responses import EntityListResponse
 from src.chatbot.application.use_cases.create_conversation import CreateConversationUseCase
 from src.chatbot.application.use_cases.get_conversation import GetConversationUseCase
 from src.chatbot.application.use_cases.list_conversations import ListConversationsUseCase
@@ -26,7 +33,10 @@ from src.chatbot.application.use_cases.get_conversation_messages import (
     GetConversationMessagesUseCase,
 )
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Prefixed here rather than when included, so that route paths are full templates
+router = APIRouter(prefix="/api/v1", tags=["chatbot"])
 
 
 @router.post("/conversations", response_model=ConversationResponse, status_code=201)
@@ -36,7 +46,9 @@ async def create_conversation(
     use_case: CreateConversationUseCase = Depends(get_create_conversation_use_case),
 ) -> ConversationResponse:
     """Create a new conversation."""
-    conversation = await use_case.execute(current_user.id, request.title)
+    conversation = await use_case.execute(
+        current_user.id, request.title, request.semantic_cache_threshold
+    )
     return ConversationResponse.model_validate(conversation)
 
 
@@ -45,11 +57,21 @@ async def list_conversations(
     current_user: User = Depends(get_current_user),
     limit: int = 100,
     offset: int = 0,
+    cursor: Optional[str] = None,
     use_case: ListConversationsUseCase = Depends(get_list_conversations_use_case),
-) -> List[ConversationResponse]:
-    """List all conversations for the authenticated user."""
-    conversations = await use_case.execute(current_user.id, limit=limit, offset=offset)
-    return [ConversationResponse.model_validate(c) for c in conversations]
+) -> EntityListResponse:
+    """
+    List all conversations for the authenticated user, newest first.
+
+    When the page is full, the `X-Next-Cursor` response header holds the
+    `cursor` to pass to get the next page.
+    """
+    conversations = await use_case.execute(
+        current_user.id, limit=limit, offset=offset, after=parse_cursor(cursor)
+    )
+    response = EntityListResponse(conversations, ConversationResponse)
+    set_next_cursor(response, conversations, limit)
+    return response
 
 
 @router.get("/conversations/{conversation_id}", response_model=ConversationResponse)
@@ -69,6 +91,7 @@ async def get_conversation(
     "/conversations/{conversation_id}/messages",
     response_model=MessageResponse,
     status_code=201,
+    dependencies=[Depends(admit_llm_turn)],
 )
 async def send_message(
     conversation_id: UUID,
@@ -84,6 +107,54 @@ async def send_message(
         raise HTTPException(status_code=404, detail=str(e))
 
 
+def _sse_event(event: str, data: str) -> str:
+    """Format a Server-Sent Event."""
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+async def _sse_stream(stream: AsyncIterator[Union[str, Message]]) -> AsyncIterator[str]:
+    """Translate a message stream into SSE `delta`, `done` and `error` events."""
+    try:
+        async for item in stream:
+            if isinstance(item, Message):
+                yield _sse_event("done", MessageResponse.model_validate(item).model_dump_json())
+            else:
+                yield _sse_event("delta", json.dumps({"content": item}))
+    except Exception:
+        logger.exception("Streamed turn failed")
+        # Headers are already sent, so errors are reported in-band, without
+        # exposing the internals of the LLM or database error to the client
+        yield _sse_event("error", json.dumps({"detail": "Failed to generate a response"}))
+
+
+@router.post(
+    "/conversations/{conversation_id}/messages/stream", dependencies=[Depends(admit_llm_turn)]
+)
+async def stream_message(
+    conversation_id: UUID,
+    request: MessageSendRequest,
+    current_user: User = Depends(get_current_user),
+    use_case: SendMessageUseCase = Depends(get_send_message_use_case),
+) -> StreamingResponse:
+    """
+    Send a message to a conversation and stream the AI response.
+
+    The response is a Server-Sent Events stream of `delta` events carrying
+    `{"content": "..."}` chunks, followed by a single `done` event with the
+    saved assistant message.
+    """
+    try:
+        stream = await use_case.execute_stream(conversation_id, current_user.id, request.content)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    return StreamingResponse(
+        _sse_stream(stream),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get(
     "/conversations/{conversation_id}/messages", response_model=List[MessageResponse]
 )
@@ -92,11 +163,21 @@ async def get_conversation_messages(
     current_user: User = Depends(get_current_user),
     limit: int = 100,
     offset: int = 0,
+    cursor: Optional[str] = None,
     use_case: GetConversationMessagesUseCase = Depends(
         get_get_conversation_messages_use_case
     ),
-) -> List[MessageResponse]:
-    """Get all messages for a conversation."""
+) -> EntityListResponse:
+    """
+    Get all messages for a conversation, oldest first.
+
+    When the page is full, the `X-Next-Cursor` response header holds the
+    `cursor` to pass to get the next page.
+    """
     # Note: RLS policies will ensure user can only access their own conversations
-    messages = await use_case.execute(conversation_id, limit=limit, offset=offset)
-    return [MessageResponse.model_validate(m) for m in messages]
+    messages = await use_case.execute(
+        conversation_id, limit=limit, offset=offset, after=parse_cursor(cursor)
+    )
+    response = EntityListResponse(messages, MessageResponse)
+    set_next_cursor(response, messages, limit)
+    return response
@@ -3,13 +3,16 @@ from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class ConversationCreateRequest(BaseModel):
     """Request schema for creating a conversation."""
 
-    title: str
+    # Generated from the first message if omitted
+    title: Optional[str] = None
+    # Similarity (0-1) above which the semantic cache may answer, default if omitted
+    semantic_cache_threshold: Optional[float] = Field(default=None, ge=0, le=1)
 
 
 class ConversationResponse(BaseModel):
@@ -19,6 +22,7 @@ class ConversationResponse(BaseModel):
     title: str
     created_at: datetime
     updated_at: datetime
+    semantic_cache_threshold: Optional[float] = None
 
     class Config:
         """Pydantic configuration."""
@@ -0,0 +1,49 @@
+-- Create conversation summaries table
+-- Holds a running summary of the turns that no longer fit in the LLM context window.
+-- It is updated incrementally: only messages created after summarized_until are folded in.
+CREATE TABLE IF NOT EXISTS conversation_summaries (
+    conversation_id UUID PRIMARY KEY REFERENCES conversations(id) ON DELETE CASCADE,
+    content TEXT NOT NULL,
+    summarized_until TIMESTAMP WITH TIME ZONE NOT NULL,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW())
+);
+
+-- Add RLS policies
+ALTER TABLE conversation_summaries ENABLE ROW LEVEL SECURITY;
+
+-- Users can only view summaries of their own conversations
+CREATE POLICY "Users can view summaries of their own conversations" ON conversation_summaries
+    FOR SELECT
+    USING (
+        EXISTS (
+            SELECT 1 FROM conversations
+            WHERE conversations.id = conversation_summaries.conversation_id
+            AND conversations.user_id = auth.uid()
+        )
+    );
+
+-- Users can only create summaries of their own conversations
+CREATE POLICY "Users can create summaries of their own conversations" ON conversation_summaries
+    FOR INSERT
+    WITH CHECK (
+        EXISTS (
+            SELECT 1 FROM conversations
+            WHERE conversations.id = conversation_summaries.conversation_id
+            AND conversations.user_id = auth.uid()
+        )
+    );
+
+-- Users can only update summaries of their own conversations
+CREATE POLICY "Users can update summaries of their own conversations" ON conversation_summaries
+    FOR UPDATE
+    USING (
+        EXISTS (
+            SELECT 1 FROM conversations
+            WHERE conversations.id = conversation_summaries.conversation_id
+            AND conversations.user_id = auth.uid()
+        )
+    );
+
+CREATE TRIGGER update_conversation_summaries_updated_at BEFORE UPDATE ON conversation_summaries
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
@@ -0,0 +1,82 @@
+-- ============================================================================
+-- RPC Function: start a send-message turn in a single round-trip
+-- Checks ownership, bumps conversations.updated_at, returns the most recent
+-- history and the running summary, then inserts the user message.
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION begin_turn(
+    p_conversation_id UUID,
+    p_user_id UUID,
+    p_message_id UUID,
+    p_content TEXT,
+    p_created_at TIMESTAMP WITH TIME ZONE,
+    p_history_limit INTEGER DEFAULT 100
+)
+RETURNS JSON AS $$
+DECLARE
+    v_history JSON;
+    v_summary JSON;
+BEGIN
+    -- Callers may only act on their own behalf, and must be authenticated as a user
+    IF auth.uid() IS DISTINCT FROM p_user_id THEN
+        RETURN NULL;
+    END IF;
+
+    -- Verify conversation exists and belongs to user, and bump updated_at
+    UPDATE conversations
+    SET updated_at = TIMEZONE('utc', NOW())
+    WHERE id = p_conversation_id AND user_id = p_user_id;
+
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    -- Most recent messages, in chronological order (uses idx_messages_conversation_created)
+    SELECT COALESCE(
+        json_agg(
+            json_build_object(
+                'id', id,
+                'conversation_id', conversation_id,
+                'role', role,
+                'content', content,
+                'created_at', created_at
+            )
+            ORDER BY created_at ASC
+        ),
+        '[]'::json
+    )
+    INTO v_history
+    FROM (
+        SELECT * FROM messages
+        WHERE conversation_id = p_conversation_id
+        ORDER BY created_at DESC
+        LIMIT p_history_limit
+    ) AS recent_messages;
+
+    -- Running summary of older turns, if any
+    SELECT json_build_object(
+        'conversation_id', conversation_id,
+        'content', content,
+        'summarized_until', summarized_until,
+        'message_count', message_count,
+        'updated_at', updated_at
+    )
+    INTO v_summary
+    FROM conversation_summaries
+    WHERE conversation_id = p_conversation_id;
+
+    -- Insert user message
+    INSERT INTO messages (id, conversation_id, role, content, created_at)
+    VALUES (p_message_id, p_conversation_id, 'user', p_content, p_created_at);
+
+    RETURN json_build_object('history', v_history, 'summary', v_summary);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+REVOKE EXECUTE ON FUNCTION begin_turn(UUID, UUID, UUID, TEXT, TIMESTAMP WITH TIME ZONE, INTEGER)
+    FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION begin_turn(UUID, UUID, UUID, TEXT, TIMESTAMP WITH TIME ZONE, INTEGER)
+    TO authenticated;
+
+COMMENT ON FUNCTION begin_turn(UUID, UUID, UUID, TEXT, TIMESTAMP WITH TIME ZONE, INTEGER)
+    IS 'Check ownership, return recent history and summary, and insert the user message';
@@ -0,0 +1,97 @@
+"""Tests of the admission control of message turns."""
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from src.chatbot.infrastructure.config import Settings
+from src.chatbot.presentation.api.admission import AdmissionController
+
+
+class FakeClock:
+    """Stand-in for the time module, advanced by hand."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr("src.chatbot.presentation.api.admission.time", clock)
+    monkeypatch.setattr("src.chatbot.infrastructure.cache.lru.time", clock)
+    return clock
+
+
+def _controller(user_rate: float, user_burst: int) -> AdmissionController:
+    return AdmissionController(
+        max_concurrent=1000,
+        max_queue=1000,
+        max_user_queue=10,
+        user_rate=user_rate,
+        user_burst=user_burst,
+        queue_timeout=1.0,
+    )
+
+
+@pytest.mark.asyncio
+async def test_user_rate_holds_past_burst_over_rate(clock: FakeClock) -> None:
+    controller = _controller(user_rate=1.0, user_burst=10)
+    user_id = uuid4()
+
+    # 2 messages per second for 60 seconds, well past burst / rate = 10 seconds
+    admitted = 0
+    for _ in range(120):
+        try:
+            ticket = await controller.admit(user_id)
+        except HTTPException as e:
+            assert e.status_code == 429
+        else:
+            ticket.release()
+            admitted += 1
+        clock.now += 0.5
+
+    assert admitted <= 10 + 60
+    assert controller.rate_limited == 120 - admitted
+
+
+@pytest.mark.asyncio
+async def test_idle_user_gets_a_full_burst_again(clock: FakeClock) -> None:
+    controller = _controller(user_rate=1.0, user_burst=3)
+    user_id = uuid4()
+    for _ in range(3):
+        (await controller.admit(user_id)).release()
+    with pytest.raises(HTTPException):
+        await controller.admit(user_id)
+
+    clock.now += 60
+    for _ in range(3):
+        (await controller.admit(user_id)).release()
+
+
+def _settings(**values: object) -> Settings:
+    """Build settings from the required values and `values`, ignoring the .env file."""
+    return Settings(
+        _env_file=None,
+        supabase_url="http://localhost",
+        supabase_key="key",
+        supabase_jwt_secret="secret",
+        openrouter_api_key="key",
+        **values,
+    )
+
+
+@pytest.mark.parametrize("rate", [0, -1])
+def test_settings_reject_a_user_rate_that_is_not_positive(rate: float) -> None:
+    with pytest.raises(ValidationError) as error:
+        _settings(admission_user_rate=rate)
+
+    assert [e["loc"] for e in error.value.errors()] == [("admission_user_rate",)]
+
+
+def test_settings_accept_a_positive_user_rate() -> None:
+    assert _settings(admission_user_rate=1.0).admission_user_rate == 1.0
@@ -0,0 +1,66 @@
+"""Tests of the caching turn repository."""
+import asyncio
+from typing import List, Optional, Tuple
+from uuid import UUID, uuid4
+
+import pytest
+
+from src.chatbot.domain.entities.conversation import Conversation
+from src.chatbot.domain.entities.conversation_summary import ConversationSummary
+from src.chatbot.domain.entities.message import Message, MessageRole
+from src.chatbot.infrastructure.cache.history import ConversationHistoryCache
+from src.chatbot.infrastructure.database.cached_turn_repository import CachedTurnRepository
+
+
+class HeldTurnRepository:
+    """Turn repository returning a fixed history once released."""
+
+    def __init__(self, conversation: Conversation, history: List[Message]) -> None:
+        self.conversation = conversation
+        self.history = history
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def begin_turn(
+        self, user_id: UUID, user_message: Message, history_limit: int = 100
+    ) -> Optional[Tuple[Conversation, List[Message], Optional[ConversationSummary]]]:
+        history = list(self.history)
+        self.started.set()
+        await self.release.wait()
+        return self.conversation, history, None
+
+
+@pytest.mark.asyncio
+async def test_turn_racing_with_a_write_drops_the_cached_tail() -> None:
+    conversation = Conversation(user_id=uuid4(), title="Test")
+    question = Message(conversation_id=conversation.id, role=MessageRole.USER, content="q1")
+    cache = ConversationHistoryCache(1024 * 1024, max_messages=100)
+    cache.put(conversation.id, [question], 1)
+    repository = HeldTurnRepository(conversation, [question])
+    turns = CachedTurnRepository(repository, cache)
+
+    second = Message(conversation_id=conversation.id, role=MessageRole.USER, content="q2")
+    turn = asyncio.create_task(turns.begin_turn(conversation.user_id, second))
+    await repository.started.wait()
+    # The previous turn saves its answer while this one starts
+    cache.append(
+        Message(conversation_id=conversation.id, role=MessageRole.ASSISTANT, content="a1")
+    )
+    repository.release.set()
+    await turn
+
+    assert cache.get_recent(conversation.id, 10) is None
+
+
+@pytest.mark.asyncio
+async def test_turn_caches_the_history_and_the_user_message() -> None:
+    conversation = Conversation(user_id=uuid4(), title="Test")
+    question = Message(conversation_id=conversation.id, role=MessageRole.USER, content="q1")
+    cache = ConversationHistoryCache(1024 * 1024, max_messages=100)
+    repository = HeldTurnRepository(conversation, [question])
+    repository.release.set()
+
+    second = Message(conversation_id=conversation.id, role=MessageRole.USER, content="q2")
+    await CachedTurnRepository(repository, cache).begin_turn(conversation.user_id, second)
+
+    assert [m.content for m in cache.get_recent(conversation.id, 10) or []] == ["q1", "q2"]
@@ -0,0 +1,123 @@
+"""Tests of the conversation history cache and the caching message repository."""
+import asyncio
+from typing import Dict, List
+from uuid import UUID, uuid4
+
+import pytest
+
+from src.chatbot.domain.entities.message import Message, MessageRole
+from src.chatbot.infrastructure.cache.history import ConversationHistoryCache
+from src.chatbot.infrastructure.database.cached_message_repository import (
+    CachedMessageRepository,
+)
+
+
+class InMemoryMessageRepository:
+    """Message repository whose `list_recent` can be held after reading the messages."""
+
+    def __init__(self) -> None:
+        self.messages: Dict[UUID, List[Message]] = {}
+        self.read_done = asyncio.Event()
+        self.release_read = asyncio.Event()
+        self.release_read.set()
+
+    async def create(self, message: Message) -> Message:
+        self.messages.setdefault(message.conversation_id, []).append(message)
+        return message
+
+    async def create_many(self, messages: List[Message]) -> List[Message]:
+        return [await self.create(message) for message in messages]
+
+    async def count_by_conversation(self, conversation_id: UUID) -> int:
+        return len(self.messages.get(conversation_id, []))
+
+    async def list_recent(self, conversation_id: UUID, limit: int = 100) -> List[Message]:
+        snapshot = list(self.messages.get(conversation_id, []))[-limit:]
+        self.read_done.set()
+        await self.release_read.wait()
+        return snapshot
+
+
+def _message(conversation_id: UUID, content: str) -> Message:
+    return Message(conversation_id=conversation_id, role=MessageRole.USER, content=content)
+
+
+def _cache() -> ConversationHistoryCache:
+    return ConversationHistoryCache(1024 * 1024, max_messages=100)
+
+
+@pytest.mark.asyncio
+async def test_load_racing_with_writes_is_not_cached() -> None:
+    conversation_id = uuid4()
+    database = InMemoryMessageRepository()
+    repository = CachedMessageRepository(database, _cache())
+    await database.create(_message(conversation_id, "a"))
+
+    database.release_read.clear()
+    load = asyncio.create_task(repository.list_recent(conversation_id))
+    await database.read_done.wait()
+    # Another turn writes while the tail is being loaded
+    await repository.create(_message(conversation_id, "b"))
+    await repository.create_many([_message(conversation_id, "c")])
+    database.release_read.set()
+    assert [m.content for m in await load] == ["a"]
+
+    recent = await repository.list_recent(conversation_id)
+    assert [m.content for m in recent] == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_load_without_concurrent_writes_is_cached() -> None:
+    conversation_id = uuid4()
+    database = InMemoryMessageRepository()
+    cache = _cache()
+    repository = CachedMessageRepository(database, cache)
+    await repository.create(_message(conversation_id, "a"))
+
+    await repository.list_recent(conversation_id)
+    await repository.create(_message(conversation_id, "b"))
+
+    assert [m.content for m in cache.get_recent(conversation_id, 10) or []] == ["a", "b"]
+    assert cache.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_tail_written_through_another_worker_is_reloaded() -> None:
+    conversation_id = uuid4()
+    database = InMemoryMessageRepository()
+    worker = CachedMessageRepository(database, _cache())
+    other_worker = CachedMessageRepository(database, _cache())
+    await worker.create(_message(conversation_id, "a"))
+
+    await worker.list_recent(conversation_id)
+    assert [m.content for m in await worker.list_recent(conversation_id)] == ["a"]
+    assert worker.cache.hits == 1
+
+    await other_worker.create(_message(conversation_id, "b"))
+    recent = await worker.list_recent(conversation_id)
+
+    assert [m.content for m in recent] == ["a", "b"]
+    assert worker.cache.hits == 1
+
+
+def test_put_is_skipped_after_invalidate() -> None:
+    conversation_id = uuid4()
+    cache = _cache()
+    version = cache.version(conversation_id)
+    cache.invalidate(conversation_id)
+
+    assert not cache.put(conversation_id, [_message(conversation_id, "a")], 1, version)
+    assert cache.get_recent(conversation_id, 10) is None
+
+
+def test_forgotten_write_counters_skip_older_loads(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("src.chatbot.infrastructure.cache.history.MAX_TRACKED_WRITES", 2)
+    conversation_id = uuid4()
+    cache = _cache()
+    version = cache.version(conversation_id)
+    cache.append(_message(conversation_id, "a"))
+    # The counter of the conversation is forgotten as others are written
+    cache.append(_message(uuid4(), "b"))
+    cache.append(_message(uuid4(), "c"))
+
+    assert not cache.put(conversation_id, [], 0, version)
@@ -0,0 +1,126 @@
+"""Tests of the routing of LLM calls across endpoints, against fake providers."""
+import asyncio
+import time
+from typing import Iterator, Tuple
+
+import pytest
+from langchain_core.messages import HumanMessage
+from langchain_openai import ChatOpenAI
+from prometheus_client import REGISTRY
+
+from benchmarks.fakes import FakeOpenAI
+from src.chatbot.infrastructure.langchain.llm_router import LLMEndpoint, LLMRouter
+
+MODEL = "openai/gpt-3.5-turbo"
+# Reply of the fake providers to "hello"
+ANSWER = "Here is an answer about: hello"
+
+
+@pytest.fixture
+def providers() -> Iterator[Tuple[FakeOpenAI, FakeOpenAI]]:
+    """A primary provider, and a secondary one slower than it usually is."""
+    with FakeOpenAI(seed=1) as primary, FakeOpenAI(latency=0.2, seed=2) as secondary:
+        yield primary, secondary
+
+
+def _endpoint(name: str, provider: FakeOpenAI) -> LLMEndpoint:
+    llm = ChatOpenAI(
+        model=MODEL, openai_api_key="key", openai_api_base=provider.url, max_retries=0
+    )
+    return LLMEndpoint(name, llm)
+
+
+def _router(primary: FakeOpenAI, secondary: FakeOpenAI) -> LLMRouter:
+    return LLMRouter(
+        [_endpoint("primary", primary), _endpoint("secondary", secondary)],
+        hedge_min_delay=0.05,
+        hedge_min_samples=1,
+        max_hedge_ratio=1.0,
+        probe_every=1000,
+    )
+
+
+def _cancelled_calls(endpoint: str) -> float:
+    return (
+        REGISTRY.get_sample_value(
+            "chatbot_llm_call_duration_seconds_count",
+            {"endpoint": endpoint, "kind": "complete", "outcome": "cancelled"},
+        )
+        or 0.0
+    )
+
+
+async def _wait_for_cancelled_call(endpoint: str, before: float) -> None:
+    """Wait for the task of a losing call, cancelled as the race ends, to finish."""
+    deadline = time.monotonic() + 1.0
+    while _cancelled_calls(endpoint) == before and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    assert _cancelled_calls(endpoint) == before + 1
+
+
+async def _ask(router: LLMRouter, question: str, kind: str = "complete") -> str:
+    return (await router.ainvoke([HumanMessage(content=question)], kind=kind)).content
+
+
+async def _warm_up(router: LLMRouter) -> None:
+    """Give both endpoints a latency sample, the primary being the fastest."""
+    for i in range(2):
+        await _ask(router, f"warm up {i}")
+    assert [e.name for e in router.rank("complete")] == ["primary", "secondary"]
+
+
+@pytest.mark.asyncio
+async def test_failing_endpoint_fails_over_to_the_next(
+    providers: Tuple[FakeOpenAI, FakeOpenAI]
+) -> None:
+    primary, secondary = providers
+    primary.error_rate = 1.0
+    router = _router(primary, secondary)
+
+    assert await _ask(router, "hello") == ANSWER
+
+    assert router.failovers == 1
+    assert primary.error_count == 1 and secondary.request_count == 1
+    assert router.endpoints[0].error_rate == 1.0
+
+
+@pytest.mark.asyncio
+async def test_call_failing_on_every_endpoint_raises(
+    providers: Tuple[FakeOpenAI, FakeOpenAI]
+) -> None:
+    primary, secondary = providers
+    primary.error_rate = secondary.error_rate = 1.0
+
+    with pytest.raises(Exception):
+        await _ask(_router(primary, secondary), "hello")
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_and_the_loser_cancelled(
+    providers: Tuple[FakeOpenAI, FakeOpenAI]
+) -> None:
+    primary, secondary = providers
+    router = _router(primary, secondary)
+    await _warm_up(router)
+    cancelled = _cancelled_calls("primary")
+
+    primary.slow_rate, primary.slow_latency = 1.0, 2.0
+    started = time.monotonic()
+    assert await _ask(router, "hello") == ANSWER
+
+    assert time.monotonic() - started < 1.0
+    assert router.hedged == 1 and router.hedges_won == 1
+    await _wait_for_cancelled_call("primary", cancelled)
+
+
+@pytest.mark.asyncio
+async def test_summaries_have_latency_statistics_of_their_own(
+    providers: Tuple[FakeOpenAI, FakeOpenAI]
+) -> None:
+    primary, secondary = providers
+    router = _router(primary, secondary)
+
+    await _ask(router, "summarize this", kind="summary")
+
+    assert len(router.endpoints[0].latency["summary"]) == 1
+    assert len(router.endpoints[0].latency["complete"]) == 0
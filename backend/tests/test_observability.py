@@ -0,0 +1,39 @@
+"""Tests of the labelling of HTTP request metrics."""
+from uuid import uuid4
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from prometheus_client import REGISTRY
+
+from src.chatbot.infrastructure.observability import MetricsMiddleware
+from src.chatbot.presentation.api.routes import router
+
+
+def _requests(route: str, status: int) -> float:
+    return (
+        REGISTRY.get_sample_value(
+            "chatbot_http_request_duration_seconds_count",
+            {"method": "GET", "route": route, "status": str(status)},
+        )
+        or 0.0
+    )
+
+
+@pytest.mark.asyncio
+async def test_requests_are_labelled_with_their_full_route_template() -> None:
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(router)
+    route = "/api/v1/conversations/{conversation_id}/messages"
+    before = {status: _requests(route, status) for status in (401, 403)}
+    unmatched = _requests("unmatched", 404)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        # Rejected for lack of credentials, once matched
+        response = await client.get(f"/api/v1/conversations/{uuid4()}/messages")
+        await client.get("/api/v1/nowhere")
+
+    assert _requests(route, response.status_code) == before[response.status_code] + 1
+    assert _requests("unmatched", 404) == unmatched + 1
@@ -0,0 +1,152 @@
+"""Tests of the page cursors and of keyset pagination over PostgREST."""
+import base64
+import string
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional
+from uuid import UUID, uuid4
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException, Response
+from supabase import AsyncClient, acreate_client
+
+from benchmarks.fakes import FakePostgREST
+from src.chatbot.domain.entities.conversation import Conversation
+from src.chatbot.domain.entities.message import Message, MessageRole
+from src.chatbot.domain.entities.page_cursor import PageCursor
+from src.chatbot.infrastructure.database.supabase_conversation_repository import (
+    SupabaseConversationRepository,
+)
+from src.chatbot.infrastructure.database.supabase_message_repository import (
+    SupabaseMessageRepository,
+)
+from src.chatbot.presentation.api.pagination import (
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor,
+    parse_cursor,
+    set_next_cursor,
+)
+
+CREATED_AT = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+
+def _token(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+@pytest.mark.parametrize(
+    "created_at", [CREATED_AT, CREATED_AT.replace(tzinfo=None), CREATED_AT.replace(microsecond=0)]
+)
+def test_cursor_survives_a_round_trip(created_at: datetime) -> None:
+    cursor = PageCursor(created_at=created_at, id=uuid4())
+
+    token = encode_cursor(cursor)
+
+    assert decode_cursor(token) == cursor
+    assert set(token) <= set(string.ascii_letters + string.digits + "-_")
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "not a cursor!",
+        _token(b"\xff\xfe"),
+        _token(CREATED_AT.isoformat().encode()),
+        _token(f"{CREATED_AT.isoformat()}|not-a-uuid".encode()),
+        _token(f"yesterday|{uuid4()}".encode()),
+        # Tampered: the id cut short
+        encode_cursor(PageCursor(created_at=CREATED_AT, id=uuid4()))[:-4],
+    ],
+)
+def test_invalid_cursor_is_rejected(token: str) -> None:
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(token)
+
+    assert error.value.status_code == 400
+
+
+def test_missing_cursor_starts_from_the_first_page() -> None:
+    assert parse_cursor(None) is None
+    assert parse_cursor("") is None
+
+
+def test_next_cursor_is_only_set_on_full_pages() -> None:
+    conversation_id = uuid4()
+    page = [
+        Message(conversation_id=conversation_id, role=MessageRole.USER, content=str(i))
+        for i in range(2)
+    ]
+    full, partial = Response(), Response()
+
+    set_next_cursor(full, page, limit=2)
+    set_next_cursor(partial, page, limit=3)
+
+    assert decode_cursor(full.headers[NEXT_CURSOR_HEADER]) == PageCursor.after(page[-1])
+    assert NEXT_CURSOR_HEADER not in partial.headers
+
+
+@pytest_asyncio.fixture
+async def client() -> AsyncIterator[AsyncClient]:
+    with FakePostgREST() as postgrest:
+        client = await acreate_client(postgrest.url, "fake.anon.key")
+        yield client
+        await client.postgrest.aclose()
+
+
+async def _walk(
+    list_page: Callable[[int, Optional[PageCursor]], Awaitable[List[Any]]], limit: int
+) -> List[UUID]:
+    """List every page through the cursors handed to clients, returning the ids seen."""
+    seen: List[UUID] = []
+    cursor: Optional[PageCursor] = None
+    while True:
+        page = await list_page(limit, cursor)
+        seen += [item.id for item in page]
+        response = Response()
+        set_next_cursor(response, page, limit)
+        if NEXT_CURSOR_HEADER not in response.headers:
+            return seen
+        cursor = decode_cursor(response.headers[NEXT_CURSOR_HEADER])
+
+
+@pytest.mark.asyncio
+async def test_messages_sharing_a_timestamp_are_paged_once(client: AsyncClient) -> None:
+    repository = SupabaseMessageRepository(client)
+    conversation_id = uuid4()
+    # Most of them created at the same instant, across page boundaries
+    timestamps = [CREATED_AT] * 7 + [CREATED_AT + timedelta(seconds=1)] * 2
+    messages = [
+        Message(
+            conversation_id=conversation_id, role=MessageRole.USER, content=str(i), created_at=at
+        )
+        for i, at in enumerate(timestamps)
+    ]
+    await repository.create_many(messages)
+
+    seen = await _walk(
+        lambda limit, cursor: repository.list_by_conversation(
+            conversation_id, limit=limit, after=cursor
+        ),
+        limit=3,
+    )
+
+    expected = sorted(messages, key=lambda m: (m.created_at, str(m.id)))
+    assert seen == [m.id for m in expected]
+
+
+@pytest.mark.asyncio
+async def test_conversations_sharing_a_timestamp_are_paged_once(client: AsyncClient) -> None:
+    repository = SupabaseConversationRepository(client)
+    user_id = uuid4()
+    conversations = [
+        Conversation(user_id=user_id, title=str(i), created_at=CREATED_AT) for i in range(5)
+    ]
+    for conversation in conversations:
+        await repository.create(conversation)
+
+    seen = await _walk(
+        lambda limit, cursor: repository.list_all(user_id, limit=limit, after=cursor), limit=2
+    )
+
+    assert seen == sorted((c.id for c in conversations), key=str, reverse=True)
@@ -0,0 +1,52 @@
+"""Tests of the semantic cache and of its vector index."""
+from uuid import uuid4
+
+import pytest
+
+from src.chatbot.infrastructure.cache import semantic
+from src.chatbot.infrastructure.cache.semantic import HashingEmbedder, SemanticCache, VectorIndex
+
+QUESTION = "How do I reset my password?"
+ANSWER = "Use the link sent to your email address."
+
+
+def _cache(shared: bool = False) -> SemanticCache:
+    return SemanticCache(HashingEmbedder(), VectorIndex(100), threshold=0.9, shared=shared)
+
+
+@pytest.mark.asyncio
+async def test_answer_is_only_served_to_the_user_who_got_it() -> None:
+    cache = _cache()
+    owner, other = uuid4(), uuid4()
+    vector = await cache.embed(QUESTION)
+    cache.store(vector, ANSWER, owner)
+
+    assert await cache.lookup(vector, user_id=owner) == ANSWER
+    assert await cache.lookup(vector, user_id=other) is None
+    assert await cache.lookup(vector) is None
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_serves_answers_to_every_user() -> None:
+    cache = _cache(shared=True)
+    vector = await cache.embed(QUESTION)
+    cache.store(vector, ANSWER, uuid4())
+
+    assert await cache.lookup(vector, user_id=uuid4()) == ANSWER
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_search_ignores_the_entries_of_other_scopes(use_numpy: bool) -> None:
+    index = VectorIndex(10, use_numpy=use_numpy)
+    index.add([1.0, 0.0], "theirs", scope="a")
+    index.add([0.8, 0.6], "mine", scope="b")
+
+    assert index.search([1.0, 0.0], scope="b") == pytest.approx((0.8, "mine"))
+    assert index.search([1.0, 0.0], scope="c") is None
+
+
+def test_index_requires_numpy(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(semantic, "np", None)
+
+    with pytest.raises(RuntimeError, match=r"pip install -e \".\[semantic\]\""):
+        VectorIndex(10)
@@ -0,0 +1,183 @@
+"""Tests of the send message use case."""
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+import pytest
+
+from src.chatbot.application.use_cases.send_message import SendMessageUseCase
+from src.chatbot.domain.entities.conversation import Conversation
+from src.chatbot.domain.entities.conversation_summary import ConversationSummary
+from src.chatbot.domain.entities.message import Message, MessageRole
+from src.chatbot.infrastructure.cache.history import ConversationHistoryCache
+from src.chatbot.infrastructure.database.cached_message_repository import (
+    CachedMessageRepository,
+)
+from src.chatbot.infrastructure.langchain.context_builder import ContextBuilder
+
+
+class InMemoryConversationRepository:
+    """Conversation repository holding conversations in a dict."""
+
+    def __init__(self) -> None:
+        self.conversations: Dict[UUID, Conversation] = {}
+
+    async def get_by_id(self, conversation_id: UUID, user_id: UUID) -> Optional[Conversation]:
+        conversation = self.conversations.get(conversation_id)
+        return conversation if conversation and conversation.user_id == user_id else None
+
+
+class InMemoryMessageRepository:
+    """Message repository holding the messages of all conversations in a list."""
+
+    def __init__(self) -> None:
+        self.messages: List[Message] = []
+
+    def _of(self, conversation_id: UUID) -> List[Message]:
+        return [m for m in self.messages if m.conversation_id == conversation_id]
+
+    async def create(self, message: Message) -> Message:
+        self.messages.append(message)
+        return message
+
+    async def create_many(self, messages: List[Message]) -> List[Message]:
+        self.messages.extend(messages)
+        return list(messages)
+
+    async def count_by_conversation(self, conversation_id: UUID) -> int:
+        return len(self._of(conversation_id))
+
+    async def list_recent(self, conversation_id: UUID, limit: int = 100) -> List[Message]:
+        return self._of(conversation_id)[-limit:]
+
+
+class CharacterCounter:
+    """Token counter estimating tokens from characters."""
+
+    def count_text(self, text: str) -> int:
+        return len(text) // 4 + 1
+
+    def count(self, message: Message) -> int:
+        return self.count_text(message.content)
+
+
+class RecordingChatbotService:
+    """Chatbot service recording the history sent with each message."""
+
+    def __init__(self) -> None:
+        self.histories: List[List[str]] = []
+
+    async def generate_response(
+        self,
+        content: str,
+        history: List[Message],
+        summary: Optional[str] = None,
+        semantic_cache_threshold: Optional[float] = None,
+        user_id: Optional[UUID] = None,
+    ) -> str:
+        self.histories.append([m.content for m in history])
+        return f"answer to {content}"
+
+
+class FailingChatbotService:
+    """Chatbot service whose provider fails, after a first chunk when streaming."""
+
+    async def generate_response(self, *args: object, **kwargs: object) -> str:
+        raise RuntimeError("LLM unavailable")
+
+    async def stream_response(self, *args: object, **kwargs: object) -> AsyncIterator[str]:
+        yield "Partial"
+        raise RuntimeError("LLM unavailable")
+
+
+class InMemoryTurnRepository:
+    """Turn repository starting turns on the in-memory repositories."""
+
+    def __init__(
+        self,
+        conversations: InMemoryConversationRepository,
+        messages: InMemoryMessageRepository,
+    ) -> None:
+        self.conversations = conversations
+        self.messages = messages
+
+    async def begin_turn(
+        self, user_id: UUID, user_message: Message, history_limit: int = 100
+    ) -> Optional[Tuple[Conversation, List[Message], Optional[ConversationSummary]]]:
+        conversation_id = user_message.conversation_id
+        conversation = await self.conversations.get_by_id(conversation_id, user_id)
+        if conversation is None:
+            return None
+        history = await self.messages.list_recent(conversation_id, history_limit)
+        await self.messages.create(user_message)
+        return conversation, history, None
+
+
+def _worker(
+    conversations: InMemoryConversationRepository,
+    messages: InMemoryMessageRepository,
+    chatbot_service: RecordingChatbotService,
+) -> SendMessageUseCase:
+    """Build the use case as a worker does, with a history cache of its own."""
+    return SendMessageUseCase(
+        CachedMessageRepository(messages, ConversationHistoryCache(1024 * 1024, 100)),
+        conversations,
+        chatbot_service,
+        ContextBuilder(CharacterCounter(), max_tokens=3000),
+    )
+
+
+@pytest.mark.asyncio
+async def test_turns_served_by_several_workers_see_the_whole_history() -> None:
+    conversations = InMemoryConversationRepository()
+    messages = InMemoryMessageRepository()
+    chatbot_service = RecordingChatbotService()
+    conversation = Conversation(user_id=uuid4(), title="Test")
+    conversations.conversations[conversation.id] = conversation
+    workers = [_worker(conversations, messages, chatbot_service) for _ in range(2)]
+
+    await workers[0].execute(conversation.id, conversation.user_id, "q1")
+    await workers[1].execute(conversation.id, conversation.user_id, "q2")
+    # The history cached by the first worker misses the second turn
+    await workers[0].execute(conversation.id, conversation.user_id, "q3")
+
+    assert chatbot_service.histories[-1] == ["q1", "answer to q1", "q2", "answer to q2"]
+
+
+def _failing_use_case(rpc: bool) -> Tuple[SendMessageUseCase, Conversation, List[Message]]:
+    """Build a use case whose generation fails, with or without the begin_turn RPC."""
+    conversations = InMemoryConversationRepository()
+    messages = InMemoryMessageRepository()
+    conversation = Conversation(user_id=uuid4(), title="Test")
+    conversations.conversations[conversation.id] = conversation
+    use_case = SendMessageUseCase(
+        messages,
+        conversations,
+        FailingChatbotService(),
+        ContextBuilder(CharacterCounter(), max_tokens=3000),
+        turn_repository=InMemoryTurnRepository(conversations, messages) if rpc else None,
+    )
+    return use_case, conversation, messages.messages
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("rpc", [False, True])
+async def test_failed_generation_keeps_the_user_message(rpc: bool) -> None:
+    use_case, conversation, saved = _failing_use_case(rpc)
+
+    with pytest.raises(RuntimeError):
+        await use_case.execute(conversation.id, conversation.user_id, "q1")
+
+    assert [(m.role, m.content) for m in saved] == [(MessageRole.USER, "q1")]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("rpc", [False, True])
+async def test_failed_stream_keeps_the_user_message(rpc: bool) -> None:
+    use_case, conversation, saved = _failing_use_case(rpc)
+
+    stream = await use_case.execute_stream(conversation.id, conversation.user_id, "q1")
+    with pytest.raises(RuntimeError):
+        async for _ in stream:
+            pass
+
+    assert [(m.role, m.content) for m in saved] == [(MessageRole.USER, "q1")]
@@ -0,0 +1,114 @@
+"""Tests of the coalescing of identical concurrent upstream calls."""
+import asyncio
+from typing import AsyncIterator, List
+
+import pytest
+
+from src.chatbot.infrastructure.single_flight import FlightCancelled, SingleFlight
+
+
+class HeldSource:
+    """Upstream call producing the chunks it is given, one at a time."""
+
+    def __init__(self) -> None:
+        self.queue: "asyncio.Queue[object]" = asyncio.Queue()
+        self.calls = 0
+
+    async def produce(self) -> AsyncIterator[str]:
+        self.calls += 1
+        while True:
+            item = await self.queue.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+async def _collect(stream: AsyncIterator[str], received: List[str]) -> None:
+    async for chunk in stream:
+        received.append(chunk)
+
+
+async def _settle() -> None:
+    """Let the tasks in progress run until they wait."""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_late_follower_replays_the_chunks_already_produced() -> None:
+    flight = SingleFlight()
+    source = HeldSource()
+    first: List[str] = []
+    late: List[str] = []
+
+    leader = asyncio.create_task(_collect(flight.stream("key", source.produce), first))
+    source.queue.put_nowait("a")
+    source.queue.put_nowait("b")
+    await _settle()
+    follower = asyncio.create_task(_collect(flight.stream("key", source.produce), late))
+    await _settle()
+    source.queue.put_nowait("c")
+    source.queue.put_nowait(None)
+    await asyncio.gather(leader, follower)
+
+    assert first == late == ["a", "b", "c"]
+    assert source.calls == 1
+    assert flight.stats()["joined"] == 1
+
+
+@pytest.mark.asyncio
+async def test_error_of_the_call_is_raised_to_every_follower() -> None:
+    flight = SingleFlight()
+    source = HeldSource()
+    received: List[List[str]] = [[], []]
+
+    followers = [
+        asyncio.create_task(_collect(flight.stream("key", source.produce), chunks))
+        for chunks in received
+    ]
+    await _settle()
+    source.queue.put_nowait("a")
+    source.queue.put_nowait(RuntimeError("upstream failed"))
+    results = await asyncio.gather(*followers, return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert received == [["a"], ["a"]]
+    assert flight.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_call_is_raised_to_its_followers() -> None:
+    flight = SingleFlight()
+    source = HeldSource()
+    received: List[str] = []
+
+    follower = asyncio.create_task(_collect(flight.stream("key", source.produce), received))
+    source.queue.put_nowait("a")
+    await _settle()
+    await flight.aclose()
+
+    with pytest.raises(FlightCancelled):
+        await follower
+    assert received == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_call_is_cancelled_once_every_follower_has_gone() -> None:
+    flight = SingleFlight()
+    source = HeldSource()
+    followers = [
+        asyncio.create_task(_collect(flight.stream("key", source.produce), []))
+        for _ in range(2)
+    ]
+    await _settle()
+    (call,) = [f.task for f in flight._flights.values()]
+
+    followers[0].cancel()
+    await _settle()
+    assert not call.done()
+
+    followers[1].cancel()
+    await _settle()
+    assert call.cancelled()
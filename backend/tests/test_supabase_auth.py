@@ -0,0 +1,89 @@
+"""Tests of the verification and caching of Supabase JWTs."""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import UUID, uuid4
+
+import jwt
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from src.chatbot.domain.entities.user import User
+from src.chatbot.infrastructure.auth.supabase_auth import _verified_tokens, get_current_user
+from src.chatbot.infrastructure.config import settings
+
+
+@pytest.fixture(autouse=True)
+def empty_cache() -> Iterator[None]:
+    _verified_tokens.cache_clear()
+    yield
+    _verified_tokens.cache_clear()
+
+
+@pytest.fixture
+def decodes(monkeypatch: pytest.MonkeyPatch) -> List[str]:
+    """Tokens decoded, i.e. whose signature and claims were checked."""
+    decoded: List[str] = []
+    decode = jwt.decode
+
+    def counting_decode(token: str, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        decoded.append(token)
+        return decode(token, *args, **kwargs)
+
+    monkeypatch.setattr(jwt, "decode", counting_decode)
+    return decoded
+
+
+def _token(user_id: UUID, expires_in: Optional[float] = 600) -> str:
+    claims: Dict[str, Any] = {"sub": str(user_id), "email": "a@b.c", "aud": "authenticated"}
+    if expires_in is not None:
+        claims["exp"] = int(time.time() + expires_in)
+    return jwt.encode(claims, settings.supabase_jwt_secret, algorithm="HS256")
+
+
+def _authenticate(token: str) -> User:
+    return get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+
+
+def test_verified_token_is_served_from_the_cache(decodes: List[str]) -> None:
+    user_id = uuid4()
+    token = _token(user_id)
+
+    assert _authenticate(token).id == user_id
+    assert _authenticate(token).id == user_id
+    assert len(decodes) == 1
+
+
+def test_cached_token_is_rejected_once_expired() -> None:
+    token = _token(uuid4(), expires_in=1)
+    expires_at = jwt.decode(token, options={"verify_signature": False})["exp"]
+    _authenticate(token)
+
+    time.sleep(max(0.0, expires_at - time.time()) + 0.05)
+    with pytest.raises(HTTPException) as error:
+        _authenticate(token)
+
+    assert error.value.status_code == 401
+    assert error.value.detail == "Authentication token has expired"
+
+
+def test_token_without_expiry_is_verified_on_every_request(decodes: List[str]) -> None:
+    token = _token(uuid4(), expires_in=None)
+
+    _authenticate(token)
+    _authenticate(token)
+
+    assert len(decodes) == 2
+    assert len(_verified_tokens()) == 0
+
+
+def test_concurrent_lookups_get_the_user_of_their_token() -> None:
+    users = [uuid4() for _ in range(8)]
+    tokens = [_token(user_id) for user_id in users]
+    # FastAPI resolves this dependency on its thread pool
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(_authenticate, tokens * 50))
+
+    assert [user.id for user in results] == users * 50
+    assert len(_verified_tokens()) == len(users)